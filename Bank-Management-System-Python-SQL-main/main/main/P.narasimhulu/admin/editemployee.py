@@ -1,5 +1,10 @@
 from datetime import date
+import mysql.connector
+from tools import connection
 from tools import dataentering
+from tools import cache
+from tools import errors
+from tools import operations
 
 def age(birthdate):
     today = date.today()
@@ -9,32 +14,32 @@ emp_no=None
 hire_date=None
 birth_date=None
 
-def ap3(conn,cur):
+def ap3():
     global emp_no,birth_date,hire_date
     print("---------Edit employee process----------\n")
     while True:
         print("input ~ to quit")
         emp_no=input(("Enter emp_no of the employee to edit the details: "))
         if emp_no=="~": break
-        if len(emp_no) <= 5:
+        if len(emp_no) <= dataentering.KEY_DIGITS:
             try:
                 emp_no=int(emp_no)
                 print("Checking...")
             except ValueError:
                 print("emp_no should be an integer!!")
             else:
-                next(conn,cur)
+                next()
                 break
         else:
-            print("Maximum length is 5!")
+            print("Maximum length is {}!".format(dataentering.KEY_DIGITS))
 
-def next(conn,cur):
-    cur.execute("select * from employees where emp_no={}".format(emp_no))
-    results=cur.fetchall()
-    if len(results)==0:
+def next():
+    global birth_date,hire_date
+    with connection.borrow() as (conn,cur):
+        results1=cache.employee(conn,emp_no)
+    if results1 is None:
         print("That employee number does not exist.")
     else:
-        results1=results[0]
         print("1.emp_no:",results1[0])
         print("2.birth_date:",results1[1])
         print("3.first_name:",results1[2])
@@ -44,90 +49,63 @@ def next(conn,cur):
         print("7.password")
         birth_date=results1[1]
         hire_date=results1[5]
-        f2(conn,cur)
+        f2()
 
-def f2(conn,cur):
+def change(done_msg,**changes):
+#borrows a connection only for the update, after the new value has been entered
+    try:
+        with connection.borrow() as (conn,cur):
+            operations.edit_employee(conn,emp_no,**changes)
+    except (errors.BankError,mysql.connector.Error) as err:
+        print(err.msg)
+        print("-----------Value addition/deletion was unsuccessful!!!!-------------")
+        return False
+    else:
+        print(done_msg)
+        return True
+
+def f2():
     global emp_no,birth_date,hire_date
     print("0 to quit.")
     a=input("What would you like to change from the above:")
     if a == '1':
         en=dataentering.primary_key_no("emp_no")
-        query="update employees set emp_no=%s where emp_no=%s"
-        query2="update empass set emp_no=%s where emp_no=%s"
-        data=(en,emp_no)
-        done=dataentering.tableupdate(conn,cur,query,data)
-        if done:
-            done=dataentering.tableupdate(conn,cur,query2,data)
-            if done:
-                print("Updated employee number...")
+        if change("Updated employee number...",emp_no=en):
+            emp_no=en
 
     if a == '2':
         birth_date=dataentering.birthdate("employee",20,60)
-        if age(birth_date)-age(hire_date)>=20:
-            query="update employees set birth_date=%s where emp_no=%s"
-            data=(birth_date,emp_no)
-            done=dataentering.tableupdate(conn,cur,query,data)
-            if done:
-                print("Updated birth date")
-        else:
-            print("Employee must be atleast 20 years of age when hired!!")
-            print(birth_date,": birth_date")
-            print(hire_date,":hire date you entered")
+        change("Updated birth date",birth_date=birth_date)
 
     if a == '3':
         first_name=dataentering.fname()
-        query="update employees set first_name=%s where emp_no=%s"
-        data=(first_name,emp_no)
-        done=dataentering.tableupdate(conn,cur,query,data)
-        if done:
-            print("Updated first name...")
+        change("Updated first name...",first_name=first_name)
 
     if a == '4':
         last_name=dataentering.lname()
-        query="update employees set last_name=%s where emp_no=%s"
-        data=(last_name,emp_no)
-        done=dataentering.tableupdate(conn,cur,query,data)
-        if done:
-            print("Updated last name...")
+        change("Updated last name...",last_name=last_name)
                     
     if a == '5':
         gender=dataentering.gender()
-        query="update employees set gender=%s where emp_no=%s"
-        data=(gender,emp_no)
-        done=dataentering.tableupdate(conn,cur,query,data)
-        if done:
-            print("Updated gender...")
+        change("Updated gender...",gender=gender)
 
     if a == '6':
         hire_date=dataentering.date2("employee",birth_date,"hire",20,60)
-        query="update employees set hire_date=%s where emp_no=%s"
-        data=(hire_date,emp_no)
-        done=dataentering.tableupdate(conn,cur,query,data)
-        if done:
-            print("Updated hire date...")
+        change("Updated hire date...",hire_date=hire_date)
 
     if a=='7':
         print("1.Show the password")
         print("2.Change the password")
         ans=input("Enter your choice (1,2):")
         if ans=='1':
-            cur.execute("SELECT pass from empass where emp_no={}".format(emp_no))
-            result=cur.fetchall()
-            print(result[0][0], "is the password.")
+            #only the salted hash is kept, see tools/passwords
+            print("Passwords are kept hashed and can't be shown, choose 2 to set a new one.")
         elif ans=='2':
             while True:
                 password=input("Enter employee login password(max 8 characters, min 4): ")
-                lp=len(password)
-                if lp>8:
-                    print("Max 8 characters only.")
-                elif lp<4:
-                    print("Minimum 4 characters to be entered.")
+                error=dataentering.check_password(password)
+                if error is None:
+                    change("Password changed successfully!!!",**{"pass":password})
+                    break
                 else:
-                    query="UPDATE empass set pass=LPAD(%s,%s,'0') where emp_no=%s"
-                    data=(password,lp,emp_no)
-                    done=dataentering.tableupdate(conn,cur,query,data)
-                    if done:
-                        print("Password changed successfully!!!")
-                        break
-                    else:
-                        break
\ No newline at end of file
+                    print(error)
\ No newline at end of file
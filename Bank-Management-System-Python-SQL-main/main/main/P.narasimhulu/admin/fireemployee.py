@@ -1,9 +1,13 @@
 import mysql.connector
-def ap2(conn,cur):
+from tools import connection
+from tools import errors
+from tools import operations
+from tools import dataentering
+def ap2():
     print("---------Fire employee process----------\n")
     while True:
         emp_no=input(("Enter emp_no of the employee to fire them: "))
-        if len(emp_no) <= 5:
+        if len(emp_no) <= dataentering.KEY_DIGITS:
             try:
                 emp_no=int(emp_no)
                 print("Checking...")
@@ -12,26 +16,16 @@ def ap2(conn,cur):
             else:
                 break
         else:
-            print("Maximum length is 5!")
+            print("Maximum length is {}!".format(dataentering.KEY_DIGITS))
     
-    query="delete from employees where emp_no = {}".format(emp_no)
-    query2="delete from empass where emp_no = {}".format(emp_no)
-    cur.execute("select emp_no from employees")
-    record=cur.fetchall()
-    changed=False
-    for r in record:
-        if r[0]==emp_no:
-            try:
-                cur.execute(query2)
-                conn.commit()
-                cur.execute(query)
-                conn.commit()
-                changed=True
-            except mysql.connector.Error as err:
-                print(err.msg)
-                print("-----------Value deletion was unsuccessful!!!!-------------\n")
-            else:
-                print("Employee fired successfully...\n")
-    if not changed:
-        print("The employee number does not exist.")
-        print("------------Could not fire employee-----------\n")
\ No newline at end of file
+    try:
+        with connection.borrow() as (conn,cur):
+            operations.fire_employee(conn,emp_no)
+    except errors.BankError as err:
+        print(err.msg)
+        print("------------Could not fire employee-----------\n")
+    except mysql.connector.Error as err:
+        print(err.msg)
+        print("-----------Value deletion was unsuccessful!!!!-------------\n")
+    else:
+        print("Employee fired successfully...\n")
\ No newline at end of file
@@ -1,9 +1,20 @@
-def ap4(cur):
-    cur.execute("select * from employees")
-    results=cur.fetchall()
-    print("+---------+-------------+------------------+------------------+---------+-------------+")
-    print("|","%7s"%"EMP_NO","|","%11s"%"BIRTH_DATE","|","%16s"%"FIRST_NAME","|","%16s"%"LAST_NAME","|","%7s"%"GENDER","|","%11s"%"HIRE_DATE","|")
-    for row in results:
-        print("+---------+-------------+------------------+------------------+---------+-------------+")
-        print("|","%7s"%row[0],"|","%11s"%row[1],"|","%16s"%row[2],"|","%16s"%row[3],"|","%7s"%row[4],"|","%11s"%row[5],"|")
-    print("+---------+-------------+------------------+------------------+---------+-------------+")
\ No newline at end of file
+from tools import listing
+
+COLUMNS=("emp_no","birth_date","first_name","last_name","gender","hire_date")
+LINE="+---------+-------------+------------------+------------------+---------+-------------+"
+
+def header():
+    return " ".join(["|","%7s"%"EMP_NO","|","%11s"%"BIRTH_DATE","|","%16s"%"FIRST_NAME","|","%16s"%"LAST_NAME","|","%7s"%"GENDER","|","%11s"%"HIRE_DATE","|"])
+
+def fmt(row):
+    return " ".join(["|","%7s"%row[0],"|","%11s"%row[1],"|","%16s"%row[2],"|","%16s"%row[3],"|","%7s"%row[4],"|","%11s"%row[5],"|"])
+
+def ap4():
+    print("Filters:")
+    prefix=listing.ask_prefix()
+    hired_from=listing.ask_date("first hire date")
+    hired_to=listing.ask_date("last hire date")
+    page_size=listing.ask_page_size()
+    filters=[("last_name like %s escape '!'",prefix),("hire_date>=%s",hired_from),("hire_date<=%s",hired_to)]
+    rows=listing.pages(None,"employees",COLUMNS,"emp_no",filters,page_size)
+    listing.render(rows,LINE,header(),fmt)
\ No newline at end of file
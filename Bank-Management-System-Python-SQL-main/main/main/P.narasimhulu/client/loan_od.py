@@ -1,36 +1,56 @@
+import mysql.connector
+from tools import connection
 from tools import dataentering
-def cp5(cur,acc_type,acc_no):
-    loan_or_od=None
-    if acc_type=="current":
-        loan_or_od="overdraft"
-    else:
-        loan_or_od="loan"
-    cur.execute("select {} from {} where acc_no={}".format(loan_or_od,acc_type,acc_no))
-    a=cur.fetchall()
-    if a[0][0]=="NO" and acc_type=="savings":
-        loan_process()
-    elif a[0][0]=="NO" and acc_type=="current":
-        #TODO:Check status of pending overdraft request if any
-        print("Congratulations! You don't have any overdraft to repay.")
-    elif a[0][0]=="YES" and acc_type=="current":
-        cur.execute("select {}_amt from {} where acc_no={}".format(loan_or_od,loan_or_od,acc_no))
-        od=cur.fetchall()
-        od=od[0][0]
-        print("Your remaining od amount is {}")
+from tools import errors
+from tools import operations
+from tools import queries
+def cp5(acc_type,acc_no):
+#reads everything first, the connection goes back before asking anything
+    with connection.borrow() as (conn,cur):
+        a=queries.fetchone(conn,"loan_od",(acc_no,))
+        kind="LOAN" if acc_type=="savings" else "OVERDRAFT"
+        request=operations.last_request(conn,acc_no,kind) if a[0]=="NO" else None
+        od=queries.fetchone(conn,"overdraft",(acc_no,))[0] if a[0]=="YES" and acc_type=="current" else None
+        loan=queries.fetchone(conn,"loan",(acc_no,)) if a[0]=="YES" and acc_type=="savings" else None
+    if a[0]=="NO" and acc_type=="savings":
+        if not waiting(request,kind):
+            loan=loan_process()
+            if loan is not None:
+                try:
+                    with connection.borrow() as (conn,cur):
+                        request_no=operations.request_loan(conn,acc_no,loan[1],loan[0],loan[2])
+                except (errors.BankError,mysql.connector.Error) as err:
+                    print(err.msg)
+                    print("Couldn't send the loan request.")
+                else:
+                    print("Loan request {} sent. You can check its status here.".format(request_no))
+    elif a[0]=="NO" and acc_type=="current":
+        if not waiting(request,kind):
+            print("Congratulations! You don't have any overdraft to repay.")
+    elif a[0]=="YES" and acc_type=="current":
+        print("Your remaining od amount is {}".format(od))
     else:
         print("You already have a loan pending to repay...")
-        cur.execute("select {}_amt,{}_type from {} where acc_no={}".format(loan_or_od,loan_or_od,loan_or_od,acc_no))
-        loan=cur.fetchall()
-        loan_type=loan[0][1]
+        loan_type=loan[1]
         if loan_type=='PL':loan_type='Personal Loan'
-        if loan_type=='HL':loan_type='Health Loan'
-        if loan_type=='EL':loan_type='Education Loan'
-        if loan_type=='TL':loan_type='Term Loan'
+        elif loan_type=='HL':loan_type='Home Loan'
+        elif loan_type=='EL':loan_type='Education Loan'
+        elif loan_type=='TL':loan_type='Term Loan'
         else:loan_type='Business Loan'
-        loan_amt=loan[0][0]
+        loan_amt=loan[0]
         print("Your remaining od amount is {} of loan type {}".format(loan_amt,loan_type))
 
 
+def waiting(request,kind):
+#shows the latest request (from operations.last_request), True while it is waiting for a decision
+    if request is None:
+        return False
+    print("Your {} request {} of {} currency (sent {:%Y-%m-%d %H:%M}) is {}".format(
+        kind.lower(),request["request_no"],request["amount"],request["created"],request["status"]))
+    if request["status"]=="REJECTED":
+        print("Reason: {}".format(request["reason"]))
+    return request["status"] in ("PENDING","REVIEW")
+
 def loan_process():
     while True:
         loan_amt=input("Enter loan amount: ")
@@ -72,5 +92,13 @@ def loan_process():
             print("Wrong Input!!")
     
     if loan_type!="~":
-        return loan_amt,loan_type
-        #TODO: Add a method to store requests in dat file or csv file...
+        while True:
+            months=input("Enter time period in months: ")
+            try:
+                months=int(months)
+            except ValueError:
+                print("Months should be an integer")
+            else:
+                if months>0:
+                    return loan_amt,loan_type,months
+                print("Months should be more than 0")
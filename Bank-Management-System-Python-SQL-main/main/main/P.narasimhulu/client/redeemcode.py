@@ -1,13 +1,16 @@
-from tools import dataentering
-def cp4(conn,cur,acc_type,acc_no):
+import mysql.connector
+from tools import connection
+from tools import errors
+from tools import operations
+def cp4(acc_type,acc_no):
     rc=input("Enter redeem code: ")
-    if rc=="TESTREDEEMCODE":
-        query="update {} set balance = balance+%s where acc_no = %s".format(acc_type)
-        data=(5000,acc_no)
-        done = dataentering.tableupdate(conn,cur,query,data)
-        if done:
-            print("Added 5000 currency to your account!!")
-        else:
-            print("There was a problem while processing the request")
+    try:
+        with connection.borrow() as (conn,cur):
+            amount=operations.redeem(conn,acc_no,rc)
+    except errors.BankError as err:
+        print(err.msg)
+    except mysql.connector.Error as err:
+        print(err.msg)
+        print("There was a problem while processing the request")
     else:
-        print("Sorry! This redeem code doesn't work")
\ No newline at end of file
+        print("Added {} currency to your account!!".format(amount))
\ No newline at end of file
@@ -0,0 +1,30 @@
+from datetime import timedelta
+from tools import checkpoints
+from tools import connection
+from tools import journal
+from tools import listing
+
+LINE="+------------+---------------------+----------+-------------+---------+"
+
+def header():
+    return " ".join(["|","%10s"%"ENTRY_NO","|","%19s"%"TIME","|","%8s"%"KIND","|","%11s"%"AMOUNT","|","%7s"%"TO/FROM","|"])
+
+def fmt(row):
+    ref_acc="" if row[4] is None else row[4]
+    return " ".join(["|","%10s"%row[0],"|","%19s"%row[1].strftime("%Y-%m-%d %H:%M:%S"),"|","%8s"%row[2],"|","%+11d"%row[3],"|","%7s"%ref_acc,"|"])
+
+def cp7(acc_no):
+    start=listing.ask_date("first day of the statement")
+    end=listing.ask_date("last day of the statement")
+    page_size=listing.ask_page_size()
+    if start is not None:
+        with connection.borrow() as (conn,cur):
+            opening=checkpoints.balance_on(conn,acc_no,start-timedelta(days=1))
+        print("Opening balance: ",opening)
+    #every page takes a connection of its own, none is held while a page waits
+    rows=journal.statement(None,acc_no,start,end,page_size)
+    listing.render(rows,LINE,header(),fmt)
+    if end is not None:
+        with connection.borrow() as (conn,cur):
+            closing=checkpoints.balance_on(conn,acc_no,end)
+        print("Closing balance: ",closing)
@@ -1,6 +1,10 @@
+import mysql.connector
+from tools import connection
 from tools import dataentering
+from tools import errors
+from tools import operations
 
-def ep1(query,cur):
+def ep1():
     print("-------------Create account Process-------------")
 
 #client number
@@ -36,40 +40,17 @@ def ep1(query,cur):
 #email-id
     email_id=dataentering.email()
 
-    print("=========== Final Data ===========")
-    print(acc_no,acc_type,first_name,last_name,gender,birth_date,acc_creation_date,mobile_no,email_id,password)
-    add_client=("INSERT INTO clients "
-    "(acc_no,type,first_name,last_name,gender,birth_date,accd,mobile_no,email_id,pass) "
-    "VALUES (%s,%s,%s,%s,%s,%s,%s,LPAD(%s,%s,'0'),%s,LPAD(%s,%s,'0'))")
-    data_client=(acc_no,acc_type,first_name,last_name,gender,birth_date,acc_creation_date,mobile_no,lmn,email_id,password,lp)
-    
-    done=dataentering.tableupdate(query,cur,add_client,data_client)
-    if done:
-        if acc_type=='S':
-            bank_balance=dataentering.balance()
-            add_savings=("INSERT INTO SAVINGS VALUES(%s,%s,'NO')")
-            data_savings=(acc_no,bank_balance)
-            done2=dataentering.tableupdate(query,cur,add_savings,data_savings)
-            if done2:
-                pass
-            else:
-                print("Unable to add to savings table.")
-                print("Deleting from main table.......")
-                delete_client=("delete from clients where acc_no = %s")
-                data_delete_client=(acc_no)
-                done=dataentering.tableupdate(query,cur,delete_client,data_delete_client)
-        else:
-            bank_balance=dataentering.balance()
-            add_current=("INSERT INTO current VALUES(%s,%s,'NO')")
-            data_current=(acc_no,bank_balance)
-            done2=dataentering.tableupdate(query,cur,add_current,data_current)
-            if done2:
-                pass
-            else:
-                print("Unable to add to savings table.")
-                print("Deleting from main table.......")
-                delete_client=("delete from clients where acc_no = %s")
-                data_delete_client=(acc_no)
-                done=dataentering.tableupdate(query,cur,delete_client,data_delete_client)
+#starting balance
+    bank_balance=dataentering.balance()
 
+    print("=========== Final Data ===========")
+    print(acc_no,acc_type,first_name,last_name,gender,birth_date,acc_creation_date,mobile_no,email_id,password,bank_balance)
+    try:
+        with connection.borrow() as (conn,cur):
+            operations.create_account(conn,acc_no,acc_type,first_name,last_name,gender,birth_date,
+                                      acc_creation_date,mobile_no,email_id,password,bank_balance)
+    except (errors.BankError,mysql.connector.Error) as err:
+        print(err.msg)
+        print("-----------Value addition was unsuccessful!!!!-------------")
+    else:
         print("Values added successfully!!")
\ No newline at end of file
@@ -1,5 +1,10 @@
 from datetime import date
+import mysql.connector
+from tools import connection
 from tools import dataentering
+from tools import cache
+from tools import errors
+from tools import operations
 
 acc_no=None
 first_name=None
@@ -9,33 +14,33 @@ birth_date=None
 acc_creation_date=None
 mobile_no=None
 email_id=None
-password = None
 
 def age(birthdate):
     today = date.today()
     age = today.year - birthdate.year - ((today.month, today.day) < (birthdate.month, birthdate.day))
     return age
 
-def ep2(conn,cur):
-    global acc_no,first_name,last_name,gender,birth_date,acc_creation_date,mobile_no,email_id,password
+def ep2():
+    global acc_no,first_name,last_name,gender,birth_date,acc_creation_date,mobile_no,email_id
     while True:
         print("\ninput ~ to quit")
-        acc_no=input("Enter acc_no (max 5 int) to edit details: ")
+        acc_no=input("Enter acc_no (max {} int) to edit details: ".format(dataentering.KEY_DIGITS))
         if acc_no=="~": break
-        elif len(acc_no) <= 5:
+        elif len(acc_no) <= dataentering.KEY_DIGITS:
             try:
                 acc_no=int(acc_no)
                 print("Done OK")
             except ValueError:
                 print("acc_no should be an integer!!")
+                continue
         else:
-            print("Maximum length is 5!")
-        cur.execute("select * from clients where acc_no={}".format(acc_no))
-        results=cur.fetchall()
-        if len(results)==0:
+            print("Maximum length is {}!".format(dataentering.KEY_DIGITS))
+            continue
+        with connection.borrow() as (conn,cur):
+            results1=cache.client(conn,acc_no)
+        if results1 is None:
             print("That account number does not exist.")
         else:
-            results1=results[0]
             first_name=results1[2]
             last_name=results1[3]
             gender=results1[4]
@@ -43,7 +48,6 @@ def ep2(conn,cur):
             acc_creation_date=results1[6]
             mobile_no=results1[7]
             email_id=results1[8]
-            password=results1[9]
 
             print("1. first_name            = ",first_name)
             print("2. last_name             = ",last_name)
@@ -54,78 +58,56 @@ def ep2(conn,cur):
             print("7. email_id              = ",email_id)
             print("8. password")
             print("0 to quit")
-            ep2f2(conn,cur)
+            ep2f2()
     
-def ep2f2(conn,cur):
-    global acc_no,first_name,last_name,gender,birth_date,acc_creation_date,mobile_no,email_id,password
+def change(done_msg,**changes):
+#borrows a connection only for the update, after the new value has been entered
+    try:
+        with connection.borrow() as (conn,cur):
+            operations.edit_account(conn,acc_no,**changes)
+    except (errors.BankError,mysql.connector.Error) as err:
+        print(err.msg)
+        print("-----------Value addition/deletion was unsuccessful!!!!-------------")
+    else:
+        print(done_msg)
+
+def ep2f2():
+    global acc_no,first_name,last_name,gender,birth_date,acc_creation_date,mobile_no,email_id
     choice=input("What would you like to change from here: ")
 #First-name    
     if choice == "1":
         first_name=dataentering.fname()
-        query="update clients set first_name=%s where acc_no=%s"
-        data=(first_name,acc_no)
-        done=dataentering.tableupdate(conn,cur,query,data)
-        if done:
-            print("Updated first name")
+        change("Updated first name",first_name=first_name)
 
 #Last-name
     elif choice == "2":
         last_name=dataentering.lname()
-        query="update clients set last_name=%s where acc_no=%s"
-        data=(last_name,acc_no)
-        done=dataentering.tableupdate(conn,cur,query,data)
-        if done:
-            print("Updated last name")
+        change("Updated last name",last_name=last_name)
 
 #Gender
     elif choice == "3":
         gender=dataentering.gender()
-        query="update clients set gender=%s where acc_no=%s"
-        data=(gender,acc_no)
-        done=dataentering.tableupdate(conn,cur,query,data)
-        if done:
-            print("Updated gender")
+        change("Updated gender",gender=gender)
 
 #Birth-date
     elif choice == "4":
         birth_date=dataentering.birthdate("Client",10,100)
-        if age(birth_date)-age(acc_creation_date)>=10:
-            query="update clients set birth_date=%s where acc_no=%s"
-            data=(birth_date,acc_no)
-            done=dataentering.tableupdate(conn,cur,query,data)
-            if done:
-                print("Updated birth date")
-        else:
-            print("The client should atleast be 10 years of age.")
-            print("Birth date:",birth_date)
-            print("Account Creation Date:",acc_creation_date)
+        change("Updated birth date",birth_date=birth_date)
 
 #Account-creation-date(accd)
     elif choice == "5":
         acc_creation_date=dataentering.date2("client",birth_date,"account_creation",10,100)
-        query="update clients set accd=%s where acc_no=%s"
-        data=(acc_creation_date,acc_no)
-        done=dataentering.tableupdate(conn,cur,query,data)
-        if done:
-            print("Updated account creation date")
+        change("Updated account creation date",accd=acc_creation_date)
 
 #Mobile No
     elif choice == "6":
         mobile_no,lmn=dataentering.mobileno()
-        query="update clients set mobile_no=LPAD(%s,%s,'0') where acc_no=%s"
-        data=(mobile_no,lmn,acc_no)
-        done=dataentering.tableupdate(conn,cur,query,data)
-        if done:
-            print("Updated mobile number")
+        change("Updated mobile number",mobile_no=mobile_no)
 
 #Email ID
     elif choice == "7":
         email_id=dataentering.email()
-        query="update clients set email=%s where acc_no=%s"
-        data=(mobile_no,acc_no)
-        done=dataentering.tableupdate(conn,cur,query,data)
-        if done:
-            print("Updated mobile number")
+        change("Updated email id",email_id=email_id)
 #Password
     elif choice == "8":
         while True:
@@ -134,16 +116,12 @@ def ep2f2(conn,cur):
             print("0 to quit")
             choice=input("Enter choice: ")
             if choice == "1":
-                print("\nThe password will be printed on the next line")
-                print(password)
+                #only the salted hash is kept, see tools/passwords
+                print("\nPasswords are kept hashed and can't be shown, choose 2 to set a new one.")
                 print()
             elif choice == "2":
                 password,lp=dataentering.clientpassword()
-                query="update clients set pass=LPAD(%s,%s,'0') where acc_no=%s"
-                data=(password,lp,acc_no)
-                done=dataentering.tableupdate(conn,cur,query,data)
-                if done:
-                    print("Updated password")
+                change("Updated password",**{"pass":password})
             elif choice == "0":
                 break
             else:
@@ -0,0 +1,48 @@
+import time
+import mysql.connector
+from tools import connection
+from tools import listing
+from tools import search
+
+LINE="+---------+-------+------------------+------------------+------------------+---------------------------+-------+"
+
+def header():
+    return " ".join(["|","%7s"%"ACC_NO","|","%5s"%"TYPE","|","%16s"%"FIRST_NAME","|","%16s"%"LAST_NAME","|","%16s"%"MOBILE_NO","|","%25s"%"EMAIL_ID","|","%5s"%"MATCH","|"])
+
+def fmt(item):
+    score,row=item
+    return " ".join(["|","%7s"%row[0],"|","%5s"%row[1],"|","%16s"%row[2],"|","%16s"%row[3],"|","%16s"%row[4],"|","%25s"%row[5],"|","%5s"%score,"|"])
+
+def ep6():
+    print("1.By start of the name")
+    print("2.By mobile number")
+    print("3.By email")
+    print("4.Similar names (misspelt names)")
+    choice=input("Enter your choice: ")
+    if choice=="1":
+        last_name=input("Enter start of the last name: ")
+        first_name=input("Enter start of the first name (Enter to skip): ")
+        find=lambda conn:[("",row) for row in search.by_name(conn,last_name,first_name)]
+    elif choice=="2":
+        mobile_no=input("Enter mobile number: ")
+        find=lambda conn:[("",row) for row in search.by_mobile(conn,mobile_no)]
+    elif choice=="3":
+        email_id=input("Enter email: ")
+        find=lambda conn:[("",row) for row in search.by_email(conn,email_id)]
+    elif choice=="4":
+        name=input("Enter the name: ")
+        find=lambda conn:[("%.2f"%score,row) for score,row in search.similar(conn,name)]
+    else:
+        print("Wrong input!!")
+        return
+    try:
+        with connection.borrow() as (conn,cur):
+            start=time.perf_counter()
+            found=find(conn)
+            took=(time.perf_counter()-start)*1000
+    except mysql.connector.Error as err:
+        print(err.msg)
+        print("-----------Search was unsuccessful!!!!-------------")
+        return
+    listing.render([found] if found else [],LINE,header(),fmt,ask=False)
+    print("Found in {:.1f} ms (at most {} shown)".format(took,search.LIMIT))
@@ -0,0 +1,51 @@
+import mysql.connector
+from tools import connection
+from tools import errors
+from tools import listing
+from tools import operations
+
+COLUMNS=("request_no","acc_no","kind","loan_type","amount","months","status","score","created")
+LINE="+------------+---------+-----------+------+------------+--------+------------+-------+---------------------+"
+
+def header():
+    return " ".join(["|","%10s"%"REQUEST_NO","|","%7s"%"ACC_NO","|","%9s"%"KIND","|","%4s"%"TYPE","|","%10s"%"AMOUNT","|","%6s"%"MONTHS","|","%10s"%"STATUS","|","%5s"%"SCORE","|","%19s"%"SENT","|"])
+
+def fmt(row):
+    row=["" if value is None else value for value in row]
+    return " ".join(["|","%10s"%row[0],"|","%7s"%row[1],"|","%9s"%row[2],"|","%4s"%row[3],"|","%10s"%row[4],"|","%6s"%row[5],"|","%10s"%row[6],"|","%5s"%row[7],"|","%19s"%row[8].strftime("%Y-%m-%d %H:%M:%S"),"|"])
+
+def ep5(emp_no):
+    while True:
+        status=input("Show requests REVIEW/PENDING/SANCTIONED/REJECTED (Enter for REVIEW): ").upper()
+        if status=="":
+            status="REVIEW"
+        if status in ("REVIEW","PENDING","SANCTIONED","REJECTED"):
+            break
+        print("Wrong input!!")
+    page_size=listing.ask_page_size()
+    rows=listing.pages(None,"requests",COLUMNS,"request_no",[("status=%s",status)],page_size)
+    listing.render(rows,LINE,header(),fmt)
+    if status not in ("REVIEW","PENDING"):
+        return
+    while True:
+        request_no=input("Enter request_no to sanction/reject (~ to go back): ")
+        if request_no=="~":
+            break
+        try:
+            request_no=int(request_no)
+        except ValueError:
+            print("request_no should be an integer!!")
+            continue
+        choice=input("S to sanction, R to reject: ").upper()
+        if choice not in ("S","R"):
+            print("Wrong input!!")
+            continue
+        reason=input("Reason (Enter to skip): ")
+        try:
+            with connection.borrow() as (conn,cur):
+                operations.decide_request(conn,request_no,choice=="S",emp_no,reason)
+        except (errors.BankError,mysql.connector.Error) as err:
+            print(err.msg)
+            print("-----------Decision was unsuccessful!!!!-------------")
+        else:
+            print("Request {} {}".format(request_no,"sanctioned" if choice=="S" else "rejected"))
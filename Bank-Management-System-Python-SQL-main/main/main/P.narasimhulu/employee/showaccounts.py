@@ -1,11 +1,27 @@
 from tools import dataentering
+from tools import listing
 
-def ep4(cur):
-    cur.execute("select * from clients")
-    results=cur.fetchall()
-    print("+---------+-------+------------------+------------------+---------+-------------+-------------+------------------+---------------------------+")
-    print("|","%7s"%"ACC_NO","|","%5s"%"TYPE","|","%16s"%"FIRST_NAME","|","%16s"%"LAST_NAME","|","%7s"%"GENDER","|","%11s"%"BIRTH_DATE","|","%11s"%"ACCD","|","%16s"%"MOBILE_NO","|","%25s"%"EMAIL_ID","|")
-    for row in results:
-        print("+---------+-------+------------------+------------------+---------+-------------+-------------+------------------+---------------------------+")
-        print("|","%7s"%row[0],"|","%5s"%row[1],"|","%16s"%row[2],"|","%16s"%row[3],"|","%7s"%row[4],"|","%11s"%row[5],"|","%11s"%row[6],"|","%16s"%row[7],"|","%25s"%row[8],"|")
-    print("+---------+-------+------------------+------------------+---------+-------------+-------------+------------------+---------------------------+")
+COLUMNS=("acc_no","type","first_name","last_name","gender","birth_date","accd","mobile_no","email_id")
+LINE="+---------+-------+------------------+------------------+---------+-------------+-------------+------------------+---------------------------+"
+
+def header():
+    return " ".join(["|","%7s"%"ACC_NO","|","%5s"%"TYPE","|","%16s"%"FIRST_NAME","|","%16s"%"LAST_NAME","|","%7s"%"GENDER","|","%11s"%"BIRTH_DATE","|","%11s"%"ACCD","|","%16s"%"MOBILE_NO","|","%25s"%"EMAIL_ID","|"])
+
+def fmt(row):
+    return " ".join(["|","%7s"%row[0],"|","%5s"%row[1],"|","%16s"%row[2],"|","%16s"%row[3],"|","%7s"%row[4],"|","%11s"%row[5],"|","%11s"%row[6],"|","%16s"%row[7],"|","%25s"%row[8],"|"])
+
+def ep4():
+    print("Filters:")
+    while True:
+        acc_type=input("Account type S/C (Enter for both): ").upper()
+        if acc_type in ("","S","C"):
+            break
+        print("Wrong input!!")
+    prefix=listing.ask_prefix()
+    accd_from=listing.ask_date("first account creation date")
+    accd_to=listing.ask_date("last account creation date")
+    page_size=listing.ask_page_size()
+    filters=[("type=%s",acc_type),("last_name like %s escape '!'",prefix),("accd>=%s",accd_from),("accd<=%s",accd_to)]
+    #conn None, every page borrows a connection of its own
+    rows=listing.pages(None,"clients",COLUMNS,"acc_no",filters,page_size)
+    listing.render(rows,LINE,header(),fmt)
\ No newline at end of file
@@ -1,11 +1,5 @@
+from initialization import config
+
 def check():
-    try:
-        with open("files//firsttime.txt","r") as a:
-            if a.read().strip()=="True":
-                return True
-            else:
-                return False
-    except FileNotFoundError:
-        with open("files//firsttime.txt","w") as a:
-            a.write("True")
-            return True
\ No newline at end of file
+#True while the setup still has to run, firsttime.txt is only read once
+    return config.setup_needed()
\ No newline at end of file
@@ -0,0 +1,92 @@
+#Settings of this installation, read once per process and kept.
+#files//cred.dat (written by the setup) has the database password, name and
+#backend, files//firsttime.txt says whether the setup still has to run.
+#Environment variables override them, so batch workers and services can run
+#with settings of their own (or without those files):
+#  BANK_DB_PASSWORD, BANK_DB_NAME, BANK_DB_BACKEND (mysql/sqlite),
+#  BANK_DB_HOST, BANK_DB_USER, BANK_DB_PORT
+#  BANK_SETUP_DONE=1/0 instead of firsttime.txt
+import os
+import pickle
+import threading
+from typing import NamedTuple
+from tools import backends
+
+CRED_FILE="files//cred.dat"
+FIRSTTIME_FILE="files//firsttime.txt"
+
+class Config(NamedTuple):
+    password: str
+    database: str
+    backend: str=backends.MYSQL
+    host: str="localhost"
+    user: str="root"
+    port: int=3306
+
+_config=None
+_setup_needed=None
+_lock=threading.Lock()
+
+def read_cred(path=CRED_FILE):
+#[password,database] or [password,database,backend]
+    try:
+        with open(path,"rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return ["",None]
+
+def parse(env,cred):
+    backend=env.get("BANK_DB_BACKEND",cred[2] if len(cred)>2 else backends.MYSQL)
+    if backend not in backends.BACKENDS:
+        raise ValueError("BANK_DB_BACKEND should be one of {}".format(",".join(backends.BACKENDS)))
+    database=env.get("BANK_DB_NAME",cred[1])
+    if database is None:
+        raise ValueError("No database, run main.py for the setup or set BANK_DB_NAME")
+    return Config(password=env.get("BANK_DB_PASSWORD",cred[0]),database=database,backend=backend,
+                  host=env.get("BANK_DB_HOST",Config._field_defaults["host"]),
+                  user=env.get("BANK_DB_USER",Config._field_defaults["user"]),
+                  port=int(env.get("BANK_DB_PORT",Config._field_defaults["port"])))
+
+def load() -> Config:
+#cred.dat is read on the first call only
+    global _config
+    with _lock:
+        if _config is None:
+            _config=parse(os.environ,read_cred())
+        return _config
+
+def save(password: str,database: str,backend: str) -> None:
+#written by the setup, the next load() reads it again
+    global _config
+    with _lock:
+        with open(CRED_FILE,"wb") as f:
+            pickle.dump([password,database,backend],f)
+        _config=None
+
+def setup_needed() -> bool:
+#True until the setup has created the tables, firsttime.txt is read once
+    global _setup_needed
+    with _lock:
+        if _setup_needed is None:
+            done=os.environ.get("BANK_SETUP_DONE")
+            if done is not None:
+                _setup_needed=done.lower() not in ("1","true","yes")
+            else:
+                _setup_needed=read_firsttime()
+        return _setup_needed
+
+def read_firsttime(path=FIRSTTIME_FILE):
+    try:
+        with open(path,"r") as a:
+            return a.read().strip()=="True"
+    except FileNotFoundError:
+        with open(path,"w") as a:
+            a.write("True")
+        return True
+
+def setup_done() -> None:
+    global _setup_needed
+    with _lock:
+        with open(FIRSTTIME_FILE,"w") as f:
+            f.write("False")
+        _setup_needed=False
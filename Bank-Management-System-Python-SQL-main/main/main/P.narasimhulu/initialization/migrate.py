@@ -0,0 +1,449 @@
+#Versioned schema changes. schema_migrations keeps the versions that have been
+#applied, and every version in MIGRATIONS that isn't there yet is applied in
+#order. The setup runs them on a new database; databases set up with an older
+#version are brought up to date from this folder with:
+#  python -m initialization.migrate          (--list shows what is applied)
+#Steps tolerate what is already there (tables, views, indexes), so databases
+#from before schema_migrations existed go through all of them safely.
+import argparse
+import sys
+from datetime import datetime, time, timedelta
+from tools import backends
+from tools import connection
+from tools import dataentering
+from tools import errors
+from tools import operations
+from tools import passwords
+from tools import search
+
+import mysql.connector
+from mysql.connector import errorcode
+
+SCHEMA_MIGRATIONS=(
+    "CREATE TABLE IF NOT EXISTS `schema_migrations` ("
+    "  `version` int NOT NULL,"
+    "  `name` varchar(60) NOT NULL,"
+    "  `applied` datetime NOT NULL,"
+    "  PRIMARY KEY (`version`)"
+    ") "
+)
+
+#rows per INSERT of the data migrations
+GROUP_SIZE=5000
+
+#errors of DDL that finds its table/view/index already there
+EXISTS=(errorcode.ER_TABLE_EXISTS_ERROR,errorcode.ER_DUP_KEYNAME)
+
+def base_table(cur,name):
+    cur.execute("SELECT table_type FROM information_schema.tables "
+                "WHERE table_schema=DATABASE() AND table_name=%s",(name,))
+    row=cur.fetchall()
+    return row!=[] and row[0][0]=="BASE TABLE"
+
+def create(cur,statements):
+    for statement in statements:
+        try:
+            cur.execute(statement)
+        except mysql.connector.Error as err:
+            if err.errno not in EXISTS:
+                raise
+
+#------------------------------Schema------------------------------
+#The statements as the versions that use them were released. They are never edited,
+#a change to the schema is a new version at the end of MIGRATIONS.
+
+#Version 1
+TABLES = {}
+TABLES['employees'] = (
+    "CREATE TABLE `employees` ("
+    "  `emp_no` int NOT NULL ,"
+    "  `birth_date` date NOT NULL,"
+    "  `first_name` varchar(15) NOT NULL,"
+    "  `last_name` varchar(15) NOT NULL,"
+    "  `gender` enum('M','F') NOT NULL,"
+    "  `hire_date` date NOT NULL,"
+    "  PRIMARY KEY (`emp_no`)"
+    ") ")
+
+TABLES['clients'] = (
+    "CREATE TABLE `clients` ("
+    "  `acc_no` int NOT NULL PRIMARY KEY,"
+    "  `type` enum('S','C') NOT NULL,"
+    "  `first_name` varchar(15) NOT NULL,"
+    "  `last_name` varchar(15) NOT NULL,"
+    "  `gender` enum('M','F') NOT NULL,"
+    "  `birth_date` date NOT NULL,"
+    "  `accd` date NOT NULL,"
+    "  `mobile_no` varchar(20) NOT NULL,"
+    "  `email_id` varchar(25) NOT NULL,"
+    "  `pass` varchar(8) NOT NULL"
+    ") "
+)
+
+TABLES['empass'] = (
+    "CREATE TABLE `empass` ("
+    "  `emp_no` int NOT NULL,"
+    "  `pass` varchar(8) NOT NULL,"
+    "  PRIMARY KEY (`emp_no`)"
+    ") "
+)
+
+
+#Savings and current balances live in one table keyed by acc_no.
+#loan_od is the loan flag of savings accounts and the overdraft flag of current accounts.
+TABLES['accounts'] = (
+    "CREATE TABLE `accounts` ("
+    "  `acc_no` int NOT NULL,"
+    "  `type` enum('S','C') NOT NULL,"
+    "  `balance` int NOT NULL,"
+    "  `loan_od` enum('YES','NO') NOT NULL,"
+    "  PRIMARY KEY (`acc_no`)"
+    ") "
+)
+
+TABLES['loan'] = (
+    "CREATE TABLE `loan` ("
+    "  `acc_no` int NOT NULL,"
+    "  `loan_type` enum('PL','HL','EL','TL','BL') NOT NULL,"
+    "  `loan_amt` int NOT NULL,"
+    "  `time_period_months` int NOT NULL,"
+    "  `iterest_perc_per_annum` int(1) NOT NULL,"
+    "  `amt-per-month` int NOT NULL,"
+    "  `remaining_amt` int NOT NULL,"
+    "  PRIMARY KEY (`acc_no`)"
+    ") "
+)
+
+TABLES['overdraft']=(
+    "CREATE TABLE `overdraft` ("
+    "  `acc_no` int NOT NULL,"
+    "  `overdraft_amt` int NOT NULL,"
+    "  `od_with_interest_remaining` int NOT NULL,"
+    "  PRIMARY KEY (`acc_no`)"
+    ") "
+)
+
+TABLES['cash_in_hand']=(
+    "CREATE TABLE `cash_in_hand` ("
+    "  `acc_no` int NOT NULL,"
+    "  `cash_in_hand` int NOT NULL,"
+    "  PRIMARY KEY (`acc_no`)"
+    ") "
+)
+
+#Append-only history of every balance change. amount is signed, + is money into
+#the account. ref_acc is the other account of a transfer.
+TABLES['journal']=(
+    "CREATE TABLE `journal` ("
+    "  `entry_no` bigint NOT NULL AUTO_INCREMENT,"
+    "  `acc_no` int NOT NULL,"
+    "  `ts` datetime(6) NOT NULL,"
+    "  `kind` enum('OPEN','DEPOSIT','WITHDRAW','TRANSFER','REDEEM','CLOSE','INTEREST','EMI','LOAN','OVERDRAFT') NOT NULL,"
+    "  `amount` int NOT NULL,"
+    "  `ref_acc` int,"
+    "  PRIMARY KEY (`entry_no`)"
+    ") "
+)
+
+#Balance of an account at a cut-off time, see tools/checkpoints
+TABLES['balance_checkpoints']=(
+    "CREATE TABLE `balance_checkpoints` ("
+    "  `acc_no` int NOT NULL,"
+    "  `ts` datetime(6) NOT NULL,"
+    "  `balance` int NOT NULL,"
+    "  PRIMARY KEY (`acc_no`,`ts`)"
+    ") "
+)
+
+#Savings interest accrued day by day and not yet credited, see tools/eod
+TABLES['accruals']=(
+    "CREATE TABLE `accruals` ("
+    "  `acc_no` int NOT NULL,"
+    "  `accrued` decimal(15,4) NOT NULL,"
+    "  PRIMARY KEY (`acc_no`)"
+    ") "
+)
+
+#Progress of the end of day batch, one row per day and step
+TABLES['eod_runs']=(
+    "CREATE TABLE `eod_runs` ("
+    "  `day` date NOT NULL,"
+    "  `step` varchar(10) NOT NULL,"
+    "  `last_acc_no` int NOT NULL,"
+    "  `done` enum('YES','NO') NOT NULL,"
+    "  PRIMARY KEY (`day`,`step`)"
+    ") "
+)
+
+#Loan and overdraft requests waiting for (or given) a decision, see tools/sanction
+#to_acc/transfer_amt is the transfer that asked for an overdraft
+TABLES['requests']=(
+    "CREATE TABLE `requests` ("
+    "  `request_no` bigint NOT NULL AUTO_INCREMENT,"
+    "  `acc_no` int NOT NULL,"
+    "  `kind` enum('LOAN','OVERDRAFT') NOT NULL,"
+    "  `loan_type` enum('PL','HL','EL','TL','BL'),"
+    "  `amount` int NOT NULL,"
+    "  `months` int,"
+    "  `to_acc` int,"
+    "  `transfer_amt` int,"
+    "  `status` enum('PENDING','REVIEW','SANCTIONED','REJECTED') NOT NULL,"
+    "  `score` int,"
+    "  `reason` varchar(60),"
+    "  `created` datetime(6) NOT NULL,"
+    "  `decided` datetime(6),"
+    "  `decided_by` int,"
+    "  PRIMARY KEY (`request_no`)"
+    ") "
+)
+
+#Versions 3 to 5
+#Secondary indexes, created after the tables
+INDEXES = {}
+INDEXES['journal_acc_ts'] = "CREATE INDEX `journal_acc_ts` ON `journal` (`acc_no`,`ts`)"
+INDEXES['journal_ts'] = "CREATE INDEX `journal_ts` ON `journal` (`ts`)"
+INDEXES['requests_status'] = "CREATE INDEX `requests_status` ON `requests` (`status`,`request_no`)"
+INDEXES['requests_acc_no'] = "CREATE INDEX `requests_acc_no` ON `requests` (`acc_no`,`kind`,`request_no`)"
+#Lookups of clients and employees by name, phone, email and type
+INDEXES['clients_name'] = "CREATE INDEX `clients_name` ON `clients` (`last_name`,`first_name`)"
+INDEXES['clients_mobile_no'] = "CREATE INDEX `clients_mobile_no` ON `clients` (`mobile_no`)"
+INDEXES['clients_email_id'] = "CREATE INDEX `clients_email_id` ON `clients` (`email_id`)"
+INDEXES['clients_type'] = "CREATE INDEX `clients_type` ON `clients` (`type`)"
+INDEXES['employees_name'] = "CREATE INDEX `employees_name` ON `employees` (`last_name`,`first_name`)"
+INDEXES['employees_hire_date'] = "CREATE INDEX `employees_hire_date` ON `employees` (`hire_date`)"
+INDEXES['employees_birth_date'] = "CREATE INDEX `employees_birth_date` ON `employees` (`birth_date`)"
+
+#Version 2
+#Read-only views with the columns of the old savings and current tables
+VIEWS = {}
+VIEWS['savings'] = (
+    "CREATE VIEW `savings` AS "
+    "SELECT acc_no,balance,loan_od AS loan FROM accounts WHERE type='S'"
+)
+
+VIEWS['current'] = (
+    "CREATE VIEW `current` AS "
+    "SELECT acc_no,balance,loan_od AS overdraft FROM accounts WHERE type='C'"
+)
+
+#Version 7, every trigram of every client's name for finding similar names (tools/search)
+CLIENT_TRIGRAMS=(
+    "CREATE TABLE `client_trigrams` ("
+    "  `trigram` char(3) NOT NULL,"
+    "  `acc_no` int NOT NULL,"
+    "  PRIMARY KEY (`trigram`,`acc_no`)"
+    ") "
+)
+INDEXES['client_trigrams_acc_no'] = "CREATE INDEX `client_trigrams_acc_no` ON `client_trigrams` (`acc_no`)"
+
+#Version 8, hashes of the admin and employee panel passwords (tools/passwords)
+PANEL_PASSWORDS=(
+    "CREATE TABLE `panel_passwords` ("
+    "  `panel` enum('ADMIN','EMPLOYEE') NOT NULL,"
+    "  `pass` varchar(120) NOT NULL,"
+    "  PRIMARY KEY (`panel`)"
+    ") "
+)
+
+#Version 9. Trigrams end in a space ("vi "), which CHAR columns and PAD SPACE collations
+#drop, and accented letters must not compare equal to plain ones: varchar with a binary collation.
+TRIGRAM="`trigram` varchar(3) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL"
+
+#------------------------------Steps------------------------------
+
+def tables(conn,cur,ask):
+    create(cur,TABLES.values())
+
+def accounts(conn,cur,ask):
+#Moves databases created before the accounts table existed from the separate
+#savings/current tables into accounts, the old tables are kept as
+#savings_old/current_old. Standalone databases always had the accounts table.
+    if backends.name(conn)==backends.MYSQL and (base_table(cur,"savings") or base_table(cur,"current")):
+        conn.start_transaction()
+        try:
+            if base_table(cur,"savings"):
+                cur.execute("INSERT IGNORE INTO accounts (acc_no,type,balance,loan_od) "
+                            "SELECT acc_no,'S',balance,loan FROM savings")
+                print("Copied {} savings accounts".format(cur.rowcount))
+            if base_table(cur,"current"):
+                cur.execute("INSERT IGNORE INTO accounts (acc_no,type,balance,loan_od) "
+                            "SELECT acc_no,'C',balance,overdraft FROM current")
+                print("Copied {} current accounts".format(cur.rowcount))
+        except mysql.connector.Error:
+            conn.rollback()
+            raise
+        conn.commit()
+        for view_name in VIEWS:
+            if base_table(cur,view_name):
+                cur.execute("RENAME TABLE `{0}` TO `{0}_old`".format(view_name))
+    create(cur,VIEWS.values())
+
+def indexes(*names):
+    def step(conn,cur,ask):
+        create(cur,[INDEXES[name] for name in names])
+    return step
+
+#int(5) only ever was a display width on MySQL, the keys are made plain int
+#like the other tables. SQLite integers have no width.
+NARROW_KEYS=[("employees","emp_no"),("empass","emp_no"),("loan","acc_no"),("overdraft","acc_no"),("cash_in_hand","acc_no")]
+
+def widen_keys(conn,cur,ask):
+    if backends.name(conn)!=backends.MYSQL:
+        return
+    for table,column in NARROW_KEYS:
+        cur.execute("ALTER TABLE `{}` MODIFY `{}` int NOT NULL".format(table,column))
+
+def trigrams(conn,cur,ask):
+    create(cur,[CLIENT_TRIGRAMS,INDEXES['client_trigrams_acc_no']])
+    print("{} client names indexed, ".format(search.rebuild(conn)),end='')
+
+def password_hashes(conn,cur,ask):
+#the pass columns get room for the hashes, then the plaintext passwords are hashed
+#on a pool of processes
+    create(cur,[PANEL_PASSWORDS])
+    if backends.name(conn)==backends.MYSQL:
+        for table in ("clients","empass"):
+            cur.execute("ALTER TABLE `{}` MODIFY `pass` varchar(120) NOT NULL".format(table))
+    for table,key in passwords.TABLES:
+        print("{} {} hashed, ".format(passwords.rehash_table(conn,table,key),table),end='')
+
+#Before version 8 the panel passwords were the same in every copy of the program,
+#so they aren't kept: the admin sets new ones here, on new and upgraded databases.
+def ask_panel_password(panel):
+    return dataentering.panelpassword(panel.lower())
+
+def panel_passwords(conn,cur,ask):
+    cur.execute("select panel from panel_passwords")
+    have={row[0] for row in cur.fetchall()}
+    missing=[panel for panel in operations.PANELS if panel not in have]
+    if not missing:
+        return
+    if ask is None:
+        raise errors.BankError("The admin has to set the panel passwords, run python -m initialization.migrate")
+    print()
+    for panel in missing:
+        operations.set_panel_password(conn,panel,ask(panel))
+
+def binary_trigrams(conn,cur,ask):
+#client_trigrams of version 7 had a char(3) trigram, the trigrams are written again
+    if backends.name(conn)==backends.MYSQL:
+        cur.execute("ALTER TABLE `client_trigrams` MODIFY "+TRIGRAM)
+        print("{} client names indexed, ".format(search.rebuild(conn)),end='')
+
+def opening_balances(conn,cur,ask):
+#Accounts opened before the journal existed have no OPEN entry, so their statements
+#and balance_as_of started from 0. Their OPEN entry is whatever the balance was
+#before the entries the journal does have, dated on the day the account was opened
+#(or just before its first entry, if that is earlier).
+    conn.start_transaction()
+    try:
+        cur.execute("select a.acc_no,a.balance,c.accd,coalesce(sum(j.amount),0),min(j.ts) from accounts a "
+                    "left join clients c on c.acc_no=a.acc_no left join journal j on j.acc_no=a.acc_no "
+                    "where not exists (select 1 from journal o where o.acc_no=a.acc_no and o.kind='OPEN') "
+                    "group by a.acc_no,a.balance,c.accd")
+        entries=[]
+        for acc_no,balance,accd,later,first in cur.fetchall():
+            ts=datetime.combine(accd,time()) if accd is not None else datetime.now()
+            if first is not None:
+                #SQLite gives the min() of a datetime column back as text
+                first=datetime.fromisoformat(first) if isinstance(first,str) else first
+                ts=min(ts,first-timedelta(microseconds=1))
+            entries.append((acc_no,ts,"OPEN",balance-int(later),None))
+        for i in range(0,len(entries),GROUP_SIZE):
+            cur.executemany("insert into journal (acc_no,ts,kind,amount,ref_acc) values (%s,%s,%s,%s,%s)",
+                            entries[i:i+GROUP_SIZE])
+    except mysql.connector.Error:
+        conn.rollback()
+        raise
+    conn.commit()
+    print("{} opening balances written, ".format(len(entries)),end='')
+
+#(version,name,step) , step(conn,cur,ask) raises mysql.connector.Error (or errors.BankError)
+#when it fails. ask(panel) asks the admin for a panel password, None where nobody can answer.
+#Only add new versions at the end, never change one that has been released.
+MIGRATIONS=[
+    (1,"tables",tables),
+    (2,"accounts table and savings/current views",accounts),
+    (3,"journal and request indexes",indexes("journal_acc_ts","journal_ts","requests_status","requests_acc_no")),
+    (4,"client lookup indexes",indexes("clients_name","clients_mobile_no","clients_email_id","clients_type")),
+    (5,"employee lookup indexes",indexes("employees_name","employees_hire_date","employees_birth_date")),
+    (6,"int keys",widen_keys),
+    (7,"client name trigrams",trigrams),
+    (8,"password hashes",password_hashes),
+    (9,"binary client name trigrams",binary_trigrams),
+    (10,"panel passwords",panel_passwords),
+    (11,"opening balances",opening_balances),
+]
+
+#------------------------------Runner------------------------------
+
+def applied(cur):
+#{version: (name,applied)}
+    cur.execute(SCHEMA_MIGRATIONS)
+    cur.execute("select version,name,applied from schema_migrations")
+    return {version:(name,when) for version,name,when in cur.fetchall()}
+
+def pending(conn):
+    cur=conn.cursor(buffered=True)
+    try:
+        done=applied(cur)
+    finally:
+        cur.close()
+    return [m for m in MIGRATIONS if m[0] not in done]
+
+def migrate(conn,ask=None):
+#applies the pending migrations, returns False when one of them failed
+    cur=conn.cursor(buffered=True)
+    try:
+        done=applied(cur)
+        for version,name,step in MIGRATIONS:
+            if version in done:
+                continue
+            print("Applying migration {} ({}): ".format(version,name),end='')
+            try:
+                step(conn,cur,ask)
+                cur.execute("INSERT INTO schema_migrations VALUES(%s,%s,%s)",(version,name,datetime.now()))
+            except (errors.BankError,mysql.connector.Error) as err:
+                print(err.msg)
+                print("-----------Migration was unsuccessful!!!!-------------")
+                return False
+            print("OK")
+    finally:
+        cur.close()
+    return True
+
+def main(argv=None):
+    parser=argparse.ArgumentParser(description="Apply the pending schema migrations.")
+    parser.add_argument("--list",action="store_true",help="show the migrations and whether they are applied")
+    args=parser.parse_args(argv)
+    if connection.cc(size=1) is None:
+        print("Run main.py and finish the setup first.")
+        return 1
+    try:
+        with connection.pool.connection() as conn:
+            return run(conn,args.list)
+    except mysql.connector.Error as err:
+        print(err.msg)
+        print("-----------Migration was unsuccessful!!!!-------------")
+        return 1
+    finally:
+        connection.pool.close()
+
+def run(conn,list_only):
+    if list_only:
+        cur=conn.cursor(buffered=True)
+        try:
+            done=applied(cur)
+        finally:
+            cur.close()
+        for version,name,step in MIGRATIONS:
+            when=done[version][1] if version in done else "pending"
+            print("{:>3} {:<45} {}".format(version,name,when))
+        return 0
+    if not pending(conn):
+        print("Nothing to migrate.")
+        return 0
+    return 0 if migrate(conn,ask_panel_password) else 1
+
+if __name__=="__main__":
+    sys.exit(main())
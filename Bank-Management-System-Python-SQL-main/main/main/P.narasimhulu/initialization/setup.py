@@ -1,124 +1,36 @@
 from initialization import check
+from initialization import config
+from initialization import migrate
 
-import pickle
-import mysql.connector
+from tools import backends
 
-from mysql.connector import errorcode
-existing=0
+existing=False
 
 conn=None
 cursor=None
 
-TABLES = {}
-TABLES['employees'] = (
-    "CREATE TABLE `employees` ("
-    "  `emp_no` int(5) NOT NULL ,"
-    "  `birth_date` date NOT NULL,"
-    "  `first_name` varchar(15) NOT NULL,"
-    "  `last_name` varchar(15) NOT NULL,"
-    "  `gender` enum('M','F') NOT NULL,"
-    "  `hire_date` date NOT NULL,"
-    "  PRIMARY KEY (`emp_no`)"
-    ") ")
-
-TABLES['clients'] = (
-    "CREATE TABLE `clients` ("
-    "  `acc_no` int NOT NULL PRIMARY KEY,"
-    "  `type` enum('S','C') NOT NULL,"
-    "  `first_name` varchar(15) NOT NULL,"
-    "  `last_name` varchar(15) NOT NULL,"
-    "  `gender` enum('M','F') NOT NULL,"
-    "  `birth_date` date NOT NULL,"
-    "  `accd` date NOT NULL,"
-    "  `mobile_no` varchar(20) NOT NULL,"
-    "  `email_id` varchar(25) NOT NULL,"
-    "  `pass` varchar(8) NOT NULL"
-    ") "
-)
-
-TABLES['empass'] = (
-    "CREATE TABLE `empass` ("
-    "  `emp_no` int(5) NOT NULL,"
-    "  `pass` varchar(8) NOT NULL,"
-    "  PRIMARY KEY (`emp_no`)"
-    ") "
-)
-
-
-TABLES['savings'] = (
-    "CREATE TABLE `savings` ("
-    "  `acc_no` int(5) NOT NULL,"
-    "  `balance` int NOT NULL,"
-    "  `loan` enum('YES','NO') NOT NULL,"
-    "  PRIMARY KEY (`acc_no`)"
-    ") "
-)
-
-TABLES['current'] = (
-    "CREATE TABLE `current` ("
-    "  `acc_no` int(5) NOT NULL,"
-    "  `balance` int NOT NULL,"
-    "  `overdraft` enum('YES','NO') NOT NULL,"
-    "  PRIMARY KEY (`acc_no`)"
-    ") "
-)
-
-TABLES['loan'] = (
-    "CREATE TABLE `loan` ("
-    "  `acc_no` int(5) NOT NULL,"
-    "  `loan_type` enum('PL','HL','EL','TL','BL') NOT NULL,"
-    "  `loan_amt` int NOT NULL,"
-    "  `time_period_months` int NOT NULL,"
-    "  `iterest_perc_per_annum` int(1) NOT NULL,"
-    "  `amt-per-month` int NOT NULL,"
-    "  `remaining_amt` int NOT NULL,"
-    "  PRIMARY KEY (`acc_no`)"
-    ") "
-)
-
-TABLES['overdraft']=(
-    "CREATE TABLE `overdraft` ("
-    "  `acc_no` int(5) NOT NULL,"
-    "  `overdraft_amt` int NOT NULL,"
-    "  `od_with_interest_remaining` int NOT NULL,"
-    "  PRIMARY KEY (`acc_no`)"
-    ") "
-)
-
-TABLES['cash_in_hand']=(
-    "CREATE TABLE `cash_in_hand` ("
-    "  `acc_no` int(5) NOT NULL,"
-    "  `cash_in_hand` int NOT NULL,"
-    "  PRIMARY KEY (`acc_no`)"
-    ") "
-)
-
-
+#Every table, view and index comes from initialization/migrate
 ############################################################################################
 query=""
 Password=""
 Database=""
 def sqlpwd():
     global Password
-    cred = open("files//cred.dat","rb")
-    dat=pickle.load(cred)
-    cred.close()
-    Password=dat[0]
+    Password=config.load().password
     return Password
 
 def sqldb():
     global Database
-    cred = open("files//cred.dat","rb")
-    dat=pickle.load(cred)
-    cred.close()
-    Database=dat[1]
+    Database=config.load().database
     return Database
 
+def sqlbackend():
+    return config.load().backend
+
 def connectionquery():
     try:
-        Databa=sqldb()
-        Passwo=sqlpwd()
-        query=mysql.connector.connect(host="localhost",user="root",password=Passwo,database=Databa)
+        cfg=config.load()
+        query=backends.connector(cfg.password,cfg.database,cfg.backend,host=cfg.host,user=cfg.user,port=cfg.port)()
     except:
         import traceback
         traceback.print_exc()
@@ -127,7 +39,6 @@ def connectionquery():
 
 def querycheck():
     global conn
-    global cursor
     global existing
     conn=connectionquery()
     ans=False
@@ -135,25 +46,12 @@ def querycheck():
         if conn.is_connected:
             print("Connection established successfully.")
             if check.check()==True:
-                cursor=conn.cursor()
-                #Table creation
-                for table_name in TABLES:
-                    table_description = TABLES[table_name]
-                    try:
-                        print("Creating table {}: ".format(table_name), end='')
-                        cursor.execute(table_description)
-                        existing+=1
-                    except mysql.connector.Error as err:
-                        if err.errno == errorcode.ER_TABLE_EXISTS_ERROR:
-                            print("already exists.")
-                            existing+=1
-                        else:
-                            print(err.msg)
-                    else:
-                        print("OK")
-            if existing==8:
-                with open("files//firsttime.txt","w") as f:
-                    f.write("False")
+                #the migrations also ask for the panel passwords, a new database
+                #gets its own before the menu can be reached
+                if migrate.migrate(conn,migrate.ask_panel_password):
+                    existing=True
+            if existing:
+                config.setup_done()
                 ans=True
         
     if not ans:
@@ -167,10 +65,16 @@ def mysqlsetup():
     print("Create a database in your MYSQL Workbench.\n")
     Database=input("Enter database name: ")
     Password=input("Enter sql password (enter '' if nothing):")
-    cred2= open("files//cred.dat","wb")
-    data=[Password,Database]
-    pickle.dump(data,cred2)
-    cred2.close()
+    config.save(Password,Database,backends.MYSQL)
+    querycheck()
+
+def standalonesetup():
+    print("\n-----------------Standalone Setup-------------------\n")
+    print("The data is kept in a SQLite data file on this computer.\n")
+    Database=input("Enter data file name (enter '' for files//bank.db): ")
+    if Database=="":
+        Database="files//bank.db"
+    config.save("",Database,backends.SQLITE)
     querycheck()
 
 def setup():
@@ -189,10 +93,10 @@ def setup():
             break
         elif ans2=="1":
             mysqlsetup()
-            if existing==7:
+            if existing:
                 continue
         elif ans2=="2":
-            print("\nThis is under development :). Please use mysql till then...")
+            standalonesetup()
         else:
             print("\nWrong input, (1/2).........")
     else: 
@@ -8,8 +8,9 @@ while True:
     a=input("Enter your choice(1,2): ")
     if a == "1":
         if not check.check():
-            query,cur=connection.cc()
-            accounttype.acctype(query,cur)
+            connection.cc()
+            accounttype.acctype()
+            connection.pool.close()
             break
         else:
             setup.setup()
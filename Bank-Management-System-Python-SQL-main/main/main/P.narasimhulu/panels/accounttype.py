@@ -1,7 +1,25 @@
 from panels import adminpanel
 from panels import employeepanel
 from panels import clientpanel
-def acctype(query,cur):
+from tools import connection
+from tools import errors
+from tools import operations
+
+def panel_login(panel):
+#the panel passwords are asked for by the migrations (setup or python -m initialization.migrate),
+#never from here
+    b=input("\nEnter {} password:".format(panel.lower()))
+    with connection.borrow() as (conn,cur):
+        try:
+            if operations.login_panel(conn,panel,b):
+                return True
+        except errors.NotFound as err:
+            print("\n"+err.msg+", it can be set from option 6 of the admin panel\n")
+            return False
+    print("\nWrong password!\n")
+    return False
+
+def acctype():
     while True:
         print("--------------Account Selector Menu--------------")
         print("1.Admin.")
@@ -11,21 +29,15 @@ def acctype(query,cur):
         a=input("\nEnter your account type:")
         
         if a=='1':
-            b=input("\nEnter admin password:")
-            if b=="admin123":
-                adminpanel.ap(query,cur)
-            else:
-                print("\nWrong password!\n") 
+            if panel_login("ADMIN"):
+                adminpanel.ap()
             
         elif a=='2':
-            b=input("\nEnter employee password:")
-            if b=="emp123":
-                employeepanel.ep(query,cur)
-            else:
-                print("\nWrong password!\n")
+            if panel_login("EMPLOYEE"):
+                employeepanel.ep()
         
         elif a=='3':
-            clientpanel.cp(query,cur)
+            clientpanel.cp()
         
         elif a=='~':
             print("\nShutting down the program.")
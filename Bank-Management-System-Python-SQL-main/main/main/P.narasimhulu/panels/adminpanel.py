@@ -2,7 +2,11 @@ from admin import hireemployee
 from admin import fireemployee
 from admin import editemployee
 from admin import showemployee
-def ap(query,conn):
+from tools import connection
+from tools import dataentering
+from tools import metrics
+from tools import operations
+def ap():
     print("\nWelcome Admin!!")
     
     while True:
@@ -11,18 +15,35 @@ def ap(query,conn):
         print("2.Fire Employee")
         print("3.Change employee data")
         print("4.Show employee table")
+        print("5.Show operation timings")
+        print("6.Change admin/employee panel password")
         print("\nInput 0 to quit.")
         a=input("Enter choice:")
         if a=='1':
-            hireemployee.ap1(query,conn)
+            hireemployee.ap1()
         elif a=='2':
-            fireemployee.ap2(query,conn)
+            fireemployee.ap2()
         elif a=='3':
-            editemployee.ap3(query,conn)
+            editemployee.ap3()
         elif a=='4':
-            showemployee.ap4(conn)
+            showemployee.ap4()
+        elif a=='5':
+            metrics.report()
+        elif a=='6':
+            panelpassword()
         elif a=='0':
             print("Quit Admin Panel.")
             break
         else:
-            print("Wrong input!(1,2,3)")
\ No newline at end of file
+            print("Wrong input!(1,2,3,4,5,6)")
+
+def panelpassword():
+    panel=input("Which panel, A for admin or E for employee: ").upper()
+    if panel not in ("A","E"):
+        print("Wrong input!(A,E)")
+        return
+    panel="ADMIN" if panel=="A" else "EMPLOYEE"
+    password=dataentering.panelpassword("new "+panel.lower())
+    with connection.borrow() as (conn,cur):
+        operations.set_panel_password(conn,panel,password)
+    print("Password changed successfully!!!")
\ No newline at end of file
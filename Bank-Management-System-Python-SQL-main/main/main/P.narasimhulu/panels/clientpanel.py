@@ -4,31 +4,43 @@ from client import depositmoney
 from client import withdrawmoney
 from client import loan_od
 from client import transfermoney
-def cp(conn,cur):
+from client import statement
+from tools import connection
+from tools import queries
+from tools import cache
+from tools import operations
+def cp():
     print("\n------------------Client Panel------------------")
     print("Welcome client!!")
     acc_no=dataentering.primary_key_no("acc_no")
-    cur.execute("select first_name,last_name,pass,type from clients where acc_no = {}".format(acc_no))
-    result=cur.fetchall()
-    if result == []:
+    with connection.borrow() as (conn,cur):
+        result=cache.client(conn,acc_no)
+    if result is None:
         print("No account holder with this account number.")
     else:
-        acc_type=result[0][3]
+        acc_type=result[1]
         if acc_type == 'S': acc_type="savings"
         if acc_type == 'C': acc_type="current"
         while True:
             print("\nInput ~ to quit")
             passwd=input("Enter password to continue: ")
             if passwd == "~":
+                #end of the session, see ledger.cash_in_hand
+                cache.forget_cash(acc_no)
                 break
-            elif passwd == result[0][2]:
-                print("\n--------------------Welcome {} {}-------------------".format(result[0][0],result[0][1]))
-                cmenu(conn,cur,acc_no,acc_type)
+            elif login(acc_no,passwd):
+                print("\n--------------------Welcome {} {}-------------------".format(result[2],result[3]))
+                cmenu(acc_no,acc_type)
             else:
                 print("Wrong password")
             
-def cmenu(conn,cur,acc_no,acc_type):
-    cash_in_hand=dataentering.handcash(conn,cur,acc_no)
+def login(acc_no,passwd):
+    with connection.borrow() as (conn,cur):
+        return operations.login_client(conn,acc_no,passwd)
+
+def cmenu(acc_no,acc_type):
+    with connection.borrow() as (conn,cur):
+        cash_in_hand=dataentering.handcash(conn,cur,acc_no)
     print("\n Your Cash_In_Hand is {} currency".format(cash_in_hand))
     print()
     print("1.Show Balance")
@@ -40,26 +52,27 @@ def cmenu(conn,cur,acc_no,acc_type):
     else:
         print("5.Check overdraft status")
     print("6.Transfer money to other account")
+    print("7.Account statement")
     print("~ to quit")
     choice=input("Enter your choice: ")
     if choice=="~": pass
     elif choice=="1":
-        cur.execute("select balance from {} where acc_no={}".format(acc_type,acc_no))
-        balance=cur.fetchall()
-        print("Your balance is: ",balance[0][0])
+        with connection.borrow() as (conn,cur):
+            balance=queries.fetchone(conn,"balance",(acc_no,))
+        print("Your balance is: ",balance[0])
         print()
+#the screens borrow a connection around each operation, never across a prompt
     elif choice=="2":
-        depositmoney.cp2(conn,cur,acc_type,acc_no)
+        depositmoney.cp2(acc_type,acc_no)
     elif choice=="3":
-        withdrawmoney.cp3(conn,cur,acc_type,acc_no)
+        withdrawmoney.cp3(acc_type,acc_no)
     elif choice=="4":
-        redeemcode.cp4(conn,cur,acc_type,acc_no)
+        redeemcode.cp4(acc_type,acc_no)
     elif choice=="5":
-        loan_od.cp5(cur,acc_type,acc_no)
+        loan_od.cp5(acc_type,acc_no)
     elif choice=="6":
-        cur.execute("select balance from {} where acc_no={}".format(acc_type,acc_no))
-        balance=cur.fetchall()
-        balance=balance[0][0]
-        transfermoney.cp6(conn,cur,acc_type,acc_no,balance)
+        transfermoney.cp6(acc_type,acc_no)
+    elif choice=="7":
+        statement.cp7(acc_no)
     else:
         print("Wrong input!!!!\n")
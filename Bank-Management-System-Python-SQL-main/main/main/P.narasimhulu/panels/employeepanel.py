@@ -2,8 +2,15 @@ from employee import createaccount
 from employee import editaccount
 from employee import deleteaccount
 from employee import showaccounts
+from employee import loanrequests
+from employee import findclient
+from tools import connection
+from tools import queries
+from tools import cache
+from tools import dataentering
+from tools import operations
 
-def ep(conn,cur):
+def ep():
     print("\nWelcome employee!!")
     print("Please log in with your creds (emp_id and password):")
     print("---------------------Employee Panel--------------------")
@@ -20,8 +27,8 @@ def ep(conn,cur):
         print("Wrong input!!!(1 or 2 only)")
     if logged_in:
         while True:
-            emp_no=input("Enter emp_no (max 5 int): ")
-            if len(emp_no) <= 5:
+            emp_no=input("Enter emp_no (max {} int): ".format(dataentering.KEY_DIGITS))
+            if len(emp_no) <= dataentering.KEY_DIGITS:
                 try:
                     emp_no=int(emp_no)
                     print("Done OK")
@@ -30,45 +37,53 @@ def ep(conn,cur):
                 else:
                     break
             else:
-                print("Maximum length is 5!")
+                print("Maximum length is {}!".format(dataentering.KEY_DIGITS))
 
-        cur.execute("select * from empass where emp_no = {}".format(emp_no))
-        record=cur.fetchall()
-        if record == []:
+        with connection.borrow() as (conn,cur):
+            record=queries.fetchone(conn,"empass",(emp_no,))
+        if record is None:
             print("This emp_no doesn't exist!!!")
         else:
             while True:
-                password=record[0][1]
                 print("\nInput ~ to quit.")
                 a=input("Enter your password to continue:")
                 print()
-                if a==password:
-                    choice=menu(emp_no,cur)
+                if a == "~" : break
+                with connection.borrow() as (conn,cur):
+                    logged_in=operations.login_employee(conn,emp_no,a)
+                if logged_in:
+                    choice=menu(emp_no)
+                    #the screens borrow a connection around each operation, never across a prompt
                     if choice=="1":
-                        createaccount.ep1(conn,cur)
+                        createaccount.ep1()
                     elif choice=="2":
-                        editaccount.ep2(conn,cur)
+                        editaccount.ep2()
                     elif choice=="3":
-                        deleteaccount.ep3(conn,cur)
+                        deleteaccount.ep3()
                     elif choice=="4":
-                        showaccounts.ep4(cur)
+                        showaccounts.ep4()
+                    elif choice=="5":
+                        loanrequests.ep5(emp_no)
+                    elif choice=="6":
+                        findclient.ep6()
                     elif choice=="0":
                         break
                     else:
                         print("Wrong input!")
-                elif a == "~" : break
                 else:
                     print("Wrong password!!")
                     break
 
-def menu(x,cur):
-    cur.execute("select first_name,last_name from employees where emp_no = {}".format(x))
-    record=cur.fetchone()
-    print("---------------Welcome {} {} ----------------".format(record[0],record[1]))
+def menu(x):
+    with connection.borrow() as (conn,cur):
+        record=cache.employee(conn,x)
+    print("---------------Welcome {} {} ----------------".format(record[2],record[3]))
     print("1.Create client account")
     print("2.Change client details")
     print("3.Close client account")
     print("4.Show client table")
+    print("5.Loan/overdraft requests")
+    print("6.Find a client")
     print("Enter 0 to quit.")
     choice=input("Enter your choice: ")
     return choice
\ No newline at end of file
@@ -0,0 +1,353 @@
+#HTTP/JSON front-end for tellers and ATMs.
+#Run from this folder after the setup is done:
+#  BANK_SERVER_TOKEN=<secret> python server.py --port 8080
+#
+#Every /accounts and /transfers request needs "Authorization: Bearer <secret>",
+#the secret is shared with the tellers and ATMs only, clients never see it.
+#Wrong passwords on /login lock that account's logins for a while (429).
+#The server listens on 127.0.0.1 unless --host says otherwise, put it behind
+#a TLS proxy before opening it to other machines.
+#
+#  GET    /accounts/<acc_no>            client details and balance
+#  GET    /accounts/<acc_no>/balance
+#  POST   /accounts                     {"acc_no":..,"type":"S","first_name":..,..,"balance":1000}
+#  PATCH  /accounts/<acc_no>            {"mobile_no":"9876543210"}
+#  DELETE /accounts/<acc_no>
+#  POST   /accounts/<acc_no>/deposit    {"amount":500}
+#  POST   /accounts/<acc_no>/withdraw   {"amount":500}
+#  POST   /accounts/<acc_no>/login      {"pass":..}, 401 when the password is wrong,
+#                                        429 after MAX_FAILURES wrong ones in a row
+#  POST   /transfers                    {"from_acc":..,"to_acc":..,"amount":..}
+#  GET    /metrics                      timings of the operations (tools/metrics), no token
+#
+#--metrics-file also writes the timings every --metrics-every seconds, in the
+#Prometheus text format (or JSON when the file name ends in .json).
+#
+#The database work runs on a thread pool with one thread per pooled connection,
+#the event loop only parses requests and writes responses. Passwords are checked on
+#the threads of tools/passwords, so a login doesn't hold a database connection
+#while scrypt runs.
+import argparse
+import asyncio
+import hmac
+import json
+import os
+import re
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+import mysql.connector
+from tools import cache
+from tools import connection
+from tools import errors
+from tools import metrics
+from tools import operations
+from tools import passwords
+
+WORKERS=16
+MAX_BODY=64*1024
+#requests waiting for a connection beyond this get 503
+MAX_WAITING=1024
+METRICS_EVERY=15
+TOKEN_ENV="BANK_SERVER_TOKEN"
+#wrong passwords in a row before the logins of an account are refused for LOCKOUT seconds
+MAX_FAILURES=5
+LOCKOUT=300
+
+STATUS={200:"OK",201:"Created",400:"Bad Request",401:"Unauthorized",404:"Not Found",405:"Method Not Allowed",
+        411:"Length Required",413:"Payload Too Large",429:"Too Many Requests",500:"Internal Server Error",503:"Service Unavailable"}
+
+class HTTPError(Exception):
+#close is for errors found before the body was read, the connection can't be reused
+    def __init__(self,status,msg,close=False):
+        super().__init__(msg)
+        self.status=status
+        self.msg=msg
+        self.close=close
+
+#the widest integer the databases keep
+MAX_INT=2**63-1
+
+def number(value,x):
+#like dataio.convert, 1.5 (or true) is not an integer
+    if isinstance(value,(bool,float)):
+        raise HTTPError(400,"{} should be an integer".format(x))
+    try:
+        value=int(value)
+    except (TypeError,ValueError):
+        raise HTTPError(400,"{} should be an integer".format(x))
+    if abs(value)>MAX_INT:
+        raise HTTPError(400,"{} is too large".format(x))
+    return value
+
+def text(value,x):
+    if not isinstance(value,str):
+        raise HTTPError(400,"{} should be a string".format(x))
+    return value
+
+def mobile(value):
+#"0987654321" keeps its leading zero, a JSON number is taken as it is
+    if isinstance(value,int) and not isinstance(value,bool):
+        return str(value)
+    return text(value,"mobile_no")
+
+def day(value,x):
+    try:
+        return date.fromisoformat(value)
+    except (TypeError,ValueError):
+        raise HTTPError(400,"{} should be a YYYY-MM-DD date".format(x))
+
+def field(body,x):
+    if x not in body:
+        raise HTTPError(400,"{} is missing".format(x))
+    return body[x]
+
+#------------------------------Handlers------------------------------
+#Each handler runs on a worker thread with its own pooled connection.
+
+#client fields that are strings in the JSON (mobile_no may be a number too)
+TEXT_FIELDS=("type","first_name","last_name","gender","email_id","pass")
+
+def get_account(conn,acc_no,body):
+    account=operations.get_account(conn,acc_no)
+    account["balance"]=operations.balance(conn,acc_no)
+    return 200,account
+
+def get_balance(conn,acc_no,body):
+    return 200,{"acc_no":acc_no,"balance":operations.balance(conn,acc_no)}
+
+def create_account(conn,acc_no,body):
+    acc_no=number(field(body,"acc_no"),"acc_no")
+    fields={x:text(field(body,x),x) for x in TEXT_FIELDS}
+    operations.create_account(conn,acc_no,fields["type"],fields["first_name"],
+                              fields["last_name"],fields["gender"],
+                              day(field(body,"birth_date"),"birth_date"),day(field(body,"accd"),"accd"),
+                              mobile(field(body,"mobile_no")),fields["email_id"],fields["pass"],
+                              number(field(body,"balance"),"balance"))
+    return 201,{"acc_no":acc_no}
+
+def edit_account(conn,acc_no,body):
+    changes=dict(body)
+    for x in TEXT_FIELDS:
+        if x in changes:
+            text(changes[x],x)
+    for x in ("birth_date","accd"):
+        if x in changes:
+            changes[x]=day(changes[x],x)
+    if "mobile_no" in changes:
+        changes["mobile_no"]=mobile(changes["mobile_no"])
+    operations.edit_account(conn,acc_no,**changes)
+    return 200,{"acc_no":acc_no}
+
+def delete_account(conn,acc_no,body):
+    operations.delete_account(conn,acc_no)
+    return 200,{"acc_no":acc_no}
+
+def deposit(conn,acc_no,body):
+    balance,cash_in_hand=operations.deposit(conn,acc_no,number(field(body,"amount"),"amount"))
+    return 200,{"acc_no":acc_no,"balance":balance,"cash_in_hand":cash_in_hand}
+
+def withdraw(conn,acc_no,body):
+    balance,cash_in_hand=operations.withdraw(conn,acc_no,number(field(body,"amount"),"amount"))
+    return 200,{"acc_no":acc_no,"balance":balance,"cash_in_hand":cash_in_hand}
+
+def transfer(conn,acc_no,body):
+    from_acc=number(field(body,"from_acc"),"from_acc")
+    balance=operations.transfer(conn,from_acc,number(field(body,"to_acc"),"to_acc"),
+                                number(field(body,"amount"),"amount"))
+    return 200,{"acc_no":from_acc,"balance":balance}
+
+def stored_password(conn,acc_no,body):
+    return operations.client_password(conn,acc_no)
+
+def rehash_password(conn,acc_no,body):
+    operations.rehash_client_password(conn,acc_no,body["stored"],body["pass"])
+
+async def login(server,acc_no,body):
+#runs on the event loop, the hash is read and written on the workers
+    password=text(field(body,"pass"),"pass")
+    failures=(server.failures.get(acc_no) or 0)+1
+    if failures>MAX_FAILURES:
+        raise HTTPError(429,"Too many wrong passwords, try again later")
+    #every attempt counts until it turns out right, so parallel guesses can't get past
+    #MAX_FAILURES (only the event loop counts, no await in between)
+    server.failures.put(acc_no,failures)
+    stored=await server.call(stored_password,acc_no,body)
+    if not await asyncio.wrap_future(passwords.verify_async(password,stored)):
+        raise HTTPError(401,"Wrong password")
+    server.failures.invalidate(acc_no)
+    if passwords.needs_rehash(stored):
+        await server.call(rehash_password,acc_no,{"pass":password,"stored":stored})
+    return 200,{"acc_no":acc_no}
+
+ROUTES=[
+    (re.compile(r"^/accounts/(\d+)$"),{"GET":get_account,"PATCH":edit_account,"DELETE":delete_account}),
+    (re.compile(r"^/accounts/(\d+)/balance$"),{"GET":get_balance}),
+    (re.compile(r"^/accounts/(\d+)/deposit$"),{"POST":deposit}),
+    (re.compile(r"^/accounts/(\d+)/withdraw$"),{"POST":withdraw}),
+    (re.compile(r"^/accounts/(\d+)/login$"),{"POST":login}),
+    (re.compile(r"^/accounts$"),{"POST":create_account}),
+    (re.compile(r"^/transfers$"),{"POST":transfer}),
+]
+
+def route(method,path):
+    for pattern,methods in ROUTES:
+        match=pattern.match(path)
+        if match:
+            if method not in methods:
+                raise HTTPError(405,"{} is not allowed here".format(method))
+            acc_no=number(match.group(1),"acc_no") if match.groups() else None
+            return methods[method],acc_no
+    raise HTTPError(404,"Unknown path")
+
+def run(handler,acc_no,body):
+    with connection.pool.connection() as conn:
+        return handler(conn,acc_no,body)
+
+#-------------------------------Server-------------------------------
+
+def authorized(headers,token):
+    scheme,_,given=headers.get("authorization","").partition(" ")
+    return scheme.lower()=="bearer" and hmac.compare_digest(given.strip().encode(),token.encode())
+
+class Server:
+    def __init__(self,token,workers=WORKERS,max_waiting=MAX_WAITING):
+        self.token=token
+        self.executor=ThreadPoolExecutor(max_workers=workers,thread_name_prefix="bank")
+        self.slots=asyncio.Semaphore(workers+max_waiting)
+        #wrong logins per account, forgotten LOCKOUT seconds after the last one
+        self.failures=cache.LRUCache(cache.CACHE_SIZE,LOCKOUT)
+
+    async def call(self,handler,acc_no,body):
+        if self.slots.locked():
+            raise HTTPError(503,"Too many requests, try again")
+        async with self.slots:
+            loop=asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(self.executor,run,handler,acc_no,body)
+            except errors.NotFound as err:
+                raise HTTPError(404,err.msg)
+            except errors.BankError as err:
+                raise HTTPError(400,err.msg)
+            except connection.PoolTimeout as err:
+                raise HTTPError(503,err.msg)
+            except mysql.connector.Error as err:
+                raise HTTPError(500,err.msg)
+
+    async def handle(self,reader,writer):
+        try:
+            while True:
+                try:
+                    head=await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError,asyncio.LimitOverrunError,ConnectionError):
+                    break
+                lines=head.decode("latin-1").split("\r\n")
+                try:
+                    method,target,version=lines[0].split(" ",2)
+                except ValueError:
+                    await self.respond(writer,400,{"error":"Bad request line"},False)
+                    break
+                headers={}
+                for line in lines[1:]:
+                    if ":" in line:
+                        name,value=line.split(":",1)
+                        headers[name.strip().lower()]=value.strip()
+                keep_alive=version=="HTTP/1.1" and headers.get("connection","").lower()!="close"
+                try:
+                    status,result=await self.dispatch(reader,method,target.split("?",1)[0],headers)
+                except HTTPError as err:
+                    status,result=err.status,{"error":err.msg}
+                    if err.close:
+                        keep_alive=False
+                except (asyncio.IncompleteReadError,ConnectionError):
+                    break
+                except Exception:
+                    #a bug in one request must not take the connection or the server down,
+                    #the body may not have been read so the connection is closed after the answer
+                    traceback.print_exc()
+                    status,result,keep_alive=500,{"error":"Internal error"},False
+                await self.respond(writer,status,result,keep_alive)
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    async def dispatch(self,reader,method,path,headers):
+        if path=="/metrics":
+            if method!="GET":
+                raise HTTPError(405,"{} is not allowed here".format(method))
+            return 200,metrics.snapshot()
+        handler,acc_no=route(method,path)
+        if not authorized(headers,self.token):
+            raise HTTPError(401,"A teller token is required")
+        body={}
+        if method in ("POST","PATCH"):
+            if "content-length" not in headers:
+                raise HTTPError(411,"Content-Length is required",True)
+            try:
+                length=int(headers["content-length"])
+            except ValueError:
+                raise HTTPError(400,"Content-Length should be an integer",True)
+            if length<0:
+                raise HTTPError(400,"Content-Length can't be negative",True)
+            if length>MAX_BODY:
+                raise HTTPError(413,"Body is too large",True)
+            raw=await reader.readexactly(length)
+            try:
+                body=json.loads(raw or b"{}")
+            except ValueError:
+                raise HTTPError(400,"Body should be JSON")
+            if not isinstance(body,dict):
+                raise HTTPError(400,"Body should be a JSON object")
+        if asyncio.iscoroutinefunction(handler):
+            return await handler(self,acc_no,body)
+        return await self.call(handler,acc_no,body)
+
+    async def respond(self,writer,status,result,keep_alive):
+        payload=json.dumps(result,default=str).encode()
+        head=("HTTP/1.1 {} {}\r\nContent-Type: application/json\r\nContent-Length: {}\r\n"
+              "Connection: {}\r\n\r\n").format(status,STATUS[status],len(payload),"keep-alive" if keep_alive else "close")
+        writer.write(head.encode()+payload)
+        await writer.drain()
+
+async def export(path,every):
+    while True:
+        await asyncio.sleep(every)
+        try:
+            metrics.write(path)
+        except OSError as err:
+            print("Couldn't write {}: {}".format(path,err))
+
+async def serve(host,port,workers,token,metrics_file=None,metrics_every=METRICS_EVERY):
+    server=Server(token,workers)
+    listener=await asyncio.start_server(server.handle,host,port)
+    print("Serving on http://{}:{}".format(host,port))
+    if metrics_file:
+        asyncio.ensure_future(export(metrics_file,metrics_every))
+    async with listener:
+        await listener.serve_forever()
+
+def main(argv=None):
+    parser=argparse.ArgumentParser(description="HTTP/JSON server for the bank operations.")
+    parser.add_argument("--host",default="127.0.0.1")
+    parser.add_argument("--port",type=int,default=8080)
+    parser.add_argument("--workers",type=int,default=WORKERS,help="database connections and worker threads")
+    parser.add_argument("--metrics-file",help="write the operation timings to this file")
+    parser.add_argument("--metrics-every",type=float,default=METRICS_EVERY,help="seconds between writes")
+    args=parser.parse_args(argv)
+    token=os.environ.get(TOKEN_ENV)
+    if not token:
+        print("Set {} to the secret the tellers and ATMs send (Authorization: Bearer <secret>).".format(TOKEN_ENV))
+        return
+    if connection.cc(size=args.workers) is None:
+        print("Run main.py and finish the setup first.")
+        return
+    try:
+        asyncio.run(serve(args.host,args.port,args.workers,token,args.metrics_file,args.metrics_every))
+    except KeyboardInterrupt:
+        print("Shutting down the server")
+    finally:
+        connection.pool.close()
+
+if __name__=="__main__":
+    main()
@@ -1,6 +0,0 @@
-file=open("files//config.txt","r")
-x=file.read()
-print(x)
-#alter table current modify column overdraft enum('YES','NO');
-#alter table current drop foreign key current_ibfk_1;
-#alter table savings drop foreign key savings_ibfk_1;
\ No newline at end of file
@@ -0,0 +1,7 @@
+#Behaviour tests, run from this folder with:
+#  python -m unittest discover -s tests -t .
+#A low scrypt cost keeps the password hashing of the tests fast, it has to be set
+#before tools.passwords is imported.
+import os
+
+os.environ.setdefault("BANK_SCRYPT_N","1024")
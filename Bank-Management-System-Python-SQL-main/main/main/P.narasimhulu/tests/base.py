@@ -0,0 +1,70 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import ExitStack, redirect_stdout
+from datetime import date
+from initialization import migrate
+from tools import backends
+from tools import cache
+from tools import connection
+from tools import operations
+
+#The tests run on a new SQLite file, set BANK_TEST_DB to run them on a MySQL
+#database they are allowed to empty instead, for example:
+#  BANK_TEST_DB=bank_test BANK_TEST_PASSWORD=... python -m unittest discover -s tests -t .
+DATABASE=os.environ.get("BANK_TEST_DB")
+SQL_PASSWORD=os.environ.get("BANK_TEST_PASSWORD","")
+PASSWORD="Pass@123"
+#what the admin types when the migrations ask for the panel passwords
+PANEL_PASSWORD="Panl@123"
+
+def empty(conn):
+#drops everything in the MySQL test database
+    cur=conn.cursor()
+    try:
+        cur.execute("SET FOREIGN_KEY_CHECKS=0")
+        cur.execute("SELECT table_name,table_type FROM information_schema.tables WHERE table_schema=DATABASE()")
+        for name,kind in cur.fetchall():
+            cur.execute("DROP {} `{}`".format("VIEW" if kind=="VIEW" else "TABLE",name))
+        cur.execute("SET FOREIGN_KEY_CHECKS=1")
+    finally:
+        cur.close()
+
+class BankTest(unittest.TestCase):
+    def setUp(self):
+        if DATABASE:
+            connect=backends.connector(SQL_PASSWORD,DATABASE,backends.MYSQL)
+        else:
+            folder=tempfile.mkdtemp(prefix="bank-test-"); self.addCleanup(shutil.rmtree,folder,True)
+            connect=backends.connector("",os.path.join(folder,"bank.db"),backends.SQLITE)
+        conn=connect()
+        try:
+            if DATABASE:
+                empty(conn)
+            with redirect_stdout(io.StringIO()):
+                self.assertTrue(migrate.migrate(conn,lambda panel:PANEL_PASSWORD))
+        finally:
+            conn.close()
+        connection.pool=connection.ConnectionPool(connect,4); self.addCleanup(connection.pool.close)
+        for each in (cache.clients,cache.employees,cache.cash): each.clear()
+        stack=ExitStack(); self.addCleanup(stack.close)
+        self.conn=stack.enter_context(connection.pool.connection())
+
+    def open_account(self,acc_no,balance=10000,acc_type="S",first_name="Ravi",last_name="Kumar"):
+        operations.create_account(self.conn,acc_no,acc_type,first_name,last_name,"M",date(1990,1,1),date(2015,1,1),"9876543210","ravi@bank.in",PASSWORD,balance)
+
+    def give_cash(self,acc_no,amount):
+        self.execute("INSERT INTO cash_in_hand VALUES(%s,%s) ON DUPLICATE KEY UPDATE cash_in_hand=VALUES(cash_in_hand)",
+                     (acc_no,amount))
+        cache.forget_cash(acc_no)
+
+    def execute(self,sql,data=()):
+        cur=self.conn.cursor(buffered=True)
+        try:
+            cur.execute(sql,data)
+            if cur.with_rows:
+                return cur.fetchall()
+        finally:
+            cur.close()
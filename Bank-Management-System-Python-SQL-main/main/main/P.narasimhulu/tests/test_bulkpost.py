@@ -0,0 +1,27 @@
+import os
+import shutil
+import tempfile
+import unittest
+from tools import bulkpost
+
+class ReadRowsTest(unittest.TestCase):
+    def rows(self,name,text):
+        folder=tempfile.mkdtemp(prefix="bank-test-"); self.addCleanup(shutil.rmtree,folder,True)
+        path=os.path.join(folder,name)
+        with open(path,"w") as f:
+            f.write(text)
+        return list(bulkpost.read_rows(path))
+
+    def test_csv(self):
+        self.assertEqual(self.rows("postings.csv","from_acc,to_acc,amount\n1001,1002,50\n1001,1002,1.5\n"),
+                         [(2,1001,1002,50),(3,None,None,None)])
+
+    def test_jsonl_amounts_must_be_integers(self):
+        rows=self.rows("postings.jsonl",'{"from_acc":1001,"to_acc":1002,"amount":50}\n'
+                                        '{"from_acc":1001,"to_acc":1002,"amount":"60"}\n'
+                                        '{"from_acc":1001,"to_acc":1002,"amount":1.5}\n'
+                                        '{"from_acc":1001,"to_acc":1002,"amount":true}\n'
+                                        '{"from_acc":true,"to_acc":1002,"amount":5}\n'
+                                        '{"from_acc":1001,"to_acc":1002}\n'
+                                        '[1001,1002,5]\n')
+        self.assertEqual(rows,[(1,1001,1002,50),(2,1001,1002,60)]+[(line,None,None,None) for line in range(3,8)])
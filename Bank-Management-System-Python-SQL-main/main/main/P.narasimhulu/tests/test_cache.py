@@ -0,0 +1,26 @@
+import time
+import unittest
+from tools import cache
+
+class LRUCacheTest(unittest.TestCase):
+    def test_least_recently_used_entry_is_dropped(self):
+        lru=cache.LRUCache(2)
+        lru.put(1,"a")
+        lru.put(2,"b")
+        lru.get(1)
+        lru.put(3,"c")
+        self.assertEqual((lru.get(1),lru.get(2),lru.get(3)),("a",None,"c"))
+
+    def test_expired_entries_are_missing(self):
+        lru=cache.LRUCache(ttl=0.01)
+        lru.put(1,"a")
+        time.sleep(0.02)
+        self.assertIsNone(lru.get(1))
+        self.assertEqual((lru.hits,lru.misses),(0,1))
+
+    def test_invalidate(self):
+        lru=cache.LRUCache()
+        lru.put(1,"a")
+        lru.invalidate(1)
+        lru.invalidate(2)
+        self.assertIsNone(lru.get(1))
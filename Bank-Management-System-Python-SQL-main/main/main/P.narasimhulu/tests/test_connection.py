@@ -0,0 +1,142 @@
+import threading
+import time
+import unittest
+import mysql.connector
+from mysql.connector import errorcode
+from tools import connection
+from tests import base
+
+class FakeConnection:
+    def __init__(self,number):
+        self.number=number
+        self.unread_result=False
+        self.in_transaction=False
+        self.alive=True
+        self.closed=False
+        self.rollbacks=0
+
+    def ping(self,reconnect=False):
+        if not self.alive:
+            raise mysql.connector.Error(msg="gone away")
+
+    def rollback(self):
+        self.rollbacks+=1
+        self.in_transaction=False
+
+    def close(self):
+        self.closed=True
+
+class PoolTest(unittest.TestCase):
+    def setUp(self):
+        self.opened=[]
+
+    def connect(self):
+        conn=FakeConnection(len(self.opened))
+        self.opened.append(conn)
+        return conn
+
+    def pool(self,size=2,**options):
+        pool=connection.ConnectionPool(self.connect,size,**options)
+        self.addCleanup(pool.close)
+        return pool
+
+    def test_connections_are_reused(self):
+        pool=self.pool()
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            self.assertIs(second,first)
+        self.assertEqual(len(self.opened),1)
+
+    def test_no_more_than_size_connections(self):
+        pool=self.pool(size=2,timeout=0.05)
+        with pool.connection(),pool.connection():
+            with self.assertRaises(connection.PoolTimeout):
+                pool.get()
+        self.assertEqual(len(self.opened),2)
+
+    def test_a_waiting_operation_gets_the_returned_connection(self):
+        pool=self.pool(size=1,timeout=5)
+        conn=pool.get()
+        threading.Timer(0.05,pool.put,(conn,)).start()
+        self.assertIs(pool.get(),conn)
+
+    def test_an_open_transaction_is_rolled_back_on_return(self):
+        pool=self.pool()
+        with pool.connection() as conn:
+            conn.in_transaction=True
+        self.assertEqual(conn.rollbacks,1)
+
+    def test_the_connection_goes_back_when_the_operation_fails(self):
+        pool=self.pool(size=1,timeout=0.05)
+        with self.assertRaises(ZeroDivisionError):
+            with pool.connection():
+                1/0
+        with pool.connection():
+            pass
+
+    def test_dead_idle_connections_are_replaced(self):
+        pool=self.pool(check_after=0)
+        with pool.connection() as conn:
+            conn.alive=False
+        with pool.connection() as fresh:
+            self.assertIsNot(fresh,conn)
+        self.assertTrue(conn.closed)
+
+    def test_long_idle_connections_are_closed(self):
+        pool=self.pool(idle_timeout=0.01)
+        with pool.connection() as conn:
+            pass
+        time.sleep(0.02)
+        with pool.connection() as fresh:
+            self.assertIsNot(fresh,conn)
+        self.assertTrue(conn.closed)
+
+class RunTransactionTest(base.BankTest):
+    def setUp(self):
+        super().setUp()
+        self.open_account(1001,10000)
+        #a budget of its own, so the tests don't depend on each other
+        self.budget=connection.retry_budget
+        connection.retry_budget=connection.RetryBudget()
+        self.addCleanup(setattr,connection,"retry_budget",self.budget)
+        self.attempts=0
+
+    def failing(self,errno,times):
+    #work that changes the balance and then fails times times with errno
+        def work(cur):
+            self.attempts+=1
+            cur.execute("update accounts set balance=balance+1 where acc_no=1001")
+            if self.attempts<=times:
+                raise mysql.connector.Error(msg="lock",errno=errno)
+            return self.attempts
+        return work
+
+    def balance(self):
+        return self.execute("select balance from accounts where acc_no=1001")[0][0]
+
+    def test_deadlocks_and_lock_wait_timeouts_are_retried(self):
+        for errno in (errorcode.ER_LOCK_DEADLOCK,errorcode.ER_LOCK_WAIT_TIMEOUT):
+            self.attempts=0
+            self.assertEqual(connection.run_transaction(self.conn,self.failing(errno,2),"test"),3)
+        #the failed attempts were rolled back, only the last one of each counts
+        self.assertEqual(self.balance(),10002)
+
+    def test_gives_up_after_the_retries(self):
+        with self.assertRaises(mysql.connector.Error) as caught:
+            connection.run_transaction(self.conn,self.failing(errorcode.ER_LOCK_DEADLOCK,10),"test",retries=2)
+        self.assertEqual(caught.exception.errno,errorcode.ER_LOCK_DEADLOCK)
+        self.assertEqual(self.attempts,3)
+        self.assertEqual(self.balance(),10000)
+
+    def test_other_errors_are_not_retried(self):
+        with self.assertRaises(mysql.connector.Error):
+            connection.run_transaction(self.conn,self.failing(errorcode.ER_DUP_ENTRY,1),"test")
+        self.assertEqual(self.attempts,1)
+        self.assertEqual(self.balance(),10000)
+
+    def test_retries_stop_when_the_budget_is_spent(self):
+        connection.retry_budget=connection.RetryBudget(tokens=1)
+        with self.assertRaises(mysql.connector.Error):
+            connection.run_transaction(self.conn,self.failing(errorcode.ER_LOCK_DEADLOCK,10),"test")
+        self.assertEqual(self.attempts,2)
@@ -0,0 +1,90 @@
+import io
+from unittest import mock
+from tools import dataio
+from tools import errors
+from tools import passwords
+from tools import search
+from tests import base
+
+CLIENTS=("acc_no,type,first_name,last_name,gender,birth_date,accd,mobile_no,email_id,pass\n"
+         "3001,S,Anita,Rao,F,1985-04-02,2010-06-01,9876500001,anita@bank.in,Anit@123\n"
+         "3002,S,Bala,Iyer,X,1985-04-02,2010-06-01,9876500002,bala@bank.in,Bala@123\n"
+         "3003,C,Chitra,Nair,F,1985-13-02,2010-06-01,9876500003,chitra@bank.in,Chit@123\n"
+         "1001,S,Ravi,Kumar,M,1990-01-01,2015-01-01,9876543210,ravi@bank.in,Ravi@123\n"
+         "3004,S\n")
+
+class DataIOTest(base.BankTest):
+    def setUp(self):
+        super().setUp()
+        self.open_account(1001,10000,"S","Ravi","Kumar")
+        self.open_account(1002,2500,"C","Meena","Shah")
+
+    def dump(self,table,fmt,count=1):
+        out=io.StringIO()
+        self.assertEqual(dataio.export(self.conn,table,out,fmt),count)
+        return out.getvalue()
+
+    def load(self,table,text,fmt,chunk=dataio.CHUNK):
+        results=list(dataio.load(self.conn,table,io.StringIO(text),fmt,chunk))
+        return results[:-1],results[-1][1]
+
+    def test_round_trip(self):
+        for fmt in dataio.WRITERS:
+            with self.subTest(fmt=fmt):
+                before=[self.execute("select * from {}".format(table)) for table in ("clients","accounts")]
+                clients,savings,current=self.dump("clients",fmt,2),self.dump("savings",fmt),self.dump("current",fmt)
+                for table in ("journal","client_trigrams","accounts","clients"):
+                    self.execute("delete from {}".format(table))
+                self.assertEqual(self.load("clients",clients,fmt,chunk=1),([],2))
+                self.assertEqual(self.load("savings",savings,fmt),([],1))
+                self.assertEqual(self.load("current",current,fmt),([],1))
+                self.assertEqual([self.execute("select * from {}".format(table)) for table in ("clients","accounts")],
+                                 before)
+                #the accounts open in the journal and the names can be found again
+                self.assertEqual(self.execute("select acc_no,kind,amount from journal order by acc_no"),
+                                 [(1001,"OPEN",10000),(1002,"OPEN",2500)])
+                self.assertEqual(search.similar(self.conn,"Meena Shah")[0][1][0],1002)
+
+    def test_rejected_rows_are_reported_and_the_others_go_in(self):
+        failed,count=self.load("clients",CLIENTS,"csv")
+        self.assertEqual(count,1)
+        self.assertEqual([(row_no,acc_no) for row_no,acc_no,error in failed],[(2,3002),(3,3003),(4,1001),(5,3004)])
+        self.assertIn("gender",failed[0][2].lower())
+        self.assertEqual(failed[1][2],"Couldn't read birth_date")
+        self.assertEqual(failed[2][2],"acc_no 1001 is already in clients")
+        #the plaintext password of the row that went in was hashed
+        stored=self.execute("select pass from clients where acc_no=3001")[0][0]
+        self.assertTrue(passwords.verify("Anit@123",stored))
+
+    def test_accounts_need_a_client_of_their_type(self):
+        failed,count=self.load("savings",'{"acc_no":4001,"balance":10,"loan":"NO"}\n'
+                                         '{"acc_no":1002,"balance":10,"loan":"NO"}\n'
+                                         'not json\n',"jsonl")
+        self.assertEqual(count,0)
+        self.assertEqual([error for row_no,acc_no,error in failed],
+                         ["Account 4001 doesn't exist","acc_no 1002 is already in accounts","Couldn't read the row"])
+
+    def test_malformed_row_group(self):
+        with self.assertRaisesRegex(errors.BankError,"line 2"):
+            self.load("cash_in_hand",'{"acc_no":[1001],"cash_in_hand":[5]}\n{"acc_no":\n',"columns")
+
+    def test_imported_hashes_must_be_well_formed(self):
+        good=passwords.hash_password("Anit@123")
+        text=CLIENTS.splitlines()[0]+"\n"
+        for acc_no,stored in [(3001,good),(3002,passwords.PREFIX+"1024$8$1$bad$hash"),(3003,passwords.PREFIX+"x"),
+                              (3004,good+"$more"),(3005,passwords.PREFIX+"1000$8$1$c2FsdA==$ZGlnZXN0")]:
+            text+="{},S,Anita,Rao,F,1985-04-02,2010-06-01,9876500001,anita@bank.in,{}\n".format(acc_no,stored)
+        failed,count=self.load("clients",text,"csv")
+        self.assertEqual(count,1)
+        self.assertEqual([(acc_no,error) for row_no,acc_no,error in failed],
+                         [(acc_no,"pass isn't a valid password hash") for acc_no in (3002,3003,3004,3005)])
+        self.assertEqual(self.execute("select pass from clients where acc_no=3001"),[(good,)])
+
+    def test_one_pool_hashes_the_passwords_of_every_chunk(self):
+        with mock.patch.object(passwords,"hash_many",wraps=passwords.hash_many) as hash_many:
+            failed,count=self.load("clients",CLIENTS,"csv",chunk=1)
+        self.assertEqual(count,1)
+        executors={id(call.kwargs["executor"]) for call in hash_many.call_args_list}
+        self.assertEqual(len(hash_many.call_args_list),5)
+        self.assertEqual(len(executors),1)
+        self.assertIsNotNone(hash_many.call_args_list[0].kwargs["executor"])
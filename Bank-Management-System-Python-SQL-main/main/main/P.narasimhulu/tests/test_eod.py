@@ -0,0 +1,44 @@
+import unittest
+import numpy as np
+from tools import eod
+
+class CalculationsTest(unittest.TestCase):
+    def test_accrue_one_day(self):
+        accrued=eod.accrue(np.array([36500.0,-1000.0,0.0]),np.array([0.5,0.5,0.0]),3.65,365)
+        np.testing.assert_allclose(accrued,[0.5+3.65,0.5,0.0])
+
+    def test_credit_keeps_the_fraction(self):
+        credited,left=eod.credit(np.array([4.15,0.99]))
+        np.testing.assert_allclose(credited,[4,0])
+        np.testing.assert_allclose(left,[0.15,0.99])
+
+    def test_emi(self):
+        #100000 at 12% for 12 months is 8884.88, rounded up
+        np.testing.assert_array_equal(eod.emi(np.array([100000.0]),np.array([12.0]),np.array([12.0])),[8885])
+
+    def test_emi_without_interest(self):
+        np.testing.assert_array_equal(eod.emi(np.array([1200.0,1000.0]),np.array([0.0,0.0]),np.array([12.0,0.0])),
+                                      [100,1000])
+
+    def test_amortize_takes_the_instalment_with_the_interest(self):
+        paid,remaining=eod.amortize(np.array([100000.0]),np.array([12.0]),np.array([8885.0]),np.array([50000.0]))
+        np.testing.assert_array_equal(paid,[8885])
+        np.testing.assert_array_equal(remaining,[100000+1000-8885])
+
+    def test_amortize_skips_a_month_the_balance_doesnt_cover(self):
+        paid,remaining=eod.amortize(np.array([100000.0]),np.array([12.0]),np.array([8885.0]),np.array([100.0]))
+        np.testing.assert_array_equal(paid,[0])
+        np.testing.assert_array_equal(remaining,[101000])
+
+    def test_amortize_the_last_instalment_is_what_is_owed(self):
+        paid,remaining=eod.amortize(np.array([500.0]),np.array([12.0]),np.array([8885.0]),np.array([50000.0]))
+        np.testing.assert_array_equal(paid,[505])
+        np.testing.assert_array_equal(remaining,[0])
+
+    def test_a_loan_is_paid_off_in_its_months(self):
+        principal,rate,months=np.array([250000.0]),np.array([9.0]),np.array([24.0])
+        remaining=principal
+        instalment=eod.emi(principal,rate,months)
+        for month in range(24):
+            paid,remaining=eod.amortize(remaining,rate,instalment,np.array([1e9]))
+        self.assertLessEqual(remaining[0],0)
@@ -0,0 +1,75 @@
+from datetime import date, datetime, timedelta
+from tools import checkpoints
+from tools import connection
+from tools import errors
+from tools import journal
+from tests import base
+
+DAY=date.today()-timedelta(days=10)
+
+def at(days,hour=12):
+    return datetime.combine(DAY+timedelta(days=days),datetime.min.time())+timedelta(hours=hour)
+
+class JournalTest(base.BankTest):
+    def setUp(self):
+        super().setUp()
+        #an account opened on DAY with 100, +50 the day after, -30 the day after that
+        self.execute("INSERT INTO accounts VALUES(2001,'S',120,'NO')")
+        self.write([(2001,"OPEN",100,None)],at(0))
+        self.write([(2001,"DEPOSIT",50,None)],at(1))
+        self.write([(2001,"WITHDRAW",-30,None)],at(2))
+
+    def write(self,entries,ts):
+        cur=self.conn.cursor()
+        try:
+            journal.write(cur,entries,ts)
+        finally:
+            cur.close()
+
+    def as_of(self,when):
+        return checkpoints.balance_as_of(self.conn,2001,when)
+
+    def test_statement_pages_follow_each_other(self):
+        #entries with the same ts are told apart by entry_no
+        self.write([(2001,"DEPOSIT",i,None) for i in range(1,6)],at(3))
+        pages=list(journal.statement(self.conn,2001,page_size=3))
+        self.assertEqual([len(page) for page in pages],[3,3,2])
+        rows=[row for page in pages for row in page]
+        self.assertEqual([row[3] for row in rows],[100,50,-30,1,2,3,4,5])
+        self.assertEqual([row[0] for row in rows],sorted(row[0] for row in rows))
+
+    def test_statement_without_a_connection_borrows_one_per_page(self):
+        self.write([(2001,"DEPOSIT",i,None) for i in range(1,6)],at(3))
+        self.conn.commit()
+        rows=[]
+        for page in journal.statement(None,2001,page_size=3):
+            #nothing is held while the screen waits on a page
+            self.assertEqual(connection.pool._open-len(connection.pool._idle),1)
+            rows.extend(page)
+        self.assertEqual([row[3] for row in rows],[100,50,-30,1,2,3,4,5])
+
+    def test_statement_of_a_period(self):
+        rows=[row for page in journal.statement(self.conn,2001,DAY+timedelta(days=1),DAY+timedelta(days=2),page_size=1)
+              for row in page]
+        self.assertEqual([row[2] for row in rows],["DEPOSIT","WITHDRAW"])
+
+    def test_statement_of_an_account_without_entries(self):
+        self.assertEqual(list(journal.statement(self.conn,9999)),[])
+
+    def test_balance_as_of_without_checkpoints(self):
+        self.assertEqual(self.as_of(at(0,0)),0)
+        self.assertEqual(self.as_of(checkpoints.cutoff(DAY)),100)
+        self.assertEqual(self.as_of(at(1,13)),150)
+        self.assertEqual(checkpoints.balance_on(self.conn,2001,DAY+timedelta(days=2)),120)
+
+    def test_balance_as_of_with_a_checkpoint(self):
+        self.assertEqual(checkpoints.checkpoint(self.conn,DAY+timedelta(days=1)),1)
+        self.assertEqual(self.execute("select balance from balance_checkpoints where acc_no=2001"),[(150,)])
+        #the entries before the checkpoint aren't read anymore
+        self.execute("delete from journal where ts<%s",(checkpoints.cutoff(DAY+timedelta(days=1)),))
+        self.assertEqual(self.as_of(at(2,13)),120)
+        self.assertEqual(checkpoints.balance_on(self.conn,2001,DAY+timedelta(days=1)),150)
+
+    def test_checkpoint_of_a_day_that_isnt_over(self):
+        with self.assertRaises(errors.BankError):
+            checkpoints.checkpoint(self.conn,date.today())
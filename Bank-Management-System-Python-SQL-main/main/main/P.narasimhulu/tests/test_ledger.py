@@ -0,0 +1,96 @@
+from tools import errors
+from tools import ledger
+from tools import operations
+from tools import sanction
+from tests import base
+
+class LedgerTest(base.BankTest):
+    def setUp(self):
+        super().setUp()
+        self.open_account(1001,10000)
+        self.open_account(1002,5000,"C")
+
+    def kinds(self,acc_no):
+        return self.execute("select kind,amount,ref_acc from journal where acc_no=%s order by entry_no",(acc_no,))
+
+    def test_deposit_moves_cash_in_hand_to_the_balance(self):
+        self.give_cash(1001,700)
+        self.assertEqual(ledger.deposit(self.conn,1001,500),(10500,200))
+        self.assertEqual(operations.balance(self.conn,1001),10500)
+        self.assertEqual(operations.cash_in_hand(self.conn,1001),200)
+        self.assertEqual(self.kinds(1001)[-1],("DEPOSIT",500,None))
+
+    def test_deposit_needs_the_cash(self):
+        self.give_cash(1001,100)
+        with self.assertRaises(ledger.LedgerError):
+            ledger.deposit(self.conn,1001,500)
+        self.assertEqual(operations.balance(self.conn,1001),10000)
+        self.assertEqual(self.kinds(1001),[("OPEN",10000,None)])
+
+    def test_withdraw_moves_the_balance_to_cash_in_hand(self):
+        self.assertEqual(ledger.withdraw(self.conn,1001,4000),(6000,4000))
+        self.assertEqual(operations.cash_in_hand(self.conn,1001),4000)
+        self.assertEqual(self.kinds(1001)[-1],("WITHDRAW",-4000,None))
+
+    def test_cash_in_hand_is_created_on_first_use(self):
+        self.assertEqual(operations.cash_in_hand(self.conn,1001),0)
+        self.assertEqual(self.execute("select cash_in_hand from cash_in_hand where acc_no=1001"),[(0,)])
+        self.give_cash(1001,300)
+        self.assertEqual(operations.cash_in_hand(self.conn,1001),300)
+
+    def test_withdraw_more_than_the_balance(self):
+        with self.assertRaisesRegex(ledger.LedgerError,"enough balance"):
+            ledger.withdraw(self.conn,1001,10001)
+        self.assertEqual(operations.balance(self.conn,1001),10000)
+
+    def test_amounts_must_be_positive(self):
+        for amount in (0,-5):
+            with self.assertRaises(ledger.LedgerError):
+                ledger.withdraw(self.conn,1001,amount)
+
+    def test_transfer_writes_both_sides(self):
+        self.assertEqual(ledger.transfer(self.conn,1001,1002,2500),7500)
+        self.assertEqual(operations.balance(self.conn,1002),7500)
+        self.assertEqual(self.kinds(1001)[-1],("TRANSFER",-2500,1002))
+        self.assertEqual(self.kinds(1002)[-1],("TRANSFER",2500,1001))
+
+    def test_transfer_with_insufficient_funds_changes_nothing(self):
+        with self.assertRaisesRegex(ledger.LedgerError,"enough balance"):
+            ledger.transfer(self.conn,1002,1001,5001)
+        self.assertEqual((operations.balance(self.conn,1001),operations.balance(self.conn,1002)),(10000,5000))
+        self.assertEqual(len(self.kinds(1002)),1)
+
+    def test_transfer_to_a_missing_account(self):
+        with self.assertRaises(errors.NotFound):
+            ledger.transfer(self.conn,1001,9999,100)
+        self.assertEqual(operations.balance(self.conn,1001),10000)
+
+    def test_transfer_to_yourself(self):
+        with self.assertRaises(ledger.LedgerError):
+            ledger.transfer(self.conn,1001,1001,100)
+
+    def test_overdraft_pays_for_the_transfer_that_asked_for_it(self):
+        self.open_account(1003,1000,"C")
+        request_no=operations.request_overdraft(self.conn,1003,20000,to_acc=1002,transfer_amt=15000)
+        sanction.decide(self.conn,request_no,True,1)
+        self.assertEqual(operations.balance(self.conn,1003),6000)
+        self.assertEqual(operations.balance(self.conn,1002),20000)
+        self.assertEqual(self.execute("select loan_od from accounts where acc_no=1003"),[("YES",)])
+        self.assertEqual(self.kinds(1003)[1:],[("OVERDRAFT",20000,None),("TRANSFER",-15000,1002)])
+
+    def test_overdraft_is_refused_while_one_is_open(self):
+        self.open_account(1003,1000,"C")
+        sanction.decide(self.conn,operations.request_overdraft(self.conn,1003,20000),True,1)
+        with self.assertRaises(errors.BankError):
+            request_no=operations.request_overdraft(self.conn,1003,1000)
+            sanction.decide(self.conn,request_no,True,1)
+        self.assertEqual(operations.balance(self.conn,1003),21000)
+
+    def test_overdraft_too_small_for_the_transfer(self):
+        self.open_account(1003,1000,"C")
+        request_no=operations.request_overdraft(self.conn,1003,2000,to_acc=1002,transfer_amt=2500)
+        ledger.withdraw(self.conn,1003,1000)
+        with self.assertRaisesRegex(ledger.LedgerError,"isn't enough for the transfer"):
+            sanction.decide(self.conn,request_no,True,1)
+        self.assertEqual(operations.balance(self.conn,1003),0)
+        self.assertEqual(self.execute("select loan_od from accounts where acc_no=1003"),[("NO",)])
@@ -0,0 +1,30 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from tools import metrics
+
+class SlowLogTest(unittest.TestCase):
+    def setUp(self):
+        folder=tempfile.mkdtemp(prefix="bank-test-"); self.addCleanup(shutil.rmtree,folder,True)
+        self.log=os.path.join(folder,"slow.log")
+        for name,value in (("SLOW_LOG",self.log),("SLOW_SECONDS",0.1)):
+            patcher=mock.patch.object(metrics,name,value); patcher.start(); self.addCleanup(patcher.stop)
+        metrics.reset(); self.addCleanup(metrics.reset)
+
+    def test_slow_operations_are_logged_outside_the_lock(self):
+        held=[]
+        write=metrics.log_slow
+        def log_slow(*args):
+            held.append(metrics._lock.locked())
+            write(*args)
+        with mock.patch.object(metrics,"log_slow",log_slow):
+            metrics.observe("deposit",0.01)
+            metrics.observe("deposit",0.5,rows=1,failed="errors")
+        self.assertEqual(held,[False])
+        with open(self.log) as f:
+            lines=f.read().splitlines()
+        self.assertEqual(len(lines),1)
+        self.assertTrue(lines[0].endswith("deposit 500.0ms rows=1 errors"))
+        self.assertEqual(metrics.snapshot()["operations"]["deposit"]["count"],2)
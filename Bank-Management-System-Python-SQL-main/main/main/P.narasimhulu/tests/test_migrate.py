@@ -0,0 +1,43 @@
+import io
+from contextlib import redirect_stdout
+from datetime import date
+from initialization import migrate
+from tools import checkpoints
+from tools import ledger
+from tools import operations
+from tests import base
+
+class MigrateTest(base.BankTest):
+    def test_everything_is_applied_once(self):
+        self.assertEqual(migrate.pending(self.conn),[])
+        with redirect_stdout(io.StringIO()) as out:
+            self.assertTrue(migrate.migrate(self.conn))
+        self.assertEqual(out.getvalue(),"")
+        versions=[row[0] for row in self.execute("select version from schema_migrations order by version")]
+        self.assertEqual(versions,[m[0] for m in migrate.MIGRATIONS])
+
+    def test_panel_passwords_have_to_be_set_by_the_admin(self):
+        self.execute("delete from panel_passwords where panel='EMPLOYEE'")
+        self.execute("delete from schema_migrations where version=10")
+        with redirect_stdout(io.StringIO()) as out:
+            self.assertFalse(migrate.migrate(self.conn))
+        self.assertIn("panel passwords",out.getvalue())
+        self.assertEqual([m[0] for m in migrate.pending(self.conn)],[10])
+        asked=[]
+        with redirect_stdout(io.StringIO()):
+            self.assertTrue(migrate.migrate(self.conn,lambda panel:asked.append(panel) or "Empl@123"))
+        #the admin password that is already set isn't asked again
+        self.assertEqual(asked,["EMPLOYEE"])
+        self.assertTrue(operations.login_panel(self.conn,"EMPLOYEE","Empl@123"))
+        self.assertTrue(operations.login_panel(self.conn,"ADMIN",base.PANEL_PASSWORD))
+
+    def test_accounts_opened_before_the_journal_get_an_open_entry(self):
+        self.open_account(8001,1000)
+        self.execute("delete from journal where acc_no=8001")
+        ledger.withdraw(self.conn,8001,300)
+        self.execute("delete from schema_migrations where version=11")
+        with redirect_stdout(io.StringIO()):
+            self.assertTrue(migrate.migrate(self.conn))
+        self.assertEqual(self.execute("select kind,amount from journal where acc_no=8001 order by ts"),
+                         [("OPEN",1000),("WITHDRAW",-300)])
+        self.assertEqual(checkpoints.balance_on(self.conn,8001,date.today()),700)
@@ -0,0 +1,71 @@
+from tools import errors
+from tools import operations
+from tools import passwords
+from tests import base
+
+class PasswordsTest(base.BankTest):
+    def stored(self,acc_no):
+        return self.execute("select pass from clients where acc_no=%s",(acc_no,))[0][0]
+
+    def test_hash_and_verify(self):
+        stored=passwords.hash_password("Pass@123")
+        self.assertTrue(passwords.is_hash(stored))
+        self.assertTrue(passwords.verify("Pass@123",stored))
+        self.assertFalse(passwords.verify("Pass@124",stored))
+        #salted, the same password hashes differently every time
+        self.assertNotEqual(stored,passwords.hash_password("Pass@123"))
+
+    def test_plaintext_and_broken_hashes(self):
+        self.assertTrue(passwords.check("Pass@123","Pass@123"))
+        self.assertFalse(passwords.check("Pass@12","Pass@123"))
+        self.assertFalse(passwords.check("Pass@123",passwords.PREFIX+"1024$8$1$bad$hash"))
+
+    def test_needs_rehash(self):
+        self.assertTrue(passwords.needs_rehash("Pass@123"))
+        self.assertFalse(passwords.needs_rehash(passwords.hash_password("Pass@123")))
+        self.assertTrue(passwords.needs_rehash(passwords.hash_password("Pass@123",n=passwords.N*2)))
+
+    def test_login_rehashes_plaintext_and_older_costs(self):
+        self.open_account(6001)
+        for old in (base.PASSWORD,passwords.hash_password(base.PASSWORD,n=passwords.N*2)):
+            self.execute("update clients set pass=%s where acc_no=6001",(old,))
+            self.assertFalse(operations.login_client(self.conn,6001,"Wrong@123"))
+            self.assertEqual(self.stored(6001),old)
+            self.assertTrue(operations.login_client(self.conn,6001,base.PASSWORD))
+            self.assertFalse(passwords.needs_rehash(self.stored(6001)))
+            self.assertTrue(passwords.verify(base.PASSWORD,self.stored(6001)))
+
+    def test_changed_password_takes_effect_at_once(self):
+        self.open_account(6001)
+        operations.get_account(self.conn,6001)
+        operations.edit_account(self.conn,6001,**{"pass":"Next@123"})
+        self.assertFalse(operations.login_client(self.conn,6001,base.PASSWORD))
+        self.assertTrue(operations.login_client(self.conn,6001,"Next@123"))
+
+    def test_rejected_edits_change_nothing(self):
+        self.open_account(6001)
+        old=self.stored(6001)
+        with self.assertRaises(errors.BankError):
+            operations.edit_account(self.conn,6001,mobile_no="12",**{"pass":"Next@123"})
+        with self.assertRaises(errors.BankError):
+            operations.edit_account(self.conn,6001,**{"pass":"x"})
+        self.assertEqual(self.stored(6001),old)
+        with self.assertRaises(errors.NotFound):
+            operations.edit_account(self.conn,6002,**{"pass":"Next@123"})
+
+    def test_rehash_table(self):
+        self.open_account(6001)
+        self.open_account(6002)
+        self.execute("update clients set pass='Pass@123' where acc_no=6001")
+        self.assertEqual(passwords.rehash_table(self.conn,"clients","acc_no",processes=1,chunk=1),1)
+        self.assertTrue(passwords.verify("Pass@123",self.stored(6001)))
+        self.assertEqual(passwords.rehash_table(self.conn,"clients","acc_no",processes=1),0)
+
+    def test_panels_have_the_passwords_set_during_migration(self):
+        #nothing from before version 8 opens a panel
+        self.assertFalse(operations.login_panel(self.conn,"ADMIN","admin123"))
+        self.assertFalse(operations.login_panel(self.conn,"EMPLOYEE","emp123"))
+        self.assertTrue(operations.login_panel(self.conn,"ADMIN",base.PANEL_PASSWORD))
+        operations.set_panel_password(self.conn,"ADMIN","Admn@123")
+        self.assertFalse(operations.login_panel(self.conn,"ADMIN",base.PANEL_PASSWORD))
+        self.assertTrue(operations.login_panel(self.conn,"ADMIN","Admn@123"))
@@ -0,0 +1,49 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from tools import errors
+from tools import sanction
+from tests import base
+
+class LoadRulesTest(unittest.TestCase):
+    def load(self,changes):
+        folder=tempfile.mkdtemp(prefix="bank-test-"); self.addCleanup(shutil.rmtree,folder,True)
+        path=os.path.join(folder,"rules.json")
+        with open(path,"w") as f:
+            f.write(changes if isinstance(changes,str) else json.dumps(changes))
+        return sanction.load_rules(path)
+
+    def test_changes_are_merged(self):
+        rules=self.load({"auto_sanction_limit":200000,"rates":{"HL":8}})
+        self.assertEqual(rules["auto_sanction_limit"],200000)
+        self.assertEqual(rules["rates"],dict(sanction.RULES["rates"],HL=8))
+        self.assertEqual(sanction.load_rules(os.path.join(tempfile.gettempdir(),"no-such-rules.json")),sanction.RULES)
+
+    def test_bad_rules_are_refused(self):
+        for changes in ['{"cover":',[1],{"cvoer":0.5},{"rates":{"XL":10}},{"rates":9},{"cover":0},
+                        {"full_age_years":-1},{"loan_limits":{"PL":-5}},{"max_months":0},{"od_limit":"lots"},
+                        {"auto_sanction_limit":True},{"rates":{"HL":8.5}},{"auto_reject_score":101},
+                        {"auto_reject_score":80}]:
+            with self.subTest(changes=changes):
+                with self.assertRaises(errors.BankError):
+                    self.load(changes)
+
+class WorkerTest(base.BankTest):
+    def test_an_unexpected_error_doesnt_stop_the_worker(self):
+        stop=threading.Event()
+        calls=[]
+        def work(conn,rules):
+            calls.append(conn)
+            if len(calls)==1:
+                raise RuntimeError("bug")
+            stop.set()
+            return True
+        with mock.patch.object(sanction,"work",side_effect=work), \
+             mock.patch("traceback.print_exc") as print_exc:
+            sanction.worker(stop,sanction.RULES,0)
+        self.assertEqual(len(calls),2)
+        print_exc.assert_called_once()
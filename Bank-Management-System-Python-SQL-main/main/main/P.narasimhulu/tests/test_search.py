@@ -0,0 +1,45 @@
+from tools import operations
+from tools import search
+from tests import base
+
+class SearchTest(base.BankTest):
+    def setUp(self):
+        super().setUp()
+        for acc_no,first_name,last_name in [(5001,"Ravi","Kumar"),(5002,"Ravi","Kumari"),(5003,"Ravindra","Kumar"),
+                                            (5004,"Kavi","Kumar"),(5005,"Anita","Rao")]:
+            self.open_account(acc_no,1000,"S",first_name,last_name)
+
+    def ranked(self,name):
+        return [(row[0],round(score,2)) for score,row in search.similar(self.conn,name)]
+
+    def test_exact_name_first(self):
+        found=self.ranked("Ravi Kumar")
+        self.assertEqual(found[0],(5001,1.0))
+        self.assertNotIn(5005,[acc_no for acc_no,score in found])
+        self.assertEqual([score for acc_no,score in found],sorted((score for acc_no,score in found),reverse=True))
+
+    def test_misspelt_name(self):
+        self.assertEqual(self.ranked("Ravi Kumr")[0][0],5001)
+        self.assertEqual(self.ranked("ravindra kumar")[0],(5003,1.0))
+
+    def test_trailing_space_trigrams_count(self):
+        #"ar " only matches names that end in "ar", Kumari loses to Kumar
+        found=[acc_no for acc_no,score in self.ranked("Ravi Kumar")]
+        self.assertLess(found.index(5001),found.index(5002))
+
+    def test_renamed_and_deleted_clients(self):
+        operations.edit_account(self.conn,5005,first_name="Ravi",last_name="Kumar")
+        self.assertIn((5005,1.0),self.ranked("Ravi Kumar"))
+        operations.delete_account(self.conn,5005)
+        self.assertNotIn(5005,[acc_no for acc_no,score in self.ranked("Ravi Kumar")])
+
+    def test_rebuild(self):
+        before=self.execute("select trigram,acc_no from client_trigrams order by trigram,acc_no")
+        self.execute("delete from client_trigrams")
+        self.execute("insert into client_trigrams values('zzz',9999)")
+        self.assertEqual(search.rebuild(self.conn,chunk=2),5)
+        self.assertEqual(self.execute("select trigram,acc_no from client_trigrams order by trigram,acc_no"),before)
+
+    def test_nothing_similar(self):
+        self.assertEqual(search.similar(self.conn,"Xyzzy"),[])
+        self.assertEqual(search.similar(self.conn,""),[])
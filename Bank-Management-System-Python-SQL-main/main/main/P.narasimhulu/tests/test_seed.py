@@ -0,0 +1,13 @@
+from tools import operations
+from tools import seed
+from tests import base
+
+class InUseTest(base.BankTest):
+    def test_the_journal_of_a_closed_account_keeps_its_range_in_use(self):
+        self.assertFalse(seed.in_use(self.conn,5000,10,5000,10))
+        self.open_account(5003)
+        self.assertTrue(seed.in_use(self.conn,5000,10,5000,10))
+        operations.delete_account(self.conn,5003)
+        self.assertEqual(self.execute("select count(*) from clients where acc_no=5003"),[(0,)])
+        self.assertTrue(seed.in_use(self.conn,5000,10,5000,10))
+        self.assertFalse(seed.in_use(self.conn,5004,10,5000,10))
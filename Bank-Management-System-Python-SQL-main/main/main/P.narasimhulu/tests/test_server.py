@@ -0,0 +1,119 @@
+import asyncio
+import json
+from unittest import mock
+import server
+from tools import operations
+from tests import base
+
+TOKEN="teller-secret"
+
+class ServerTest(base.BankTest):
+    def setUp(self):
+        super().setUp()
+        self.open_account(7001,10000)
+        self.give_cash(7001,1000)
+
+    def requests(self,*requests):
+    #[(status,body)] of the requests, sent one after the other to a new server
+        async def go():
+            app=server.Server(TOKEN,workers=2)
+            listener=await asyncio.start_server(app.handle,"127.0.0.1",0)
+            port=listener.sockets[0].getsockname()[1]
+            answers=[]
+            try:
+                for method,path,body,token in requests:
+                    reader,writer=await asyncio.open_connection("127.0.0.1",port)
+                    payload=json.dumps(body).encode() if body is not None else b""
+                    head="{} {} HTTP/1.1\r\nContent-Length: {}\r\nConnection: close\r\n".format(method,path,len(payload))
+                    if token:
+                        head+="Authorization: Bearer {}\r\n".format(token)
+                    writer.write(head.encode()+b"\r\n"+payload)
+                    await writer.drain()
+                    answer=await reader.read()
+                    writer.close()
+                    status=int(answer.split(b" ",2)[1])
+                    answers.append((status,json.loads(answer.split(b"\r\n\r\n",1)[1])))
+            finally:
+                listener.close()
+                await listener.wait_closed()
+                app.executor.shutdown()
+            return answers
+        return asyncio.run(go())
+
+    def request(self,method,path,body=None,token=TOKEN):
+        return self.requests((method,path,body,token))[0]
+
+    def test_deposit(self):
+        self.assertEqual(self.request("POST","/accounts/7001/deposit",{"amount":500}),
+                         (200,{"acc_no":7001,"balance":10500,"cash_in_hand":500}))
+
+    def test_bad_requests(self):
+        for method,path,body in [("POST","/accounts/7001/deposit",{"amount":1.5}),
+                                 ("POST","/accounts/7001/deposit",{"amount":True}),
+                                 ("POST","/accounts/7001/deposit",{"amount":"ten"}),
+                                 ("POST","/accounts/7001/deposit",{}),
+                                 ("POST","/accounts/7001/deposit",[500]),
+                                 ("POST","/accounts/7001/withdraw",{"amount":10**6}),
+                                 ("PATCH","/accounts/7001",{"first_name":5}),
+                                 ("PATCH","/accounts/7001",{"acc_no":7002}),
+                                 ("POST","/accounts",{"acc_no":7002,"type":"S","first_name":"Ravi","last_name":"Kumar",
+                                                      "gender":"M","birth_date":"1990-01-01","accd":"2015-01-01",
+                                                      "mobile_no":"9876543210","email_id":"ravi@bank.in",
+                                                      "pass":12345678,"balance":1000}),
+                                 ("GET","/accounts/"+"9"*30,None)]:
+            with self.subTest(method=method,path=path,body=body):
+                status,answer=self.request(method,path,body)
+                self.assertEqual(status,400)
+                self.assertIn("error",answer)
+        self.assertEqual(self.request("GET","/accounts/7001/balance"),(200,{"acc_no":7001,"balance":10000}))
+
+    def test_not_found(self):
+        self.assertEqual(self.request("GET","/accounts/7002")[0],404)
+        self.assertEqual(self.request("POST","/accounts/7002/deposit",{"amount":5})[0],404)
+        self.assertEqual(self.request("GET","/branches")[0],404)
+        self.assertEqual(self.request("DELETE","/accounts/7001/balance")[0],405)
+
+    def test_the_token_is_required(self):
+        self.assertEqual(self.request("GET","/accounts/7001",token=None)[0],401)
+        self.assertEqual(self.request("POST","/accounts/7001/withdraw",{"amount":5},token="guess")[0],401)
+        self.assertEqual(self.request("GET","/metrics",token=None)[0],200)
+
+    def test_login(self):
+        self.assertEqual(self.request("POST","/accounts/7001/login",{"pass":base.PASSWORD}),(200,{"acc_no":7001}))
+        self.assertEqual(self.request("POST","/accounts/7001/login",{"pass":"Wrong@123"})[0],401)
+        self.assertEqual(self.request("POST","/accounts/7002/login",{"pass":base.PASSWORD})[0],404)
+        self.assertEqual(self.request("POST","/accounts/7001/login",{})[0],400)
+
+    def test_wrong_logins_lock_the_account(self):
+        wrong=("POST","/accounts/7001/login",{"pass":"Wrong@123"},TOKEN)
+        right=("POST","/accounts/7001/login",{"pass":base.PASSWORD},TOKEN)
+        statuses=[status for status,answer in self.requests(*[wrong]*server.MAX_FAILURES+[wrong,right])]
+        self.assertEqual(statuses,[401]*server.MAX_FAILURES+[429,429])
+
+    def test_a_failing_handler_answers_500_and_the_server_goes_on(self):
+        with mock.patch.object(operations,"balance",side_effect=RuntimeError("bug")), \
+             mock.patch("traceback.print_exc"):
+            answers=self.requests(("GET","/accounts/7001/balance",None,TOKEN),("GET","/accounts/7001/balance",None,TOKEN))
+        self.assertEqual(answers,[(500,{"error":"Internal error"})]*2)
+        self.assertEqual(self.request("GET","/accounts/7001/balance")[0],200)
+
+    def test_a_bad_content_length_answers_400_and_closes_the_connection(self):
+        async def go(length):
+            app=server.Server(TOKEN,workers=2)
+            listener=await asyncio.start_server(app.handle,"127.0.0.1",0)
+            try:
+                reader,writer=await asyncio.open_connection("127.0.0.1",listener.sockets[0].getsockname()[1])
+                writer.write("POST /accounts/7001/deposit HTTP/1.1\r\nContent-Length: {}\r\n"
+                             "Authorization: Bearer {}\r\n\r\n".format(length,TOKEN).encode())
+                await writer.drain()
+                #read() only returns once the server closed the connection
+                answer=await asyncio.wait_for(reader.read(),5)
+                writer.close()
+            finally:
+                listener.close()
+                await listener.wait_closed()
+                app.executor.shutdown()
+            return int(answer.split(b" ",2)[1])
+        for length in ("-5","ten"):
+            with self.subTest(length=length):
+                self.assertEqual(asyncio.run(go(length)),400)
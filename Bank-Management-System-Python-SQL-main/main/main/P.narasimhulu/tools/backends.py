@@ -0,0 +1,182 @@
+#Storage backends. "mysql" is a MySQL 8.0 server, "sqlite" is a local data file
+#(the "Standalone" setup option). The SQLite connection below offers the parts of
+#the mysql.connector connection API that the project uses and translates the
+#MySQL dialect, so the panels and tools run unchanged on either backend.
+import re
+import sqlite3
+from datetime import date, datetime
+from functools import lru_cache
+import mysql.connector
+from mysql.connector import errorcode
+
+MYSQL="mysql"
+SQLITE="sqlite"
+BACKENDS=(MYSQL,SQLITE)
+
+def connector(password,database,backend=MYSQL,host="localhost",user="root",port=3306,**options):
+#returns a function that opens a new connection, used by the connection pool
+#options are extra mysql.connector.connect arguments, e.g. allow_local_infile
+    if backend==SQLITE:
+        def connect():
+            return SQLiteConnection(database)
+    elif backend==MYSQL:
+        #autocommit like the SQLite connection, statements that belong together
+        #run in connection.transaction()
+        def connect():
+            return mysql.connector.connect(host=host,user=user,port=port,password=password,database=database,
+                                           autocommit=True,**options)
+    else:
+        raise ValueError("Unknown storage backend {}".format(backend))
+    return connect
+
+def name(conn):
+#backend of an open connection
+    return SQLITE if isinstance(conn,SQLiteConnection) else MYSQL
+
+#------------------------------SQLite------------------------------
+
+sqlite3.register_adapter(date,date.isoformat)
+sqlite3.register_adapter(datetime,lambda value:value.isoformat(" "))
+sqlite3.register_converter("date",lambda value:date.fromisoformat(value.decode()))
+sqlite3.register_converter("datetime",lambda value:datetime.fromisoformat(value.decode()))
+
+FOR_UPDATE=re.compile(r"\s+for\s+update(\s+skip\s+locked|\s+nowait)?",re.I)
+INSERT_IGNORE=re.compile(r"\binsert\s+ignore\b",re.I)
+ON_DUPLICATE=re.compile(r"\bon\s+duplicate\s+key\s+update\b",re.I)
+VALUES_OF=re.compile(r"\bvalues\((`?)([\w-]+)\1\)",re.I)
+ENUM=re.compile(r"`(\w+)`\s+enum\(([^)]*)\)",re.I)
+#SQLite text is always UTF-8 and its BINARY collation compares bytes like utf8mb4_bin
+BINARY=re.compile(r"(\s+CHARACTER\s+SET\s+utf8mb4)?\s+COLLATE\s+utf8mb4_bin\b",re.I)
+AUTO_INCREMENT=re.compile(r"`(\w+)`\s+\w+(\(\d+\))?(\s+NOT\s+NULL)?\s+AUTO_INCREMENT",re.I)
+
+@lru_cache(maxsize=512)
+def translate(operation):
+    sql=operation.replace("%s","?")
+    sql=FOR_UPDATE.sub("",sql)
+    sql=INSERT_IGNORE.sub("INSERT OR IGNORE",sql)
+    match=ON_DUPLICATE.search(sql)
+    if match:
+        tail=VALUES_OF.sub(r"excluded.\1\2\1",sql[match.end():])
+        sql=sql[:match.start()]+"ON CONFLICT DO UPDATE SET"+tail
+    sql=ENUM.sub(r"`\1` text CHECK (`\1` IN (\2))",sql)
+    sql=BINARY.sub(" COLLATE BINARY",sql)
+    #an integer primary key is the rowid, which is numbered like AUTO_INCREMENT
+    sql=AUTO_INCREMENT.sub(r"`\1` integer\3",sql)
+    return sql
+
+def error(err):
+#sqlite3 errors are raised as mysql.connector errors with the matching MySQL
+#error number, so the existing error handling works on both backends
+    msg=str(err)
+    errno=None
+    if isinstance(err,sqlite3.IntegrityError) and "UNIQUE" in msg:
+        errno=errorcode.ER_DUP_ENTRY
+    elif msg.startswith("index") and "already exists" in msg:
+        errno=errorcode.ER_DUP_KEYNAME
+    elif "already exists" in msg:
+        errno=errorcode.ER_TABLE_EXISTS_ERROR
+    elif "locked" in msg or "busy" in msg:
+        errno=errorcode.ER_LOCK_WAIT_TIMEOUT
+    return mysql.connector.errors.DatabaseError(msg=msg,errno=errno)
+
+class SQLiteCursor:
+    def __init__(self,conn):
+        self._cur=conn._db.cursor()
+
+    def execute(self,operation,params=()):
+        try:
+            self._cur.execute(translate(operation),tuple(params))
+        except sqlite3.Error as err:
+            raise error(err) from err
+
+    def executemany(self,operation,seq_params):
+        try:
+            self._cur.executemany(translate(operation),seq_params)
+        except sqlite3.Error as err:
+            raise error(err) from err
+
+    def fetchone(self):
+        return self._cur.fetchone()
+
+    def fetchmany(self,size=1):
+        return self._cur.fetchmany(size)
+
+    def fetchall(self):
+        return self._cur.fetchall()
+
+    def __iter__(self):
+        return iter(self._cur)
+
+    def close(self):
+        self._cur.close()
+
+    @property
+    def rowcount(self):
+        return self._cur.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cur.lastrowid
+
+    @property
+    def description(self):
+        return self._cur.description
+
+    @property
+    def with_rows(self):
+        return self._cur.description is not None
+
+class SQLiteConnection:
+#WAL mode lets readers run next to the single writer. A transaction takes the
+#write lock when it starts, which stands in for MySQL's SELECT ... FOR UPDATE.
+    unread_result=False
+
+    def __init__(self,path,timeout=5.0):
+        self._db=sqlite3.connect(path,timeout=timeout,isolation_level=None,
+                                 check_same_thread=False,detect_types=sqlite3.PARSE_DECLTYPES)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.create_function("LPAD",3,lambda s,n,pad:str(s).rjust(n,pad)[:n],deterministic=True)
+
+    def cursor(self,buffered=None,prepared=None,**kwargs):
+        return SQLiteCursor(self)
+
+    def start_transaction(self,**kwargs):
+        try:
+            self._db.execute("BEGIN IMMEDIATE")
+        except sqlite3.Error as err:
+            raise error(err) from err
+
+    def commit(self):
+        try:
+            if self._db.in_transaction:
+                self._db.execute("COMMIT")
+        except sqlite3.Error as err:
+            raise error(err) from err
+
+    def rollback(self):
+        if self._db.in_transaction:
+            self._db.execute("ROLLBACK")
+
+    @property
+    def in_transaction(self):
+        return self._db.in_transaction
+
+    def consume_results(self):
+        pass
+
+    def ping(self,reconnect=False,**kwargs):
+        try:
+            self._db.execute("select 1")
+        except sqlite3.Error as err:
+            raise error(err) from err
+
+    def is_connected(self):
+        try:
+            self._db.execute("select 1")
+        except sqlite3.Error:
+            return False
+        return True
+
+    def close(self):
+        self._db.close()
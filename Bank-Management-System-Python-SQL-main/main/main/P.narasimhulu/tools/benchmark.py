@@ -0,0 +1,216 @@
+#Load test for the banking workload, for comparing releases and backends.
+#Run from this folder on a test database:
+#  python -m tools.benchmark --clients 5000 --workers 16 --seconds 30 --mix balance=50,deposit=20,withdraw=20,transfer=10
+#Seeds --clients accounts from --first-acc on (and --employees employees), runs
+#the mix from --workers threads with one pooled connection each and prints the
+#throughput, latencies and lock waits. The seeded rows are removed at the end
+#unless --keep is given. --json writes the results for comparing runs.
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import mysql.connector
+from mysql.connector import errorcode
+from tools import backends
+from tools import connection
+from tools import errors
+from tools import metrics
+from tools import operations
+from tools import seed
+
+MIX={"balance":50,"deposit":20,"withdraw":20,"transfer":10}
+START_BALANCE=100000
+START_CASH=100000
+LOCK_ERRORS=(errorcode.ER_LOCK_WAIT_TIMEOUT,errorcode.ER_LOCK_DEADLOCK)
+
+#------------------------------Seeding------------------------------
+
+def unseed(conn,first_acc,clients,first_emp,employees):
+    cur=conn.cursor()
+    try:
+        with connection.transaction(conn):
+            for table in ("journal","cash_in_hand","accounts","client_trigrams","clients"):
+                cur.execute("delete from {} where acc_no>=%s and acc_no<%s".format(table),(first_acc,first_acc+clients))
+            for table in ("empass","employees"):
+                cur.execute("delete from {} where emp_no>=%s and emp_no<%s".format(table),(first_emp,first_emp+employees))
+    finally:
+        cur.close()
+
+#------------------------------Workload------------------------------
+
+def balance(conn,rng,acc_nos):
+    operations.balance(conn,rng.choice(acc_nos))
+
+def deposit(conn,rng,acc_nos):
+    operations.deposit(conn,rng.choice(acc_nos),rng.randint(1,100))
+
+def withdraw(conn,rng,acc_nos):
+    operations.withdraw(conn,rng.choice(acc_nos),rng.randint(1,100))
+
+def transfer(conn,rng,acc_nos):
+    from_acc,to_acc=rng.sample(acc_nos,2)
+    operations.transfer(conn,from_acc,to_acc,rng.randint(1,100))
+
+OPERATIONS={"balance":balance,"deposit":deposit,"withdraw":withdraw,"transfer":transfer}
+
+def parse_mix(text):
+    mix={}
+    for part in text.split(","):
+        op,_,weight=part.partition("=")
+        if op not in OPERATIONS:
+            raise argparse.ArgumentTypeError("unknown operation {}".format(op))
+        mix[op]=int(weight)
+    return mix
+
+class Results:
+#latencies (seconds) of every operation and the counts of what went wrong
+    def __init__(self):
+        self.latencies={op:[] for op in OPERATIONS}
+        self.refused=0
+        self.lock_errors=0
+        self.errors=0
+        self.lock=threading.Lock()
+
+    def add(self,other):
+        with self.lock:
+            for op,values in other.latencies.items():
+                self.latencies[op].extend(values)
+            self.refused+=other.refused
+            self.lock_errors+=other.lock_errors
+            self.errors+=other.errors
+
+def worker(results,mix,acc_nos,deadline,seed_no):
+    rng=random.Random(seed_no)
+    ops=list(mix)
+    weights=[mix[op] for op in ops]
+    mine=Results()
+    with connection.pool.connection() as conn:
+        while time.perf_counter()<deadline:
+            op=rng.choices(ops,weights)[0]
+            start=time.perf_counter()
+            try:
+                OPERATIONS[op](conn,rng,acc_nos)
+            except errors.BankError:
+                #not enough balance/cash, the work was done all the same
+                mine.refused+=1
+            except mysql.connector.Error as err:
+                if err.errno in LOCK_ERRORS:
+                    mine.lock_errors+=1
+                else:
+                    mine.errors+=1
+                continue
+            mine.latencies[op].append(time.perf_counter()-start)
+    results.add(mine)
+
+def lock_status(conn):
+#InnoDB row lock waits so far, None on backends without them
+    if backends.name(conn)!=backends.MYSQL:
+        return None
+    cur=conn.cursor(buffered=True)
+    try:
+        cur.execute("SHOW GLOBAL STATUS LIKE 'Innodb_row_lock_%'")
+        return {name:int(value) for name,value in cur.fetchall()}
+    finally:
+        cur.close()
+
+def percentile(values,q):
+#nearest rank, values are sorted
+    if not values:
+        return 0.0
+    return values[min(len(values)-1,int(q*len(values)))]
+
+def report(results,seconds,locks_before,locks_after):
+    retries=sum(row["retries"] for row in metrics.snapshot()["operations"].values())
+    summary={"seconds":seconds,"operations":{},"refused":results.refused,
+             "lock_errors":results.lock_errors,"retries":retries,"errors":results.errors}
+    print("+------------+----------+----------+----------+----------+----------+")
+    print("|","%10s"%"OPERATION","|","%8s"%"COUNT","|","%8s"%"OPS/S","|","%8s"%"P50_MS","|","%8s"%"P99_MS","|","%8s"%"MAX_MS","|")
+    print("+------------+----------+----------+----------+----------+----------+")
+    everything=[]
+    for op,values in list(results.latencies.items())+[("total",None)]:
+        if values is None:
+            values=everything
+        elif not values:
+            continue
+        values.sort()
+        if op!="total":
+            everything.extend(values)
+        row={"count":len(values),"ops_per_second":len(values)/seconds,"p50_ms":percentile(values,0.5)*1000,
+             "p99_ms":percentile(values,0.99)*1000,"max_ms":(values[-1] if values else 0)*1000}
+        summary["operations"][op]=row
+        print("|","%10s"%op,"|","%8d"%row["count"],"|","%8.0f"%row["ops_per_second"],"|","%8.2f"%row["p50_ms"],"|",
+              "%8.2f"%row["p99_ms"],"|","%8.2f"%row["max_ms"],"|")
+    print("+------------+----------+----------+----------+----------+----------+")
+    print("Refused (not enough money): {}, lock timeouts/deadlocks: {} (after {} retries), other errors: {}"
+          .format(results.refused,results.lock_errors,retries,results.errors))
+    if locks_before is not None:
+        waits=locks_after["Innodb_row_lock_waits"]-locks_before["Innodb_row_lock_waits"]
+        wait_ms=locks_after["Innodb_row_lock_time"]-locks_before["Innodb_row_lock_time"]
+        summary["row_lock_waits"]=waits
+        summary["row_lock_wait_ms"]=wait_ms
+        print("InnoDB row lock waits: {}, {} ms waiting ({:.2f} ms per wait)".format(waits,wait_ms,wait_ms/waits if waits else 0))
+    return summary
+
+def main(argv=None):
+    parser=argparse.ArgumentParser(description="Load test the banking operations.")
+    parser.add_argument("--clients",type=int,default=1000)
+    parser.add_argument("--employees",type=int,default=50)
+    parser.add_argument("--first-acc",type=int,default=50000,help="acc_no of the first seeded client")
+    parser.add_argument("--first-emp",type=int,default=50000,help="emp_no of the first seeded employee")
+    parser.add_argument("--workers",type=int,default=8)
+    parser.add_argument("--seconds",type=float,default=10)
+    parser.add_argument("--mix",type=parse_mix,default=MIX,help="operation=weight,... (default: {})"
+                        .format(",".join("{}={}".format(op,weight) for op,weight in MIX.items())))
+    parser.add_argument("--seed",type=int,default=1,help="random seed, the same seed replays the same operations")
+    parser.add_argument("--keep",action="store_true",help="keep the seeded rows")
+    parser.add_argument("--json",help="write the results to this file")
+    parser.add_argument("--metrics",help="write the timings of tools/metrics to this file (.json or Prometheus text)")
+    args=parser.parse_args(argv)
+    if args.clients<2:
+        parser.error("--clients should be at least 2")
+    if connection.cc(size=args.workers+1) is None:
+        print("Run main.py and finish the setup first.")
+        return 1
+    try:
+        with connection.pool.connection() as conn:
+            if seed.in_use(conn,args.first_acc,args.clients,args.first_emp,args.employees):
+                print("Accounts, journal entries or employees in the benchmark range already exist, use --first-acc/--first-emp.")
+                return 1
+            start=time.perf_counter()
+            seed.seed(conn,args.first_acc,args.clients,args.first_emp,args.employees,args.seed,
+                      balance=START_BALANCE,cash=START_CASH)
+            print("Seeded {} clients and {} employees in {:.2f}s".format(args.clients,args.employees,time.perf_counter()-start))
+            locks_before=lock_status(conn)
+        acc_nos=list(range(args.first_acc,args.first_acc+args.clients))
+        results=Results()
+        start=time.perf_counter()
+        deadline=start+args.seconds
+        threads=[threading.Thread(target=worker,args=(results,args.mix,acc_nos,deadline,args.seed+i))
+                 for i in range(args.workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        seconds=time.perf_counter()-start
+        with connection.pool.connection() as conn:
+            summary=report(results,seconds,locks_before,lock_status(conn))
+            if not args.keep:
+                unseed(conn,args.first_acc,args.clients,args.first_emp,args.employees)
+    except (errors.BankError,mysql.connector.Error) as err:
+        print(err.msg)
+        print("-----------Benchmark was unsuccessful!!!!-------------")
+        return 1
+    finally:
+        connection.pool.close()
+    if args.json:
+        summary.update({"workers":args.workers,"clients":args.clients,"mix":args.mix})
+        with open(args.json,"w") as f:
+            json.dump(summary,f,indent=2)
+    if args.metrics:
+        metrics.write(args.metrics)
+    return 0
+
+if __name__=="__main__":
+    sys.exit(main())
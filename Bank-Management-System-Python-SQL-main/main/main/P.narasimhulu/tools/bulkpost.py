@@ -0,0 +1,149 @@
+#Bulk posting of transfers (payroll, standing orders) from a CSV or JSONL file.
+#Run from this folder:  python -m tools.bulkpost postings.csv [--results out.csv]
+#CSV files have the columns from_acc,to_acc,amount (a header line is optional),
+#JSONL files have one {"from_acc":..,"to_acc":..,"amount":..} object per line.
+import argparse
+import csv
+import json
+import sys
+import time
+import mysql.connector
+from tools import connection
+from tools import journal
+from tools import metrics
+
+GROUP_SIZE=5000
+
+def integer(value):
+#int() would turn 1.5 and true into 1, both are rejected like in server.number
+    if isinstance(value,(bool,float)):
+        raise ValueError(value)
+    return int(value)
+
+def read_rows(path):
+#yields (line,from_acc,to_acc,amount), amount is None when the line can't be parsed
+    with open(path,newline="") as f:
+        if path.endswith(".jsonl") or path.endswith(".json"):
+            for line,text in enumerate(f,1):
+                if not text.strip():
+                    continue
+                try:
+                    row=json.loads(text)
+                    yield line,integer(row["from_acc"]),integer(row["to_acc"]),integer(row["amount"])
+                except (ValueError,KeyError,TypeError):
+                    yield line,None,None,None
+        else:
+            for line,row in enumerate(csv.reader(f),1):
+                if not row:
+                    continue
+                try:
+                    yield line,int(row[0]),int(row[1]),int(row[2])
+                except (ValueError,IndexError):
+                    if line==1 and row[0].strip()=="from_acc":
+                        continue
+                    yield line,None,None,None
+
+def chunks(rows,size):
+    chunk=[]
+    for row in rows:
+        chunk.append(row)
+        if len(chunk)==size:
+            yield chunk
+            chunk=[]
+    if chunk:
+        yield chunk
+
+def load_balances(cur,acc_nos):
+#one locking read for the whole group, rows are locked in primary key order
+    marks=",".join(["%s"]*len(acc_nos))
+    cur.execute("select acc_no,type,balance,loan_od from accounts where acc_no in ({}) order by acc_no for update"
+                .format(marks),acc_nos)
+    return {acc_no:[acc_type,balance,loan_od] for acc_no,acc_type,balance,loan_od in cur.fetchall()}
+
+def apply(chunk,balances):
+#applies the rows in file order on the locked balances, returns per row results
+    results=[]
+    for line,from_acc,to_acc,amount in chunk:
+        if amount is None:
+            error="Couldn't read the row"
+        elif amount<=0:
+            error="Amount should be more than 0"
+        elif from_acc==to_acc:
+            error="Can't transfer to the same account"
+        elif from_acc not in balances:
+            error="Account {} doesn't exist".format(from_acc)
+        elif to_acc not in balances:
+            error="Account {} doesn't exist".format(to_acc)
+        elif balances[from_acc][1]<amount:
+            error="Not enough balance"
+        else:
+            error=None
+            balances[from_acc][1]-=amount
+            balances[to_acc][1]+=amount
+        results.append((line,from_acc,to_acc,amount,"FAILED" if error else "POSTED",error or ""))
+    return results
+
+def post_group(conn,chunk):
+    acc_nos=sorted({acc for row in chunk if row[3] is not None for acc in row[1:3]})
+    def work(cur):
+        balances=load_balances(cur,acc_nos) if acc_nos else {}
+        before={acc_no:b[1] for acc_no,b in balances.items()}
+        results=apply(chunk,balances)
+        #executemany sends the upserts as one multi-row statement
+        data=[(acc_no,b[0],b[1],b[2]) for acc_no,b in balances.items() if b[1]!=before[acc_no]]
+        if data:
+            cur.executemany("INSERT INTO accounts (acc_no,type,balance,loan_od) VALUES (%s,%s,%s,%s) "
+                            "ON DUPLICATE KEY UPDATE balance=VALUES(balance)",data)
+        entries=[]
+        for line,from_acc,to_acc,amount,status,message in results:
+            if status=="POSTED":
+                entries.extend(journal.transfer(from_acc,to_acc,amount))
+        journal.write(cur,entries)
+        return results
+    timer=metrics.Timer("bulkpost.group")
+    timer.rows=len(chunk)
+    try:
+        with timer:
+            return connection.run_transaction(conn,work,"bulkpost.group")
+    except mysql.connector.Error as err:
+        return [(line,f,t,a,"FAILED",err.msg) for line,f,t,a in chunk]
+
+def post(conn,rows,group_size=GROUP_SIZE):
+#posts every row, one transaction and one commit per group of rows
+    for chunk in chunks(rows,group_size):
+        for result in post_group(conn,chunk):
+            yield result
+
+def main(argv=None):
+    parser=argparse.ArgumentParser(description="Post transfers in bulk from a CSV or JSONL file.")
+    parser.add_argument("file")
+    parser.add_argument("--results",help="write per row results to this CSV file (default: stdout)")
+    parser.add_argument("--group-size",type=int,default=GROUP_SIZE)
+    args=parser.parse_args(argv)
+    if connection.cc(size=1) is None:
+        print("Run main.py and finish the setup first.")
+        return 1
+    out=open(args.results,"w",newline="") if args.results else sys.stdout
+    writer=csv.writer(out)
+    writer.writerow(["line","from_acc","to_acc","amount","status","message"])
+    posted=failed=0
+    start=time.perf_counter()
+    try:
+        with connection.pool.connection() as conn:
+            for result in post(conn,read_rows(args.file),args.group_size):
+                writer.writerow(result)
+                if result[4]=="POSTED":
+                    posted+=1
+                else:
+                    failed+=1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        connection.pool.close()
+    seconds=time.perf_counter()-start
+    print("Posted {} transfers, {} failed, in {:.2f}s ({:.0f} rows/s)"
+          .format(posted,failed,seconds,(posted+failed)/seconds if seconds else 0),file=sys.stderr)
+    return 0
+
+if __name__=="__main__":
+    sys.exit(main())
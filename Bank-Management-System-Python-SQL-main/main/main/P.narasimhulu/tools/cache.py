@@ -0,0 +1,79 @@
+import threading
+import time
+from collections import OrderedDict
+from tools import queries
+
+#Profile rows kept in memory (rows, seconds)
+CACHE_SIZE=10000
+CACHE_TTL=300
+#cash in hand shown in the client panel can be this many seconds behind
+CASH_TTL=60
+
+class LRUCache:
+#Least recently used entries are dropped once maxsize is reached and entries
+#older than ttl seconds are treated as missing.
+    def __init__(self,maxsize=CACHE_SIZE,ttl=CACHE_TTL):
+        self.maxsize=maxsize
+        self.ttl=ttl
+        self.hits=0
+        self.misses=0
+        self._data=OrderedDict()
+        self._lock=threading.Lock()
+
+    def get(self,key):
+        with self._lock:
+            entry=self._data.get(key)
+            if entry is not None:
+                value,expires=entry
+                if expires>time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits+=1
+                    return value
+                del self._data[key]
+            self.misses+=1
+            return None
+
+    def put(self,key,value):
+        with self._lock:
+            self._data[key]=(value,time.monotonic()+self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data)>self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self,key):
+        with self._lock:
+            self._data.pop(key,None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+clients=LRUCache()
+employees=LRUCache()
+#cash in hand of the clients using the panel, see ledger.cash_in_hand
+cash=LRUCache(ttl=CASH_TTL)
+
+def lookup(cache,conn,name,key):
+    row=cache.get(key)
+    if row is None:
+        row=queries.fetchone(conn,name,(key,))
+        if row is not None:
+            cache.put(key,row)
+    return row
+
+def client(conn,acc_no):
+#clients row of acc_no, None if it doesn't exist
+    return lookup(clients,conn,"client",acc_no)
+
+def employee(conn,emp_no):
+#employees row of emp_no, None if it doesn't exist
+    return lookup(employees,conn,"employee",emp_no)
+
+def forget_client(acc_no):
+    clients.invalidate(acc_no)
+
+def forget_employee(emp_no):
+    employees.invalidate(emp_no)
+
+def forget_cash(acc_no):
+    cash.invalidate(acc_no)
@@ -0,0 +1,95 @@
+#Point in time balances. The journal has every balance change; a checkpoint is
+#the balance of an account at a cut-off time (the end of a day). The balance at
+#any time is the nearest checkpoint before it plus the journal entries after the
+#checkpoint, so the cost doesn't grow with the age of the account.
+#Run after the end of every day:  python -m tools.checkpoints [--day YYYY-MM-DD] [--all]
+import argparse
+import sys
+from datetime import date, datetime, time, timedelta
+import mysql.connector
+from tools import connection
+from tools import errors
+
+GROUP_SIZE=5000
+#journal rows are written just before their transaction commits, a cut-off is
+#only checkpointed once every transaction that started before it has finished
+SETTLE=timedelta(minutes=5)
+
+def cutoff(day):
+#end of the day = start of the next one
+    return datetime.combine(day+timedelta(days=1),time())
+
+def balance_as_of(conn,acc_no,when):
+#balance after every journal entry before when (a datetime)
+    cur=conn.cursor(buffered=True)
+    try:
+        cur.execute("select ts,balance from balance_checkpoints where acc_no=%s and ts<=%s "
+                    "order by ts desc limit 1",(acc_no,when))
+        row=cur.fetchone()
+        if row is None:
+            cur.execute("select coalesce(sum(amount),0) from journal where acc_no=%s and ts<%s",(acc_no,when))
+            return int(cur.fetchone()[0])
+        cur.execute("select coalesce(sum(amount),0) from journal where acc_no=%s and ts>=%s and ts<%s",
+                    (acc_no,row[0],when))
+        return row[1]+int(cur.fetchone()[0])
+    finally:
+        cur.close()
+
+def balance_on(conn,acc_no,day):
+#balance at the end of day
+    return balance_as_of(conn,acc_no,cutoff(day))
+
+def checkpoint(conn,day,all_accounts=False):
+#Checkpoints the balances at the end of day of the accounts that had journal
+#entries that day (every account with all_accounts). Returns the number of
+#checkpoints written. Current balances and the journal after the cut-off are
+#read in the same transaction, balance at the cut-off = balance - later entries.
+    end=cutoff(day)
+    if end>datetime.now()-SETTLE:
+        raise errors.BankError("{} isn't over yet, checkpoints can be taken {} after midnight".format(day,SETTLE))
+    cur=conn.cursor(buffered=True)
+    written=0
+    try:
+        with connection.transaction(conn):
+            cur.execute("select acc_no,sum(amount) from journal where ts>=%s group by acc_no",(end,))
+            later={acc_no:int(amount) for acc_no,amount in cur.fetchall()}
+            if all_accounts:
+                cur.execute("select acc_no,balance from accounts")
+            else:
+                #closed accounts are still checkpointed on the day they are closed
+                cur.execute("select d.acc_no,coalesce(a.balance,0) from "
+                            "(select distinct acc_no from journal where ts>=%s and ts<%s) d "
+                            "left join accounts a on a.acc_no=d.acc_no",(end-timedelta(days=1),end))
+            rows=[(acc_no,end,balance-later.get(acc_no,0)) for acc_no,balance in cur.fetchall()]
+            for i in range(0,len(rows),GROUP_SIZE):
+                cur.executemany("INSERT INTO balance_checkpoints (acc_no,ts,balance) VALUES (%s,%s,%s) "
+                                "ON DUPLICATE KEY UPDATE balance=VALUES(balance)",rows[i:i+GROUP_SIZE])
+                written+=len(rows[i:i+GROUP_SIZE])
+    finally:
+        cur.close()
+    return written
+
+def main(argv=None):
+    parser=argparse.ArgumentParser(description="Checkpoint the balances at the end of a day.")
+    parser.add_argument("--day",type=date.fromisoformat,default=date.today()-timedelta(days=1),
+                        help="YYYY-MM-DD (default: yesterday)")
+    parser.add_argument("--all",action="store_true",
+                        help="checkpoint every account, not only the ones that changed that day")
+    args=parser.parse_args(argv)
+    if connection.cc(size=1) is None:
+        print("Run main.py and finish the setup first.")
+        return 1
+    try:
+        with connection.pool.connection() as conn:
+            written=checkpoint(conn,args.day,args.all)
+    except (errors.BankError,mysql.connector.Error) as err:
+        print(err.msg)
+        print("-----------Checkpoint was unsuccessful!!!!-------------")
+        return 1
+    finally:
+        connection.pool.close()
+    print("Checkpointed {} balances at the end of {}".format(written,args.day))
+    return 0
+
+if __name__=="__main__":
+    sys.exit(main())
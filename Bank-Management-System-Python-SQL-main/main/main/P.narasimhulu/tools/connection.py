@@ -1,17 +1,223 @@
-from initialization import check
+from initialization import config
+from tools import backends
+from tools import metrics
 import mysql.connector
-import pickle
-def cc():
-    global cur
-    global conn
-    if not check.check():
-        cred = open("files//cred.dat","rb")
-        dat=pickle.load(cred)
-        cred.close()
-        Passwo=dat[0]
-        Databa=dat[1]
-        conn=mysql.connector.connect(host="localhost",user="root",password=Passwo,database=Databa)
-        cur=conn.cursor()
-        return conn,cur
+from mysql.connector import errorcode
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+#Pool settings (connections, seconds)
+POOL_SIZE=5
+IDLE_TIMEOUT=300
+HEALTH_CHECK_AFTER=30
+CHECKOUT_TIMEOUT=30
+
+#Retries of transactions that hit a deadlock or lock wait timeout (seconds)
+RETRY_ERRORS=(errorcode.ER_LOCK_DEADLOCK,errorcode.ER_LOCK_WAIT_TIMEOUT)
+RETRIES=5
+BACKOFF=0.005
+MAX_BACKOFF=0.5
+
+class PoolTimeout(Exception):
+    def __init__(self,msg):
+        super().__init__(msg)
+        self.msg=msg
+
+class ConnectionPool:
+    #Hands out one connection per operation instead of one global connection.
+    #Connections idle for longer than idle_timeout are closed, and connections
+    #idle for longer than check_after are pinged before they are handed out.
+    def __init__(self,connect,size=POOL_SIZE,idle_timeout=IDLE_TIMEOUT,
+                 check_after=HEALTH_CHECK_AFTER,timeout=CHECKOUT_TIMEOUT):
+        self.connect=connect
+        self.size=size
+        self.idle_timeout=idle_timeout
+        self.check_after=check_after
+        self.timeout=timeout
+        self._idle=[]
+        self._open=0
+        self._cond=threading.Condition()
+
+    def get(self):
+        deadline=time.monotonic()+self.timeout
+        while True:
+            with self._cond:
+                conn=None
+                while True:
+                    self._evict()
+                    if self._idle:
+                        conn,last_used=self._idle.pop()
+                        break
+                    if self._open<self.size:
+                        self._open+=1
+                        break
+                    remaining=deadline-time.monotonic()
+                    if remaining<=0:
+                        raise PoolTimeout("No free database connection after {} seconds".format(self.timeout))
+                    self._cond.wait(remaining)
+            if conn is None:
+                try:
+                    return self.connect()
+                except BaseException:
+                    self._release_slot()
+                    raise
+            if time.monotonic()-last_used<self.check_after or healthy(conn):
+                return conn
+            self._discard(conn)
+
+    def put(self,conn):
+        try:
+            if conn.unread_result:
+                conn.consume_results()
+            if conn.in_transaction:
+                conn.rollback()
+        except mysql.connector.Error:
+            self._discard(conn)
+            return
+        with self._cond:
+            self._idle.append((conn,time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        conn=self.get()
+        try:
+            yield conn
+        finally:
+            self.put(conn)
+
+    def close(self):
+        with self._cond:
+            idle,self._idle=self._idle,[]
+            self._open-=len(idle)
+            self._cond.notify_all()
+        for conn,last_used in idle:
+            close(conn)
+
+    def _evict(self):
+        #called with the lock held
+        now=time.monotonic()
+        keep=[]
+        for conn,last_used in self._idle:
+            if now-last_used>self.idle_timeout:
+                close(conn)
+                self._open-=1
+            else:
+                keep.append((conn,last_used))
+        self._idle=keep
+
+    def _discard(self,conn):
+        close(conn)
+        self._release_slot()
+
+    def _release_slot(self):
+        with self._cond:
+            self._open-=1
+            self._cond.notify()
+
+def healthy(conn):
+    try:
+        conn.ping(reconnect=False)
+    except mysql.connector.Error:
+        return False
+    return True
+
+def close(conn):
+    try:
+        conn.close()
+    except mysql.connector.Error:
+        pass
+
+pool=None
+
+def cc(size=POOL_SIZE,**options):
+    global pool
+    if not config.setup_needed():
+        cfg=config.load()
+        pool=ConnectionPool(backends.connector(cfg.password,cfg.database,cfg.backend,host=cfg.host,
+                                               user=cfg.user,port=cfg.port,**options),size)
+        return pool
     else:
-        return 0,0
\ No newline at end of file
+        return None
+
+@contextmanager
+def borrow():
+#One connection and cursor for the duration of one operation
+    with pool.connection() as conn:
+        cur=conn.cursor(buffered=True)
+        try:
+            yield conn,cur
+        finally:
+            cur.close()
+
+@contextmanager
+def using(conn=None):
+#conn itself, or a pooled connection for the duration of the block when conn is None
+    if conn is not None:
+        yield conn
+    else:
+        with pool.connection() as conn:
+            yield conn
+
+@contextmanager
+def transaction(conn):
+#Commits once at the end, rolls everything back if the block fails
+    conn.start_transaction()
+    try:
+        yield
+    except BaseException:
+        conn.rollback()
+        raise
+    else:
+        conn.commit()
+
+class RetryBudget:
+    #Every retry takes a token and every transaction that goes through puts back
+    #ratio of one, so when most transactions are failing on locks the retries
+    #stop instead of piling more work on the database.
+    def __init__(self,tokens=10,ratio=0.1):
+        self.max_tokens=tokens
+        self.tokens=tokens
+        self.ratio=ratio
+        self._lock=threading.Lock()
+
+    def take(self):
+        with self._lock:
+            if self.tokens<1:
+                return False
+            self.tokens-=1
+            return True
+
+    def earn(self):
+        with self._lock:
+            self.tokens=min(self.max_tokens,self.tokens+self.ratio)
+
+retry_budget=RetryBudget()
+
+def run_transaction(conn,work,name="transaction",retries=RETRIES):
+#Runs work(cur) in one transaction and returns what it returns. A deadlock or
+#lock wait timeout rolls the transaction back, and work runs again from the
+#start after a jittered exponential backoff, up to retries times while the
+#retry budget lasts. work must not have side effects outside the transaction.
+    attempt=0
+    while True:
+        cur=conn.cursor(buffered=True)
+        try:
+            with transaction(conn):
+                result=work(cur)
+        except mysql.connector.Error as err:
+            if err.errno not in RETRY_ERRORS:
+                raise
+            if attempt>=retries or not retry_budget.take():
+                metrics.count(name,"gave_up")
+                raise
+            attempt+=1
+            metrics.count(name,"retries")
+            time.sleep(random.uniform(0,min(MAX_BACKOFF,BACKOFF*2**attempt)))
+            continue
+        finally:
+            cur.close()
+        retry_budget.earn()
+        return result
@@ -1,17 +1,71 @@
 from datetime import date
 import mysql.connector
+from tools import ledger
 
 def age(birthdate):
     today = date.today()
     age = today.year - birthdate.year - ((today.month, today.day) < (birthdate.month, birthdate.day))
     return age
 
+#acc_no and emp_no are int columns, 9 digits always fit
+KEY_DIGITS=9
+
+#Checks shared by the prompts below and by tools/operations.
+#Each one returns the error message, or None when the value is fine.
+def check_key(no,x="acc_no"):
+    if no<0 or len(str(no))>KEY_DIGITS:
+        return "{} can have maximum {} digits!".format(x,KEY_DIGITS)
+
+def check_age(birth_date,person,minage,maxage):
+    if age(birth_date)<minage:
+        return "{} must be atleast {} years of age!!".format(person,minage)
+    if age(birth_date)>maxage:
+        return "Maximum age is {} years!!!".format(maxage)
+
+def check_date2(birth_date,date_2,person,minage,maxage):
+#hire date / account creation date against the birth date
+    if age(date_2)>maxage:
+        return "{} must be below {} years of age!!".format(person,maxage)
+    if age(birth_date)-age(date_2)<minage:
+        return "{} must atleast be {} years of age!!".format(person,minage)
+
+def check_name(name):
+    if len(name)>15:
+        return "Max 15 characters"
+
+def check_gender(gender):
+    if gender not in ('M','F'):
+        return "Gender should be M or F"
+
+def check_mobile(mobile_no):
+    #Thanks to the international phone numbering plan (ITU-T E. 164), 
+    #phone numbers cannot contain more than 15 digits. The shortest 
+    #international phone numbers in use contain seven digits.
+    if not mobile_no.isdigit():
+        return "mobile_no should be an integer!!"
+    if len(mobile_no)<7 or len(mobile_no)>15:
+        return "Mobile number can have min 7 digits and max 15!!"
+
+def check_email(email_id):
+    if len(email_id)>25:
+        return "Maximum 25 characters"
+
+def check_password(password):
+    if len(password)>8:
+        return "Max 8 characters only."
+    if len(password)<4:
+        return "Minimum 4 characters to be entered."
+
+def check_balance(bank_balance):
+    if bank_balance<1000:
+        return "Minimum balance is 1000 currency"
+
 
 def primary_key_no(x):
 #Employee number and client number
     while True:
-        emp_no=input("Enter {} (max 5 int): ".format(x))
-        if len(emp_no) <= 5:
+        emp_no=input("Enter {} (max {} int): ".format(x,KEY_DIGITS))
+        if len(emp_no) <= KEY_DIGITS:
             try:
                 emp_no=int(emp_no)
                 print("Done OK")
@@ -20,7 +74,7 @@ def primary_key_no(x):
             else:
                 return emp_no
         else:
-            print("Maximum length is 5!")
+            print("Maximum length is {}!".format(KEY_DIGITS))
 
 def birthdate(person,minage,maxage):     
 #Employee Birth date and client birth date
@@ -70,32 +124,32 @@ def birthdate(person,minage,maxage):
             import traceback
             traceback.print_exc()
         else:
-            if age(birth_date)>=minage and age(birth_date)<=maxage:
+            error=check_age(birth_date,person,minage,maxage)
+            if error is None:
                 return birth_date
             else:
-                if age(birth_date)<minage:
-                    print("{} must be atleast {} years of age!!".format(person,minage))
-                else:
-                    print("Maximum age is {} years!!!".format(maxage))
+                print(error)
                 print("\nwrong input\n")
 
 def fname():
 #Employee name and client name     
     while True:
         first_name=input("Enter first name (max 15 char): ")
-        if len(first_name)<= 15:
+        error=check_name(first_name)
+        if error is None:
             break
         else:
-            print("Max 15 characters")
+            print(error)
     return first_name
 
 def lname():
     while True:
         last_name=input("Enter last name (max 15 char): ")
-        if len(last_name)<= 15:
+        error=check_name(last_name)
+        if error is None:
             break
         else:
-            print("Max 15 characters")
+            print(error)
     
     return last_name
 
@@ -163,64 +217,52 @@ def date2(person,birth_date,hire_or_creation,minage,maxage):
             import traceback
             traceback.print_exc()
         else:
-            if age(hire_date)>maxage:
-                print("{} must be below {} years of age!!".format(person,maxage))
-            elif age(birth_date)-age(hire_date)>=minage:
+            error=check_date2(birth_date,hire_date,person,minage,maxage)
+            if error is None:
                 break
             else:
-                print("{} must atleast be {} years of age!!".format(person,minage))
+                print(error)
     return hire_date
 
 def mobileno():
     while True:
-        mobile_no_str=input("Enter mobile no. (7 to 15 int): ") 
-        mobile_no=mobile_no_str 
-        #Thanks to the international phone numbering plan (ITU-T E. 164), 
-        #phone numbers cannot contain more than 15 digits. The shortest 
-        #international phone numbers in use contain seven digits.
-        try:
-            mobile_no=int(mobile_no)
-        except ValueError:
-            print("mobile_no should be an integer!!")
+        mobile_no=input("Enter mobile no. (7 to 15 int): ") 
+        error=check_mobile(mobile_no)
+        if error is None:
+            lmn=len(mobile_no)
+            break
         else:
-            if len(mobile_no_str)>6 and len(mobile_no_str)<16:
-                mobile_no=mobile_no_str
-                lmn=len(mobile_no)
-                break
-            else:
-                print("Mobile number can have min 7 digits and max 15!!")
+            print(error)
     return mobile_no,lmn
 
 def email():
     while True:
         email_id=input("Enter client Email ID (max 25 char): ")
-        if len(email_id)<26:
+        error=check_email(email_id)
+        if error is None:
             break
         else:
-            print("Maximum 25 characters")
+            print(error)
     return email_id
 
 def clientpassword():
     while True:
             password=input("Enter client login password(max 8 characters, min 4): ")
             lp=len(password)
-            if lp>8:
-                print("Max 8 characters only.")
-            elif lp<4:
-                print("Minimum 4 characters to be entered.")
-            else:
+            error=check_password(password)
+            if error is None:
                 break
+            else:
+                print(error)
     return password,lp
 
-def tableupdate(conn,cur,query,data):
-    try:
-        cur.execute(query,data)
-        conn.commit()
-    except mysql.connector.Error as err:
-        print(err.msg)
-        print("-----------Value addition/deletion was unsuccessful!!!!-------------")
-    else:
-        return bool(True)
+def panelpassword(panel):
+    while True:
+        password=input("Enter {} panel password(max 8 characters, min 4): ".format(panel))
+        error=check_password(password)
+        if error is None:
+            return password
+        print(error)
 
 #bank balance 
 def balance():
@@ -233,8 +275,10 @@ def balance():
             except ValueError:
                 print("Balance should be an integer!!")
             else:
-                if bank_balance>=1000:
+                error=check_balance(bank_balance)
+                if error is None:
                     return bank_balance
+                print(error)
         else:
             print("Minimum balance is 1000 currency")
 
@@ -270,16 +314,10 @@ def amounts(deposit_or_withdraw_or_transfer,cash_in_hand_or_balance,acc_type):
                     return bool(False),None
 
 def handcash(conn,cur,acc_no):
-    cur.execute("select cash_in_hand from cash_in_hand where acc_no={}".format(acc_no))
-    cash_in_hand=cur.fetchall()
-    if cash_in_hand==[]:
-        query="insert into cash_in_hand values(%s,0)"
-        data=(acc_no,)
-        done=tableupdate(conn,cur,query,data)
-        if done:
-            cash_in_hand=0
-        else:
-            print("Unable to figure out your cash in hand values.")
-    else:
-        cash_in_hand=cash_in_hand[0][0]
+    try:
+        cash_in_hand=ledger.cash_in_hand(conn,acc_no)
+    except mysql.connector.Error as err:
+        print(err.msg)
+        print("Unable to figure out your cash in hand values.")
+        cash_in_hand=0
     return cash_in_hand
\ No newline at end of file
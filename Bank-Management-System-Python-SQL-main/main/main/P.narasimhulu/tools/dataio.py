@@ -0,0 +1,382 @@
+#Export and import of the bank tables as CSV, JSONL or columnar files.
+#Run from this folder:
+#  python -m tools.dataio export clients clients.csv
+#  python -m tools.dataio import clients clients.csv [--results failed.csv]
+#The format comes from the file name (.csv, .jsonl, .cols, with .gz for gzip) or
+#--format. "columns" files are JSONL with one object of column arrays per chunk of
+#rows, row groups like in Parquet, which need nothing outside the standard library.
+#
+#Exports read the table through one unbuffered cursor, so the rows stream from the
+#server CHUNK at a time and every chunk is written at once; memory does not grow
+#with the table. Imports read CHUNK rows at a time, check them column by column
+#with the rules of tools/dataentering and insert the good rows of a chunk with
+#multi-row INSERTs in one transaction. Rows that fail are reported with their row
+#number in the file, the others go in. Exported passwords are the stored hashes;
+#plaintext passwords in an imported file are hashed on the way in.
+import argparse
+import contextlib
+import csv
+import gzip
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+import mysql.connector
+from tools import connection
+from tools import dataentering
+from tools import errors
+from tools import journal
+from tools import metrics
+from tools import passwords
+from tools import search
+
+CHUNK=5000
+
+#(column,type) of every table, the first column is the key. savings and current
+#are the views over accounts, their rows are imported into accounts.
+COLUMNS={}
+COLUMNS['clients']=(("acc_no",int),("type",str),("first_name",str),("last_name",str),("gender",str),
+                    ("birth_date",date),("accd",date),("mobile_no",str),("email_id",str),("pass",str))
+COLUMNS['savings']=(("acc_no",int),("balance",int),("loan",str))
+COLUMNS['current']=(("acc_no",int),("balance",int),("overdraft",str))
+COLUMNS['loan']=(("acc_no",int),("loan_type",str),("loan_amt",int),("time_period_months",int),
+                 ("iterest_perc_per_annum",int),("amt-per-month",int),("remaining_amt",int))
+COLUMNS['overdraft']=(("acc_no",int),("overdraft_amt",int),("od_with_interest_remaining",int))
+COLUMNS['cash_in_hand']=(("acc_no",int),("cash_in_hand",int))
+
+FORMATS={".csv":"csv",".jsonl":"jsonl",".json":"jsonl",".cols":"columns"}
+
+def names(table):
+    return [name for name,kind in COLUMNS[table]]
+
+def quoted(columns):
+    return ",".join("`{}`".format(column) for column in columns)
+
+def file_format(path,fmt=None):
+    if fmt:
+        return fmt
+    if path.endswith(".gz"):
+        path=path[:-3]
+    for suffix,fmt in FORMATS.items():
+        if path.endswith(suffix):
+            return fmt
+    raise errors.BankError("Can't tell the format of {}, use --format".format(path))
+
+def open_file(path,mode):
+    if path=="-":
+        return contextlib.nullcontext(sys.stdout if mode=="w" else sys.stdin)
+    if path.endswith(".gz"):
+        return gzip.open(path,mode+"t",newline="")
+    return open(path,mode,newline="")
+
+#------------------------------Export------------------------------
+
+def plain(value):
+    return value.isoformat() if isinstance(value,date) else value
+
+def csv_writer(out,columns):
+    writer=csv.writer(out)
+    writer.writerow(columns)
+    return writer.writerows
+
+def jsonl_writer(out,columns):
+    def write(rows):
+        out.write("".join(json.dumps(dict(zip(columns,map(plain,row))))+"\n" for row in rows))
+    return write
+
+def columns_writer(out,columns):
+    def write(rows):
+        out.write(json.dumps({column:[plain(value) for value in values]
+                              for column,values in zip(columns,zip(*rows))})+"\n")
+    return write
+
+WRITERS={"csv":csv_writer,"jsonl":jsonl_writer,"columns":columns_writer}
+
+def export(conn,table,out,fmt,chunk=CHUNK):
+#writes the table in key order, returns the number of rows
+    columns=names(table)
+    write=WRITERS[fmt](out,columns)
+    count=0
+    cur=conn.cursor()
+    try:
+        cur.execute("select {} from `{}` order by {}".format(quoted(columns),table,columns[0]))
+        while True:
+            with metrics.Timer("export."+table) as timer:
+                rows=cur.fetchmany(chunk)
+                timer.rows=len(rows)
+                if rows:
+                    write(rows)
+            if not rows:
+                break
+            count+=len(rows)
+    finally:
+        cur.close()
+    return count
+
+#------------------------------Import------------------------------
+
+def read_csv(f,columns):
+    reader=csv.reader(f)
+    header=next(reader,None)
+    if header is None:
+        return
+    missing=[column for column in columns if column not in header]
+    if missing:
+        raise errors.BankError("The file has no {} column".format(",".join(missing)))
+    at=[header.index(column) for column in columns]
+    for row in reader:
+        if row:
+            yield [row[i] if i<len(row) else None for i in at]
+
+def read_jsonl(f,columns):
+    for text in f:
+        if text.strip():
+            try:
+                row=json.loads(text)
+            except ValueError:
+                yield None
+                continue
+            yield [row.get(column) for column in columns] if isinstance(row,dict) else None
+
+def read_columns(f,columns):
+    for line,text in enumerate(f,1):
+        if text.strip():
+#a broken row group loses all of its rows, so the whole import stops at it
+            try:
+                group=json.loads(text)
+            except ValueError:
+                raise errors.BankError("Couldn't read the row group on line {}".format(line)) from None
+            if not isinstance(group,dict) or not all(isinstance(values,list) for values in group.values()):
+                raise errors.BankError("The row group on line {} isn't an object of column lists".format(line))
+            missing=[column for column in columns if column not in group]
+            if missing:
+                raise errors.BankError("The row group on line {} has no {} column".format(line,",".join(missing)))
+            for row in zip(*[group[column] for column in columns]):
+                yield list(row)
+
+READERS={"csv":read_csv,"jsonl":read_jsonl,"columns":read_columns}
+
+def convert(kind,value):
+    if value is None:
+        raise ValueError(value)
+    if kind is date:
+        return date.fromisoformat(str(value))
+    if kind is int and isinstance(value,float):
+        raise ValueError(value)
+    return kind(value)
+
+def one_of(column,values):
+    def check(value):
+        if value not in values:
+            return "{} should be {}".format(column,"/".join(values))
+    return check
+
+def stored_password(value):
+#a hash from an export, or a new plaintext password
+    if not passwords.is_hash(value):
+        return dataentering.check_password(value)
+    if not passwords.well_formed(value):
+        return "pass isn't a valid password hash"
+
+def not_negative(column):
+    def check(value):
+        if value<0:
+            return "{} can't be negative".format(column)
+    return check
+
+#(columns,check) of every table, the checks return the error message or None like
+#the ones in tools/dataentering. They are run after the key check.
+RULES={}
+RULES['clients']=[
+    (("type",),one_of("type",("S","C"))),
+    (("first_name",),dataentering.check_name),
+    (("last_name",),dataentering.check_name),
+    (("gender",),dataentering.check_gender),
+    (("birth_date",),lambda birth_date:dataentering.check_age(birth_date,"Client",10,100)),
+    (("birth_date","accd"),lambda birth_date,accd:dataentering.check_date2(birth_date,accd,"client",10,100)),
+    (("mobile_no",),dataentering.check_mobile),
+    (("email_id",),dataentering.check_email),
+    (("pass",),stored_password),
+]
+#balances can go below 0 (loan EMIs), only the flags are checked
+RULES['savings']=[(("loan",),one_of("loan",("YES","NO")))]
+RULES['current']=[(("overdraft",),one_of("overdraft",("YES","NO")))]
+RULES['loan']=[(("loan_type",),one_of("loan_type",("PL","HL","EL","TL","BL")))]+[
+    ((column,),not_negative(column)) for column in ("loan_amt","time_period_months","iterest_perc_per_annum",
+                                                    "amt-per-month","remaining_amt")]
+RULES['overdraft']=[((column,),not_negative(column)) for column in ("overdraft_amt","od_with_interest_remaining")]
+RULES['cash_in_hand']=[(("cash_in_hand",),not_negative("cash_in_hand"))]
+
+def validate(table,rows):
+#rows are [row_no,values,error], values are converted and the errors filled in.
+#Every check runs over the whole chunk before the next one, one column at a time.
+    kinds=COLUMNS[table]
+    for i,(column,kind) in enumerate(kinds):
+        for row in rows:
+            if row[2] is None:
+                try:
+                    row[1][i]=convert(kind,row[1][i])
+                except (ValueError,TypeError):
+                    row[2]="Couldn't read {}".format(column)
+    key=kinds[0][0]
+    rules=[((key,),lambda no:dataentering.check_key(no,key))]+RULES[table]
+    at={column:i for i,(column,kind) in enumerate(kinds)}
+    for columns,check in rules:
+        index=[at[column] for column in columns]
+        for row in rows:
+            if row[2] is None:
+                row[2]=check(*[row[1][i] for i in index])
+
+def existing(cur,table,acc_nos,column="acc_no"):
+#{acc_no: column} of the acc_nos that are in the table
+    if not acc_nos:
+        return {}
+    cur.execute("select acc_no,{} from {} where acc_no in ({})".format(column,table,",".join(["%s"]*len(acc_nos))),
+                acc_nos)
+    return dict(cur.fetchall())
+
+def check_keys(cur,table,rows):
+#keys already in the table (or twice in the chunk) and accounts of clients that aren't there
+    good=[row for row in rows if row[2] is None]
+    acc_nos=sorted({row[1][0] for row in good})
+    target="accounts" if table in ("savings","current") else table
+    taken=existing(cur,target,acc_nos)
+    clients=existing(cur,"clients",acc_nos,"type") if table!="clients" else {}
+    seen=set()
+    for row in good:
+        acc_no=row[1][0]
+        if acc_no in taken or acc_no in seen:
+            row[2]="acc_no {} is already in {}".format(acc_no,target)
+        elif table!="clients" and acc_no not in clients:
+            row[2]="Account {} doesn't exist".format(acc_no)
+        elif (table=="savings" and clients[acc_no]!="S") or (table=="current" and clients[acc_no]!="C"):
+            row[2]="Account {} isn't a {} account".format(acc_no,table)
+        seen.add(acc_no)
+
+def insert(cur,table,columns,rows):
+    if rows:
+        cur.executemany("INSERT INTO {} ({}) VALUES ({})".format(table,quoted(columns),",".join(["%s"]*len(columns))),
+                        rows)
+
+def write(cur,table,rows):
+    values=[row[1] for row in rows if row[2] is None]
+    if table=="clients":
+        insert(cur,"clients",names(table),values)
+        insert(cur,"client_trigrams",("trigram","acc_no"),
+               [data for value in values for data in search.index_rows(value[0],value[2],value[3])])
+    elif table in ("savings","current"):
+        acc_type="S" if table=="savings" else "C"
+        insert(cur,"accounts",("acc_no","type","balance","loan_od"),
+               [(acc_no,acc_type,balance,loan_od) for acc_no,balance,loan_od in values])
+        #the balance is what the journal opens the account with, like a new account
+        journal.write(cur,[(acc_no,"OPEN",balance,None) for acc_no,balance,loan_od in values])
+    else:
+        insert(cur,table,names(table),values)
+
+def import_chunk(conn,table,chunk,executor=None):
+#chunk is [(row_no,values)], returns [(row_no,acc_no,error)] of the rows that failed.
+#executor is the pool of processes that hashes plaintext passwords.
+    checked=[[row_no,values,None if values is not None else "Couldn't read the row"] for row_no,values in chunk]
+    validate(table,checked)
+    if table=="clients":
+        plain=[row for row in checked if row[2] is None and not passwords.is_hash(row[1][9])]
+        for row,stored in zip(plain,passwords.hash_many([row[1][9] for row in plain],executor=executor)):
+            row[1][9]=stored
+    def work(cur):
+        #a retried transaction checks the keys again
+        rows=[list(row) for row in checked]
+        check_keys(cur,table,rows)
+        write(cur,table,rows)
+        return rows
+    timer=metrics.Timer("import."+table)
+    timer.rows=len(checked)
+    try:
+        with timer:
+            rows=connection.run_transaction(conn,work,"import."+table)
+    except mysql.connector.Error as err:
+        return [(row[0],row[1][0] if row[1] else None,row[2] or err.msg) for row in checked]
+    return [(row[0],row[1][0] if row[1] else None,row[2]) for row in rows if row[2] is not None]
+
+def chunks(rows,size):
+    chunk=[]
+    for row in rows:
+        chunk.append(row)
+        if len(chunk)==size:
+            yield chunk
+            chunk=[]
+    if chunk:
+        yield chunk
+
+def load(conn,table,f,fmt,chunk=CHUNK):
+#yields (row_no,acc_no,error) of every row that failed and (None,count,None) at the end
+    rows=enumerate(READERS[fmt](f,names(table)),1)
+    count=0
+    #one pool for every chunk, the processes only start when a chunk has passwords to hash
+    with ProcessPoolExecutor() as executor:
+        for part in chunks(rows,chunk):
+            failed=import_chunk(conn,table,part,executor)
+            count+=len(part)-len(failed)
+            for result in failed:
+                yield result
+    yield None,count,None
+
+#------------------------------Command line------------------------------
+
+def main(argv=None):
+    parser=argparse.ArgumentParser(description="Export or import bank tables as CSV, JSONL or columnar files.")
+    parser.add_argument("action",choices=("export","import"))
+    parser.add_argument("table",choices=list(COLUMNS))
+    parser.add_argument("file",help="- for stdout/stdin")
+    parser.add_argument("--format",choices=list(WRITERS),help="default: from the file name (.csv .jsonl .cols)")
+    parser.add_argument("--chunk",type=int,default=CHUNK,help="rows per read/write and per import transaction")
+    parser.add_argument("--results",help="write the rows that failed to this CSV file (default: stdout)")
+    args=parser.parse_args(argv)
+    try:
+        fmt=file_format(args.file,args.format or ("csv" if args.file=="-" else None))
+    except errors.BankError as err:
+        print(err.msg)
+        return 1
+    if connection.cc(size=1) is None:
+        print("Run main.py and finish the setup first.")
+        return 1
+    start=time.perf_counter()
+    try:
+        with connection.pool.connection() as conn:
+            if args.action=="export":
+                with open_file(args.file,"w") as out:
+                    count=export(conn,args.table,out,fmt,args.chunk)
+                failed=0
+            else:
+                out=open(args.results,"w",newline="") if args.results else sys.stdout
+                writer=csv.writer(out)
+                writer.writerow(["row","acc_no","message"])
+                failed=0
+                try:
+                    with open_file(args.file,"r") as f:
+                        for row_no,acc_no,error in load(conn,args.table,f,fmt,args.chunk):
+                            if row_no is None:
+                                count=acc_no
+                            else:
+                                writer.writerow([row_no,acc_no,error])
+                                failed+=1
+                finally:
+                    if out is not sys.stdout:
+                        out.close()
+    except (errors.BankError,mysql.connector.Error) as err:
+        print(err.msg,file=sys.stderr)
+        print("-----------{} was unsuccessful!!!!-------------".format(args.action.capitalize()),file=sys.stderr)
+        return 1
+    finally:
+        connection.pool.close()
+    seconds=time.perf_counter()-start
+    rate=(count+failed)/seconds if seconds else 0
+    if args.action=="export":
+        print("Exported {} rows of {} in {:.2f}s ({:.0f} rows/s)".format(count,args.table,seconds,rate),file=sys.stderr)
+    else:
+        print("Imported {} rows of {}, {} failed, in {:.2f}s ({:.0f} rows/s)"
+              .format(count,args.table,failed,seconds,rate),file=sys.stderr)
+    return 0
+
+if __name__=="__main__":
+    sys.exit(main())
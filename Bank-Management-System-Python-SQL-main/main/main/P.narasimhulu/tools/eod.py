@@ -0,0 +1,213 @@
+#End of day batch: savings interest, loan EMIs and overdraft interest.
+#Run once after the end of every day:  python -m tools.eod [--day YYYY-MM-DD]
+#Every day one day of interest is accrued on the savings balances. On the last
+#day of a month the accrued interest is credited, the EMIs of the loans are taken
+#from the savings balances and a month of interest is added to the overdrafts.
+#
+#Rows are read CHUNK at a time in acc_no order into NumPy arrays, computed with
+#array operations and written back with one multi-row statement per chunk. Each
+#chunk is one transaction and eod_runs keeps the last account of every step, so
+#a batch that stopped halfway carries on from there when it is run again.
+import argparse
+import calendar
+import sys
+import time
+from datetime import date, timedelta
+import mysql.connector
+from tools import connection
+from tools import errors
+from tools import journal
+from tools import metrics
+try:
+    import numpy as np
+except ImportError:
+    np=None
+
+CHUNK=50000
+#per cent per annum
+SAVINGS_RATE=3.5
+OD_RATE=12
+
+#---------------------------Calculations---------------------------
+#All of these take and return arrays with one value per account.
+
+def accrue(balance,accrued,rate,days_in_year):
+#one day of interest, negative balances earn nothing
+    return accrued+np.maximum(balance,0)*rate/100/days_in_year
+
+def credit(accrued):
+#whole currency units are credited, the fraction stays accrued
+#returns (credited,still accrued)
+    whole=np.floor(accrued)
+    return whole,accrued-whole
+
+def emi(principal,annual_rate,months):
+#equated monthly instalment, rounded up
+    r=annual_rate/1200
+    n=np.maximum(months,1)
+    growth=(1+r)**n
+    with np.errstate(divide="ignore",invalid="ignore"):
+        amount=np.where(r>0,principal*r*growth/(growth-1),principal/n)
+    return np.ceil(amount)
+
+def amortize(remaining,annual_rate,instalment,balance):
+#one month of a loan: the month's interest is added to what is owed and the
+#instalment is taken when the balance covers it. returns (paid,remaining)
+    owed=remaining+np.rint(remaining*annual_rate/1200)
+    due=np.minimum(instalment,owed)
+    paid=np.where(balance>=due,due,0)
+    return paid,owed-paid
+
+def od_interest(owed,rate):
+    return owed+np.rint(owed*rate/1200)
+
+def column(rows,i):
+    return np.array([row[i] for row in rows],dtype=np.float64)
+
+def ints(values):
+    return values.astype(np.int64).tolist()
+
+#------------------------------Steps------------------------------
+#A step reads the chunk after acc_no last, writes it back and returns
+#(rows read,last acc_no of the chunk).
+
+def accrue_step(cur,day,last,chunk):
+    cur.execute("select a.acc_no,a.balance,coalesce(r.accrued,0) from accounts a "
+                "left join accruals r on r.acc_no=a.acc_no "
+                "where a.type='S' and a.acc_no>%s order by a.acc_no limit %s",(last,chunk))
+    rows=cur.fetchall()
+    if not rows:
+        return 0,last
+    days_in_year=366 if calendar.isleap(day.year) else 365
+    accrued=accrue(column(rows,1),column(rows,2),SAVINGS_RATE,days_in_year)
+    cur.executemany("INSERT INTO accruals (acc_no,accrued) VALUES (%s,%s) "
+                    "ON DUPLICATE KEY UPDATE accrued=VALUES(accrued)",
+                    list(zip([row[0] for row in rows],np.round(accrued,4).tolist())))
+    return len(rows),rows[-1][0]
+
+def interest_step(cur,day,last,chunk):
+    cur.execute("select a.acc_no,a.type,a.balance,a.loan_od,r.accrued from accruals r "
+                "join accounts a on a.acc_no=r.acc_no "
+                "where r.acc_no>%s order by r.acc_no limit %s for update",(last,chunk))
+    rows=cur.fetchall()
+    if not rows:
+        return 0,last
+    whole,rest=credit(column(rows,4))
+    balance=column(rows,2)+whole
+    acc_nos=[row[0] for row in rows]
+    cur.executemany("INSERT INTO accruals (acc_no,accrued) VALUES (%s,%s) "
+                    "ON DUPLICATE KEY UPDATE accrued=VALUES(accrued)",
+                    list(zip(acc_nos,np.round(rest,4).tolist())))
+    post(cur,rows,balance,whole>0,[(row[0],"INTEREST",amount,None) for row,amount in zip(rows,ints(whole)) if amount>0])
+    return len(rows),rows[-1][0]
+
+def emi_step(cur,day,last,chunk):
+    cur.execute("select a.acc_no,a.type,a.balance,a.loan_od,l.loan_amt,l.time_period_months,"
+                "l.iterest_perc_per_annum,l.`amt-per-month`,l.remaining_amt,l.loan_type from loan l "
+                "join accounts a on a.acc_no=l.acc_no "
+                "where l.remaining_amt>0 and l.acc_no>%s order by l.acc_no limit %s for update",(last,chunk))
+    rows=cur.fetchall()
+    if not rows:
+        return 0,last
+    rate=column(rows,6)
+    #loans sanctioned since the last run have no EMI yet
+    instalment=column(rows,7)
+    instalment=np.where(instalment>0,instalment,emi(column(rows,4),rate,column(rows,5)))
+    paid,remaining=amortize(column(rows,8),rate,instalment,column(rows,2))
+    balance=column(rows,2)-paid
+    cur.executemany("INSERT INTO loan (acc_no,loan_type,loan_amt,time_period_months,iterest_perc_per_annum,"
+                    "`amt-per-month`,remaining_amt) VALUES (%s,%s,%s,%s,%s,%s,%s) "
+                    "ON DUPLICATE KEY UPDATE `amt-per-month`=VALUES(`amt-per-month`),remaining_amt=VALUES(remaining_amt)",
+                    [(row[0],row[9],row[4],row[5],row[6],each,left)
+                     for row,each,left in zip(rows,ints(instalment),ints(remaining))])
+    #the loan flag is cleared with the last instalment
+    loan_od=["NO" if left<=0 else row[3] for row,left in zip(rows,ints(remaining))]
+    post(cur,rows,balance,(paid>0)|(remaining<=0),
+         [(row[0],"EMI",-amount,None) for row,amount in zip(rows,ints(paid)) if amount>0],loan_od)
+    return len(rows),rows[-1][0]
+
+def od_step(cur,day,last,chunk):
+    cur.execute("select acc_no,overdraft_amt,od_with_interest_remaining from overdraft "
+                "where od_with_interest_remaining>0 and acc_no>%s order by acc_no limit %s for update",(last,chunk))
+    rows=cur.fetchall()
+    if not rows:
+        return 0,last
+    owed=od_interest(column(rows,2),OD_RATE)
+    cur.executemany("INSERT INTO overdraft (acc_no,overdraft_amt,od_with_interest_remaining) VALUES (%s,%s,%s) "
+                    "ON DUPLICATE KEY UPDATE od_with_interest_remaining=VALUES(od_with_interest_remaining)",
+                    [(row[0],row[1],new) for row,new in zip(rows,ints(owed))])
+    return len(rows),rows[-1][0]
+
+def post(cur,rows,balance,changed,entries,loan_od=None):
+#writes the new balances of the changed accounts (rows start with acc_no,type,balance,loan_od)
+    if loan_od is None:
+        loan_od=[row[3] for row in rows]
+    data=[(row[0],row[1],new,flag) for row,new,flag,c in zip(rows,ints(balance),loan_od,changed.tolist()) if c]
+    if data:
+        cur.executemany("INSERT INTO accounts (acc_no,type,balance,loan_od) VALUES (%s,%s,%s,%s) "
+                        "ON DUPLICATE KEY UPDATE balance=VALUES(balance),loan_od=VALUES(loan_od)",data)
+    journal.write(cur,entries)
+
+#------------------------------Runner------------------------------
+
+def steps(day):
+    if (day+timedelta(days=1)).day==1:
+        return [("accrue",accrue_step),("interest",interest_step),("emi",emi_step),("od",od_step)]
+    return [("accrue",accrue_step)]
+
+def run_step(conn,day,step,work,chunk=CHUNK):
+#returns the number of rows done by this call
+    cur=conn.cursor(buffered=True)
+    try:
+        cur.execute("insert ignore into eod_runs values(%s,%s,-1,'NO')",(day,step))
+        cur.execute("select last_acc_no,done from eod_runs where day=%s and step=%s",(day,step))
+        last,done=cur.fetchone()
+    finally:
+        cur.close()
+    def next_chunk(cur):
+        #the chunk after last and the progress go in one transaction
+        rows,new_last=work(cur,day,last,chunk)
+        new_done="YES" if rows<chunk else "NO"
+        cur.execute("update eod_runs set last_acc_no=%s,done=%s where day=%s and step=%s",
+                    (new_last,new_done,day,step))
+        return rows,new_last,new_done
+    count=0
+    while done=="NO":
+        with metrics.Timer("eod."+step) as timer:
+            rows,last,done=connection.run_transaction(conn,next_chunk,"eod."+step)
+            timer.rows=rows
+        count+=rows
+    return count
+
+def run(conn,day,chunk=CHUNK):
+    if np is None:
+        raise errors.BankError("The end of day batch needs NumPy (pip install numpy)")
+    if day>=date.today():
+        raise errors.BankError("{} isn't over yet".format(day))
+    for step,work in steps(day):
+        start=time.perf_counter()
+        count=run_step(conn,day,step,work,chunk)
+        print("{:>8}: {} rows in {:.2f}s".format(step,count,time.perf_counter()-start))
+
+def main(argv=None):
+    parser=argparse.ArgumentParser(description="End of day interest and loan batch.")
+    parser.add_argument("--day",type=date.fromisoformat,default=date.today()-timedelta(days=1),
+                        help="YYYY-MM-DD (default: yesterday)")
+    parser.add_argument("--chunk",type=int,default=CHUNK,help="accounts per transaction")
+    args=parser.parse_args(argv)
+    if connection.cc(size=1) is None:
+        print("Run main.py and finish the setup first.")
+        return 1
+    try:
+        with connection.pool.connection() as conn:
+            run(conn,args.day,args.chunk)
+    except (errors.BankError,mysql.connector.Error) as err:
+        print(err.msg)
+        print("-----------End of day batch was unsuccessful!!!!-------------")
+        return 1
+    finally:
+        connection.pool.close()
+    return 0
+
+if __name__=="__main__":
+    sys.exit(main())
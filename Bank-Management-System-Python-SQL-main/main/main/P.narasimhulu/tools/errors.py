@@ -0,0 +1,10 @@
+class BankError(Exception):
+#Business rule errors of the bank operations. Like mysql.connector errors
+#they carry the message to show in .msg
+    def __init__(self,msg):
+        super().__init__(msg)
+        self.msg=msg
+
+class NotFound(BankError):
+#The account or employee number doesn't exist
+    pass
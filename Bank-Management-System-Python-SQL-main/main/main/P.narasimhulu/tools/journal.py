@@ -0,0 +1,81 @@
+#Append-only transaction journal. Every balance change writes its entries with
+#write() on the cursor of the transaction that changes the balance, so the
+#journal and the balances always commit (or roll back) together.
+#Statements for audits:  python -m tools.journal <acc_no> --from 2024-01-01 --to 2024-03-31
+import argparse
+import csv
+import sys
+from datetime import date, datetime, time, timedelta
+from tools import connection
+from tools import listing
+
+PAGE_SIZE=500
+
+def write(cur,entries,ts=None):
+#entries are (acc_no,kind,amount,ref_acc), amount is + for money into the account
+    if not entries:
+        return
+    if ts is None:
+        ts=datetime.now()
+    cur.executemany("insert into journal (acc_no,ts,kind,amount,ref_acc) values (%s,%s,%s,%s,%s)",
+                    [(acc_no,ts,kind,amount,ref_acc) for acc_no,kind,amount,ref_acc in entries])
+
+def transfer(from_acc,to_acc,amount):
+    return [(from_acc,"TRANSFER",-amount,to_acc),(to_acc,"TRANSFER",amount,from_acc)]
+
+def bounds(start,end):
+#dates -> [start 00:00, day after end 00:00), None is open ended
+    start=datetime.combine(start,time()) if start else None
+    end=datetime.combine(end+timedelta(days=1),time()) if end else None
+    return start,end
+
+def statement(conn,acc_no,start=None,end=None,page_size=PAGE_SIZE):
+#Yields pages of (entry_no,ts,kind,amount,ref_acc) in time order. Every page is a
+#range scan of the (acc_no,ts) index that starts after the last row of the
+#previous page, so long histories are never read into memory at once.
+#conn None takes a pooled connection per page, see listing.fetch.
+    start,end=bounds(start,end)
+    last=None
+    while True:
+        conds=["acc_no=%s"]
+        data=[acc_no]
+        if start is not None:
+            conds.append("ts>=%s")
+            data.append(start)
+        if end is not None:
+            conds.append("ts<%s")
+            data.append(end)
+        if last is not None:
+            conds.append("(ts>%s or (ts=%s and entry_no>%s))")
+            data.extend([last[1],last[1],last[0]])
+        data.append(page_size)
+        rows=listing.fetch(conn,"select entry_no,ts,kind,amount,ref_acc from journal where {} "
+                           "order by ts,entry_no limit %s".format(" and ".join(conds)),data)
+        if not rows:
+            break
+        yield rows
+        if len(rows)<page_size:
+            break
+        last=rows[-1]
+
+def main(argv=None):
+    parser=argparse.ArgumentParser(description="Write the statement of an account as CSV.")
+    parser.add_argument("acc_no",type=int)
+    parser.add_argument("--from",dest="start",type=date.fromisoformat,help="YYYY-MM-DD")
+    parser.add_argument("--to",dest="end",type=date.fromisoformat,help="YYYY-MM-DD")
+    args=parser.parse_args(argv)
+    if connection.cc(size=1) is None:
+        print("Run main.py and finish the setup first.")
+        return 1
+    writer=csv.writer(sys.stdout)
+    writer.writerow(["entry_no","ts","kind","amount","ref_acc"])
+    try:
+        with connection.pool.connection() as conn:
+            for rows in statement(conn,args.acc_no,args.start,args.end):
+                writer.writerows(rows)
+    finally:
+        connection.pool.close()
+    return 0
+
+if __name__=="__main__":
+    sys.exit(main())
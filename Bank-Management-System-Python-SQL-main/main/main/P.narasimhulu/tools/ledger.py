@@ -0,0 +1,113 @@
+from tools import backends
+from tools import cache
+from tools import connection
+from tools import errors
+from tools import journal
+
+class LedgerError(errors.BankError):
+    pass
+
+def lock_accounts(cur,acc_nos):
+#Row locks are always taken in ascending acc_no order, so two movements
+#touching the same pair of accounts in opposite directions can't deadlock.
+#Returns {acc_no: balance}
+    acc_nos=sorted(set(acc_nos))
+    marks=",".join(["%s"]*len(acc_nos))
+    cur.execute("select acc_no,balance from accounts where acc_no in ({}) order by acc_no for update".format(marks),acc_nos)
+    balances=dict(cur.fetchall())
+    for acc_no in acc_nos:
+        if acc_no not in balances:
+            raise errors.NotFound("Account {} doesn't exist".format(acc_no))
+    return balances
+
+#Creates the cash_in_hand row on first use and returns the value in the same
+#statement. On MySQL LAST_INSERT_ID(cash_in_hand) hands the existing value back
+#as the insert id, a new row has the insert id 0 which is also its value.
+UPSERT_CASH={}
+UPSERT_CASH[backends.MYSQL]=("INSERT INTO cash_in_hand VALUES(%s,0) "
+                             "ON DUPLICATE KEY UPDATE cash_in_hand=LAST_INSERT_ID(cash_in_hand)")
+UPSERT_CASH[backends.SQLITE]=("INSERT INTO cash_in_hand VALUES(%s,0) "
+                              "ON CONFLICT DO UPDATE SET cash_in_hand=cash_in_hand RETURNING cash_in_hand")
+
+def cash_in_hand(conn,acc_no):
+#Kept in cache.cash after the first look up, deposit and withdraw put the value
+#they commit there, so the client panel doesn't go to the database for it.
+#Changes made by another process (the HTTP server, a bulk posting, a panel in
+#another terminal) only show here once the entry expires, up to cache.CASH_TTL
+#seconds later. Deposits and withdrawals always check the locked row.
+    value=cache.cash.get(acc_no)
+    if value is None:
+        backend=backends.name(conn)
+        cur=conn.cursor()
+        try:
+            cur.execute(UPSERT_CASH[backend],(acc_no,))
+            if backend==backends.MYSQL:
+                value=cur.lastrowid or 0
+            else:
+                value=cur.fetchall()[0][0]
+        finally:
+            cur.close()
+        cache.cash.put(acc_no,value)
+    return value
+
+def lock_cash(cur,acc_no,backend):
+#The upsert creates a missing row without a select-then-insert race, the row is
+#then read under its lock.
+    cur.execute(UPSERT_CASH[backend],(acc_no,))
+    if cur.with_rows:
+        cur.fetchall()
+    cur.execute("select cash_in_hand from cash_in_hand where acc_no=%s for update",(acc_no,))
+    return cur.fetchone()[0]
+
+def check_amount(amount):
+    if amount<=0:
+        raise LedgerError("Amount should be more than 0")
+
+def deposit(conn,acc_no,amount):
+#cash_in_hand -> balance, returns (balance,cash_in_hand) after the deposit
+    check_amount(amount)
+    backend=backends.name(conn)
+    def work(cur):
+        balance=lock_accounts(cur,[acc_no])[acc_no]
+        cash_in_hand=lock_cash(cur,acc_no,backend)
+        if amount>cash_in_hand:
+            raise LedgerError("You do not have sufficient cash_in_hand")
+        cur.execute("update accounts set balance=balance+%s where acc_no=%s",(amount,acc_no))
+        cur.execute("update cash_in_hand set cash_in_hand=cash_in_hand-%s where acc_no=%s",(amount,acc_no))
+        journal.write(cur,[(acc_no,"DEPOSIT",amount,None)])
+        return balance,cash_in_hand
+    balance,cash_in_hand=connection.run_transaction(conn,work,"deposit")
+    cache.cash.put(acc_no,cash_in_hand-amount)
+    return balance+amount,cash_in_hand-amount
+
+def withdraw(conn,acc_no,amount):
+#balance -> cash_in_hand, returns (balance,cash_in_hand) after the withdrawal
+    check_amount(amount)
+    backend=backends.name(conn)
+    def work(cur):
+        balance=lock_accounts(cur,[acc_no])[acc_no]
+        cash_in_hand=lock_cash(cur,acc_no,backend)
+        if amount>balance:
+            raise LedgerError("You do not have enough balance")
+        cur.execute("update accounts set balance=balance-%s where acc_no=%s",(amount,acc_no))
+        cur.execute("update cash_in_hand set cash_in_hand=cash_in_hand+%s where acc_no=%s",(amount,acc_no))
+        journal.write(cur,[(acc_no,"WITHDRAW",-amount,None)])
+        return balance,cash_in_hand
+    balance,cash_in_hand=connection.run_transaction(conn,work,"withdraw")
+    cache.cash.put(acc_no,cash_in_hand+amount)
+    return balance-amount,cash_in_hand+amount
+
+def transfer(conn,from_acc,to_acc,amount):
+#returns the sender's balance after the transfer
+    check_amount(amount)
+    if from_acc==to_acc:
+        raise LedgerError("You can't transfer to yourself")
+    def work(cur):
+        balance=lock_accounts(cur,[from_acc,to_acc])[from_acc]
+        if amount>balance:
+            raise LedgerError("You do not have enough balance")
+        cur.execute("update accounts set balance=balance-%s where acc_no=%s",(amount,from_acc))
+        cur.execute("update accounts set balance=balance+%s where acc_no=%s",(amount,to_acc))
+        journal.write(cur,journal.transfer(from_acc,to_acc,amount))
+        return balance
+    return connection.run_transaction(conn,work,"transfer")-amount
@@ -0,0 +1,106 @@
+import sys
+from datetime import date
+from tools import connection
+from tools import metrics
+
+PAGE_SIZE=50
+
+def where(filters):
+#filters are (sql condition with one %s, value) pairs, empty values are skipped
+    conds=[]
+    data=[]
+    for cond,value in filters:
+        if value not in (None,""):
+            conds.append(cond)
+            data.append(value)
+    return conds,data
+
+def fetch(conn,query,data):
+#conn None borrows a pooled connection for this page only, so the screens don't
+#hold one while a page waits for the user
+    with connection.using(conn) as conn:
+        cur=conn.cursor()
+        try:
+            cur.execute(query,data)
+            return cur.fetchall()
+        finally:
+            cur.close()
+
+def pages(conn,table,columns,key,filters=(),page_size=PAGE_SIZE):
+#Keyset pagination on the primary key: every page is an index range scan that
+#starts after the last key of the previous page, so the cost of a page does not
+#grow with how far into the table it is, and pages can come from different
+#connections (conn None, see fetch).
+    conds,data=where(filters)
+    last=None
+    while True:
+        page_conds=list(conds)
+        page_data=list(data)
+        if last is not None:
+            page_conds.append("{}>%s".format(key))
+            page_data.append(last)
+        query="select {} from {}".format(",".join(columns),table)
+        if page_conds:
+            query+=" where "+" and ".join(page_conds)
+        query+=" order by {} limit %s".format(key)
+        page_data.append(page_size)
+        with metrics.Timer("page."+table) as timer:
+            rows=fetch(conn,query,page_data)
+            timer.rows=len(rows)
+        if not rows:
+            break
+        yield rows
+        if len(rows)<page_size:
+            break
+        last=rows[-1][0]
+
+def render(row_pages,line,header,fmt,out=sys.stdout,ask=True):
+#Writes one page at a time, so only one page of text is kept in memory
+    out.write(line+"\n"+header+"\n")
+    shown=0
+    for rows in row_pages:
+        text=[]
+        for row in rows:
+            text.append(line)
+            text.append(fmt(row))
+        out.write("\n".join(text)+"\n")
+        shown+=len(rows)
+        if ask and len(rows) and input("Enter to show the next page, ~ to stop: ")=="~":
+            break
+    out.write(line+"\n")
+    out.write("{} rows shown\n".format(shown))
+    out.flush()
+
+def ask_date(x):
+    while True:
+        value=input("Enter {} (YYYY-MM-DD, Enter to skip): ".format(x))
+        if value=="":
+            return None
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            print("Wrong date!!")
+
+def ask_page_size():
+    while True:
+        value=input("Enter rows per page (Enter for {}): ".format(PAGE_SIZE))
+        if value=="":
+            return PAGE_SIZE
+        try:
+            value=int(value)
+        except ValueError:
+            print("Page size should be an integer!!")
+        else:
+            if value>0:
+                return value
+            print("Page size should be more than 0")
+
+def like_prefix(prefix):
+#'!' is the escape character of the like patterns, see showaccounts/showemployee
+    return prefix.replace("!","!!").replace("%","!%").replace("_","!_")+"%"
+
+def ask_prefix():
+    prefix=input("Enter start of the last name (Enter to skip): ")
+    if prefix=="":
+        return None
+    return like_prefix(prefix)
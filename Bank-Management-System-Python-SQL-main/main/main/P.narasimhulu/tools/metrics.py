@@ -0,0 +1,183 @@
+#Timings of the bank operations and statements, kept in this process.
+#Every name gets a latency histogram, the rows it read/wrote, how often it was
+#refused (errors.BankError) or failed, and how often its transaction was retried
+#or gave up retrying. Anything slower than SLOW_SECONDS also goes to SLOW_LOG.
+#write() exports everything as a Prometheus text file (for the node_exporter
+#textfile collector) or as a JSON snapshot.
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from tools import errors
+
+#upper bounds of the histogram buckets, seconds
+BUCKETS=(0.0005,0.001,0.0025,0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10)
+SLOW_SECONDS=0.25
+SLOW_LOG="files//slow.log"
+SLOW_KEPT=100
+
+#name -> {"count","sum","max","rows","refused","errors","retries","gave_up","buckets"}
+timings={}
+#the last SLOW_KEPT slow operations (time,name,seconds,rows)
+slow=deque(maxlen=SLOW_KEPT)
+_lock=threading.Lock()
+#only for SLOW_LOG, so the file is never written while _lock is held
+_log_lock=threading.Lock()
+
+def _timing(name):
+#called with the lock held
+    timing=timings.get(name)
+    if timing is None:
+        timing=timings[name]={"count":0,"sum":0.0,"max":0.0,"rows":0,"refused":0,"errors":0,"retries":0,
+                              "gave_up":0,"buckets":[0]*(len(BUCKETS)+1)}
+    return timing
+
+def bucket(seconds):
+    for i,bound in enumerate(BUCKETS):
+        if seconds<=bound:
+            return i
+    return len(BUCKETS)
+
+def observe(name,seconds,rows=None,failed=None):
+#failed is None, "refused" or "errors"
+    with _lock:
+        timing=_timing(name)
+        timing["count"]+=1
+        timing["sum"]+=seconds
+        if seconds>timing["max"]:
+            timing["max"]=seconds
+        timing["buckets"][bucket(seconds)]+=1
+        if rows:
+            timing["rows"]+=rows
+        if failed:
+            timing[failed]+=1
+        if seconds>=SLOW_SECONDS:
+            slow.append((datetime.now(),name,seconds,rows))
+    if seconds>=SLOW_SECONDS:
+        log_slow(name,seconds,rows,failed)
+
+def count(name,counter):
+#counter is "retries" or "gave_up"
+    with _lock:
+        _timing(name)[counter]+=1
+
+def log_slow(name,seconds,rows,failed):
+#lines from different threads don't mix, and other threads can record timings meanwhile
+    if not SLOW_LOG:
+        return
+    try:
+        with _log_lock, open(SLOW_LOG,"a") as f:
+            f.write("{} {} {:.1f}ms rows={}{}\n".format(datetime.now().isoformat(sep=" ",timespec="milliseconds"),
+                                                      name,seconds*1000,rows if rows is not None else "-",
+                                                      " "+failed if failed else ""))
+    except OSError:
+        pass
+
+class Timer:
+#with metrics.Timer("name") as timer: ... timer.rows=n
+    def __init__(self,name):
+        self.name=name
+        self.rows=None
+
+    def __enter__(self):
+        self.start=time.perf_counter()
+        return self
+
+    def __exit__(self,kind,value,traceback):
+        failed=None
+        if kind is not None:
+            failed="refused" if issubclass(kind,errors.BankError) else "errors"
+        observe(self.name,time.perf_counter()-self.start,self.rows,failed)
+        return False
+
+def timed(func):
+#decorator, times every call under the function's name
+    @functools.wraps(func)
+    def wrapper(*args,**kwargs):
+        with Timer(func.__name__):
+            return func(*args,**kwargs)
+    return wrapper
+
+def reset():
+    with _lock:
+        timings.clear()
+        slow.clear()
+
+#------------------------------Export------------------------------
+
+def snapshot():
+    with _lock:
+        result={}
+        for name,timing in timings.items():
+            row=dict(timing)
+            cumulative=0
+            row["buckets"]={}
+            for bound,n in zip([str(b) for b in BUCKETS]+["+Inf"],timing["buckets"]):
+                cumulative+=n
+                row["buckets"][bound]=cumulative
+            result[name]=row
+        kept=[{"time":when.isoformat(),"name":name,"seconds":seconds,"rows":rows} for when,name,seconds,rows in slow]
+    return {"time":datetime.now().isoformat(),"slow_seconds":SLOW_SECONDS,"operations":result,"slow":kept}
+
+def label(name):
+    return name.replace("\\","\\\\").replace('"','\\"')
+
+def prometheus():
+    operations=snapshot()["operations"]
+    lines=["# HELP bank_operation_seconds Time taken by bank operations and statements.",
+           "# TYPE bank_operation_seconds histogram"]
+    for name,row in sorted(operations.items()):
+        for bound,n in row["buckets"].items():
+            lines.append('bank_operation_seconds_bucket{{name="{}",le="{}"}} {}'.format(label(name),bound,n))
+        lines.append('bank_operation_seconds_sum{{name="{}"}} {}'.format(label(name),row["sum"]))
+        lines.append('bank_operation_seconds_count{{name="{}"}} {}'.format(label(name),row["count"]))
+    for counter,text in (("rows","Rows read or written."),("refused","Calls refused by the bank rules."),
+                         ("errors","Calls that failed."),("retries","Transactions retried after a lock error."),
+                         ("gave_up","Lock errors given up on, out of attempts or retry budget.")):
+        lines.append("# HELP bank_operation_{}_total {}".format(counter,text))
+        lines.append("# TYPE bank_operation_{}_total counter".format(counter))
+        for name,row in sorted(operations.items()):
+            lines.append('bank_operation_{}_total{{name="{}"}} {}'.format(counter,label(name),row[counter]))
+    return "\n".join(lines)+"\n"
+
+def write(path):
+#.json gets the JSON snapshot, anything else the Prometheus text format.
+#The file is replaced in one go so a collector never reads half of it.
+    if path.endswith(".json"):
+        text=json.dumps(snapshot(),indent=2)
+    else:
+        text=prometheus()
+    temp="{}.{}.tmp".format(path,os.getpid())
+    with open(temp,"w") as f:
+        f.write(text)
+    os.replace(temp,path)
+
+def percentile(row,q):
+#upper bound of the bucket holding the q-th call, the max for the last bucket
+    wanted=q*row["count"]
+    for bound,n in row["buckets"].items():
+        if n>=wanted:
+            return row["max"] if bound=="+Inf" else min(float(bound),row["max"])
+    return row["max"]
+
+def report():
+#operations that took the most time in total come first
+    data=snapshot()
+    rows=sorted(data["operations"].items(),key=lambda item:item[1]["sum"],reverse=True)
+    line="+----------------------+----------+------------+----------+----------+----------+----------+--------+---------+"
+    print(line)
+    print("|","%20s"%"NAME","|","%8s"%"CALLS","|","%10s"%"TOTAL_MS","|","%8s"%"AVG_MS","|","%8s"%"P99_MS","|",
+          "%8s"%"MAX_MS","|","%8s"%"ROWS","|","%6s"%"ERRORS","|","%7s"%"RETRIES","|")
+    print(line)
+    for name,row in rows:
+        print("|","%20s"%name[:20],"|","%8d"%row["count"],"|","%10.2f"%(row["sum"]*1000),"|",
+              "%8.3f"%(row["sum"]*1000/max(row["count"],1)),"|","%8.3f"%(percentile(row,0.99)*1000),"|",
+              "%8.3f"%(row["max"]*1000),"|","%8d"%row["rows"],"|","%6d"%row["errors"],"|","%7d"%row["retries"],"|")
+    print(line)
+    if data["slow"]:
+        print("Slowest recent operations (over {} ms):".format(int(SLOW_SECONDS*1000)))
+        for entry in data["slow"][-10:]:
+            print("  {} {} {:.1f} ms".format(entry["time"],entry["name"],entry["seconds"]*1000))
@@ -0,0 +1,368 @@
+#The bank operations without any prompts. The panels collect the input and call
+#these, scripts and services can call them directly. Every function takes an
+#open connection, checks its arguments with the rules in tools/dataentering,
+#and raises errors.BankError (or mysql.connector.Error) when it can't be done.
+#Every call is timed in tools/metrics under the function's name.
+#Passwords are taken in plaintext and kept as hashes (tools/passwords).
+from datetime import date
+from typing import Dict, Optional, Tuple
+import mysql.connector
+from mysql.connector import errorcode
+from tools import cache
+from tools import checkpoints
+from tools import connection
+from tools import dataentering
+from tools import errors
+from tools import journal
+from tools import ledger
+from tools import metrics
+from tools import passwords
+from tools import queries
+from tools import sanction
+from tools import search
+
+REDEEM_CODES={"TESTREDEEMCODE":5000}
+
+PANELS=("ADMIN","EMPLOYEE")
+
+#Columns that edit_account / edit_employee can change
+CLIENT_FIELDS=("first_name","last_name","gender","birth_date","accd","mobile_no","email_id","pass")
+EMPLOYEE_FIELDS=("emp_no","birth_date","first_name","last_name","gender","hire_date","pass")
+
+def check(error):
+    if error is not None:
+        raise errors.BankError(error)
+
+def check_client(acc_no,first_name,last_name,gender,birth_date,accd,mobile_no,email_id,password=None):
+#password None is a password that isn't changed (only its hash is known)
+    check(dataentering.check_key(acc_no,"acc_no"))
+    check(dataentering.check_name(first_name))
+    check(dataentering.check_name(last_name))
+    check(dataentering.check_gender(gender))
+    check(dataentering.check_age(birth_date,"Client",10,100))
+    check(dataentering.check_date2(birth_date,accd,"client",10,100))
+    check(dataentering.check_mobile(mobile_no))
+    check(dataentering.check_email(email_id))
+    if password is not None:
+        check(dataentering.check_password(password))
+
+def check_employee(emp_no,birth_date,first_name,last_name,gender,hire_date,password=None):
+    check(dataentering.check_key(emp_no,"emp_no"))
+    check(dataentering.check_age(birth_date,"employee",20,60))
+    check(dataentering.check_name(first_name))
+    check(dataentering.check_name(last_name))
+    check(dataentering.check_gender(gender))
+    check(dataentering.check_date2(birth_date,hire_date,"Employee",20,60))
+    if password is not None:
+        check(dataentering.check_password(password))
+
+def duplicate(err,x):
+    if err.errno==errorcode.ER_DUP_ENTRY:
+        return errors.BankError("That {} already exists.".format(x))
+    return err
+
+def update(cur,table,key,key_value,changes):
+    columns=",".join("{}=%s".format(column) for column in changes)
+    cur.execute("update {} set {} where {}=%s".format(table,columns,key),tuple(changes.values())+(key_value,))
+
+def rehash(conn,table,key,key_value,stored,password):
+#a right password that is still plaintext or hashed with an older cost gets a new hash,
+#unless it was changed in the meantime
+    if not passwords.needs_rehash(stored):
+        return
+    cur=conn.cursor()
+    try:
+        cur.execute("update {} set pass=%s where {}=%s and pass=%s".format(table,key),
+                    (passwords.hash_password(password),key_value,stored))
+    finally:
+        cur.close()
+
+#--------------------------------Clients--------------------------------
+
+@metrics.timed
+def create_account(conn,acc_no: int,acc_type: str,first_name: str,last_name: str,gender: str,
+                   birth_date: date,accd: date,mobile_no: str,email_id: str,password: str,
+                   balance: int) -> None:
+    check_client(acc_no,first_name,last_name,gender,birth_date,accd,mobile_no,email_id,password)
+    if acc_type not in ('S','C'):
+        raise errors.BankError("Account type should be S or C")
+    check(dataentering.check_balance(balance))
+    password=passwords.hash_password(password)
+    cur=conn.cursor()
+    try:
+        with connection.transaction(conn):
+            cur.execute("INSERT INTO clients "
+                        "(acc_no,type,first_name,last_name,gender,birth_date,accd,mobile_no,email_id,pass) "
+                        "VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)",
+                        (acc_no,acc_type,first_name,last_name,gender,birth_date,accd,mobile_no,email_id,password))
+            cur.execute("INSERT INTO accounts VALUES(%s,%s,%s,'NO')",(acc_no,acc_type,balance))
+            journal.write(cur,[(acc_no,"OPEN",balance,None)])
+            search.index_client(cur,acc_no,first_name,last_name)
+    except mysql.connector.Error as err:
+        raise duplicate(err,"account number")
+    finally:
+        cur.close()
+
+@metrics.timed
+def get_account(conn,acc_no: int) -> Dict:
+    row=cache.client(conn,acc_no)
+    if row is None:
+        raise errors.NotFound("That account number doesn't exist")
+    return dict(zip(("acc_no","type","first_name","last_name","gender","birth_date","accd",
+                     "mobile_no","email_id"),row))
+
+@metrics.timed
+def client_password(conn,acc_no: int) -> str:
+#the stored hash, for callers that check it themselves (server.py checks it off the event loop).
+#Read fresh every time, a changed password must take effect at once.
+    row=queries.fetchone(conn,"client_pass",(acc_no,))
+    if row is None:
+        raise errors.NotFound("That account number doesn't exist")
+    return row[0]
+
+@metrics.timed
+def rehash_client_password(conn,acc_no: int,stored: str,password: str) -> None:
+#after password was checked against stored
+    rehash(conn,"clients","acc_no",acc_no,stored,password)
+
+@metrics.timed
+def login_client(conn,acc_no: int,password: str) -> bool:
+    stored=client_password(conn,acc_no)
+    if not passwords.verify(password,stored):
+        return False
+    if passwords.needs_rehash(stored):
+        rehash_client_password(conn,acc_no,stored,password)
+    return True
+
+@metrics.timed
+def edit_account(conn,acc_no: int,/,**changes) -> None:
+#edit_account(conn,acc_no,first_name="Ravi",mobile_no="9876543210")
+    for column in changes:
+        if column not in CLIENT_FIELDS:
+            raise errors.BankError("{} can't be changed".format(column))
+    if "pass" in changes:
+        check(dataentering.check_password(changes["pass"]))
+        changes["pass"]=passwords.hash_password(changes["pass"])
+    def work(cur):
+        #the current values are read under the row lock, so a concurrent edit
+        #can't slip in between the checks and the update
+        cur.execute(queries.SQL["client"]+" for update",(acc_no,))
+        row=cur.fetchone()
+        if row is None:
+            raise errors.NotFound("That account number doesn't exist")
+        new=dict(zip(("acc_no","type","first_name","last_name","gender","birth_date","accd",
+                      "mobile_no","email_id"),row))
+        new.update(changes)
+        check_client(acc_no,new["first_name"],new["last_name"],new["gender"],new["birth_date"],
+                     new["accd"],new["mobile_no"],new["email_id"])
+        if not changes:
+            return
+        update(cur,"clients","acc_no",acc_no,changes)
+        if "first_name" in changes or "last_name" in changes:
+            search.index_client(cur,acc_no,new["first_name"],new["last_name"])
+    try:
+        connection.run_transaction(conn,work,"edit_account")
+    finally:
+        cache.forget_client(acc_no)
+
+@metrics.timed
+def delete_account(conn,acc_no: int) -> None:
+    def work(cur):
+        cur.execute("select type,loan_od,balance from accounts where acc_no=%s for update",(acc_no,))
+        row=cur.fetchone()
+        if row is None:
+            raise errors.NotFound("That account number doesn't exist")
+        if row[1]=="YES":
+            loan_or_od="loan" if row[0]=='S' else "overdraft"
+            raise errors.BankError("The account can't be deleted until {} is repayed".format(loan_or_od))
+        cur.execute("delete from cash_in_hand where acc_no=%s",(acc_no,))
+        cur.execute("delete from accruals where acc_no=%s",(acc_no,))
+        cur.execute("delete from accounts where acc_no=%s",(acc_no,))
+        cur.execute("delete from clients where acc_no=%s",(acc_no,))
+        search.forget_client(cur,acc_no)
+        #the journal rows of the account are kept, CLOSE takes out what was left
+        journal.write(cur,[(acc_no,"CLOSE",-row[2],None)])
+    try:
+        connection.run_transaction(conn,work,"delete_account")
+    finally:
+        cache.forget_client(acc_no)
+        cache.forget_cash(acc_no)
+
+@metrics.timed
+def balance(conn,acc_no: int) -> int:
+    row=queries.fetchone(conn,"balance",(acc_no,))
+    if row is None:
+        raise errors.NotFound("That account number doesn't exist")
+    return row[0]
+
+@metrics.timed
+def balance_on(conn,acc_no: int,day: date) -> int:
+#balance at the end of day
+    return checkpoints.balance_on(conn,acc_no,day)
+
+@metrics.timed
+def cash_in_hand(conn,acc_no: int) -> int:
+    return ledger.cash_in_hand(conn,acc_no)
+
+@metrics.timed
+def deposit(conn,acc_no: int,amount: int) -> Tuple[int,int]:
+#returns (balance,cash_in_hand) after the deposit
+    return ledger.deposit(conn,acc_no,amount)
+
+@metrics.timed
+def withdraw(conn,acc_no: int,amount: int) -> Tuple[int,int]:
+#returns (balance,cash_in_hand) after the withdrawal
+    return ledger.withdraw(conn,acc_no,amount)
+
+@metrics.timed
+def transfer(conn,from_acc: int,to_acc: int,amount: int) -> int:
+#returns the sender's balance after the transfer
+    return ledger.transfer(conn,from_acc,to_acc,amount)
+
+@metrics.timed
+def redeem(conn,acc_no: int,code: str) -> int:
+#returns the amount added to the balance
+    amount=REDEEM_CODES.get(code)
+    if amount is None:
+        raise errors.BankError("Sorry! This redeem code doesn't work")
+    def work(cur):
+        cur.execute("update accounts set balance = balance+%s where acc_no = %s",(amount,acc_no))
+        if cur.rowcount!=1:
+            raise errors.NotFound("That account number doesn't exist")
+        journal.write(cur,[(acc_no,"REDEEM",amount,None)])
+    connection.run_transaction(conn,work,"redeem")
+    return amount
+
+@metrics.timed
+def request_loan(conn,acc_no: int,loan_type: str,amount: int,months: int) -> int:
+#returns the request_no, the sanction workers decide on it later
+    if loan_type not in sanction.RULES["rates"]:
+        raise errors.BankError("Loan type should be one of {}".format(",".join(sanction.RULES["rates"])))
+    if months<=0:
+        raise errors.BankError("Months should be more than 0")
+    return sanction.submit(conn,acc_no,"LOAN",amount,loan_type=loan_type,months=months)
+
+@metrics.timed
+def request_overdraft(conn,acc_no: int,amount: int,to_acc: Optional[int]=None,
+                      transfer_amt: Optional[int]=None) -> int:
+#to_acc/transfer_amt is a transfer that is made when the overdraft is sanctioned
+    return sanction.submit(conn,acc_no,"OVERDRAFT",amount,to_acc=to_acc,transfer_amt=transfer_amt)
+
+@metrics.timed
+def last_request(conn,acc_no: int,kind: str) -> Optional[Dict]:
+#kind is LOAN or OVERDRAFT
+    return sanction.last(conn,acc_no,kind)
+
+#-------------------------------Employees-------------------------------
+
+@metrics.timed
+def hire_employee(conn,emp_no: int,birth_date: date,first_name: str,last_name: str,gender: str,
+                  hire_date: date,password: str) -> None:
+    check_employee(emp_no,birth_date,first_name,last_name,gender,hire_date,password)
+    password=passwords.hash_password(password)
+    cur=conn.cursor()
+    try:
+        with connection.transaction(conn):
+            cur.execute("INSERT INTO employees "
+                        "(emp_no,birth_date,first_name,last_name,gender,hire_date) "
+                        "VALUES (%s,%s,%s,%s,%s,%s)",
+                        (emp_no,birth_date,first_name,last_name,gender,hire_date))
+            cur.execute("INSERT INTO empass values(%s,%s)",(emp_no,password))
+    except mysql.connector.Error as err:
+        raise duplicate(err,"employee number")
+    finally:
+        cur.close()
+
+@metrics.timed
+def get_employee(conn,emp_no: int) -> Dict:
+    row=cache.employee(conn,emp_no)
+    if row is None:
+        raise errors.NotFound("That employee number doesn't exist")
+    return dict(zip(("emp_no","birth_date","first_name","last_name","gender","hire_date"),row))
+
+@metrics.timed
+def login_employee(conn,emp_no: int,password: str) -> bool:
+    row=queries.fetchone(conn,"empass",(emp_no,))
+    if row is None:
+        raise errors.NotFound("That employee number doesn't exist")
+    if not passwords.verify(password,row[1]):
+        return False
+    rehash(conn,"empass","emp_no",emp_no,row[1],password)
+    return True
+
+@metrics.timed
+def fire_employee(conn,emp_no: int) -> None:
+    cur=conn.cursor()
+    try:
+        #Both rows go in one transaction, the delete's row count tells whether the employee existed
+        with connection.transaction(conn):
+            cur.execute("delete from empass where emp_no = %s",(emp_no,))
+            cur.execute("delete from employees where emp_no = %s",(emp_no,))
+            if cur.rowcount!=1:
+                raise errors.NotFound("That employee number doesn't exist")
+    finally:
+        cur.close()
+        cache.forget_employee(emp_no)
+
+@metrics.timed
+def edit_employee(conn,emp_no: int,/,**changes) -> None:
+#edit_employee(conn,emp_no,last_name="Rao") , emp_no=... renumbers the employee
+    for column in changes:
+        if column not in EMPLOYEE_FIELDS:
+            raise errors.BankError("{} can't be changed".format(column))
+    if "pass" in changes:
+        check(dataentering.check_password(changes["pass"]))
+        changes["pass"]=passwords.hash_password(changes["pass"])
+    employee={column:value for column,value in changes.items() if column!="pass"}
+    empass={column:value for column,value in changes.items() if column in ("emp_no","pass")}
+    def work(cur):
+        #read under the row locks like edit_account
+        cur.execute(queries.SQL["employee"]+" for update",(emp_no,))
+        row=cur.fetchone()
+        cur.execute(queries.SQL["empass"]+" for update",(emp_no,))
+        if row is None or cur.fetchone() is None:
+            raise errors.NotFound("That employee number doesn't exist")
+        new=dict(zip(("emp_no","birth_date","first_name","last_name","gender","hire_date"),row))
+        new.update(changes)
+        check_employee(new["emp_no"],new["birth_date"],new["first_name"],new["last_name"],new["gender"],
+                       new["hire_date"])
+        if empass:
+            update(cur,"empass","emp_no",emp_no,empass)
+        if employee:
+            update(cur,"employees","emp_no",emp_no,employee)
+    try:
+        connection.run_transaction(conn,work,"edit_employee")
+    except mysql.connector.Error as err:
+        raise duplicate(err,"employee number")
+    finally:
+        cache.forget_employee(emp_no)
+        if "emp_no" in changes:
+            cache.forget_employee(changes["emp_no"])
+
+@metrics.timed
+def decide_request(conn,request_no: int,sanction_it: bool,emp_no: int,reason: str="") -> None:
+    sanction.decide(conn,request_no,sanction_it,emp_no,reason)
+
+#--------------------------------Panels---------------------------------
+
+@metrics.timed
+def set_panel_password(conn,panel: str,password: str) -> None:
+    if panel not in PANELS:
+        raise errors.BankError("Panel should be one of {}".format(",".join(PANELS)))
+    check(dataentering.check_password(password))
+    cur=conn.cursor()
+    try:
+        cur.execute("INSERT INTO panel_passwords VALUES(%s,%s) ON DUPLICATE KEY UPDATE pass=VALUES(pass)",
+                    (panel,passwords.hash_password(password)))
+    finally:
+        cur.close()
+
+@metrics.timed
+def login_panel(conn,panel: str,password: str) -> bool:
+    row=queries.fetchone(conn,"panel",(panel,))
+    if row is None:
+        raise errors.NotFound("No password is set for the {} panel".format(panel.lower()))
+    if not passwords.verify(password,row[1]):
+        return False
+    rehash(conn,"panel_passwords","panel",panel,row[1],password)
+    return True
@@ -0,0 +1,172 @@
+#Salted password hashes. Passwords of clients, employees and the panels are kept as
+#  scrypt$<n>$<r>$<p>$<salt>$<hash>
+#so every hash carries its own cost and older hashes keep working when the cost is
+#raised; logins replace them (and plaintext passwords of old databases) with new ones.
+#The cost can be tuned with BANK_SCRYPT_N (a power of 2), BANK_SCRYPT_R and BANK_SCRYPT_P.
+#
+#A check takes tens of milliseconds of CPU on purpose. verify_async() runs it on a
+#pool of threads (hashlib lets go of the GIL while hashing) so the event loop of
+#server.py goes on with other requests, and right passwords are remembered for a
+#while under a keyed digest, so repeated logins don't pay for scrypt again.
+#Plaintext rows of old databases are hashed by the migrations (initialization/migrate)
+#on a pool of processes, or again with:  python -m tools.passwords --rehash
+import argparse
+import base64
+import hashlib
+import hmac
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import mysql.connector
+from tools import cache
+from tools import connection
+
+N=int(os.environ.get("BANK_SCRYPT_N",2**14))
+R=int(os.environ.get("BANK_SCRYPT_R",8))
+P=int(os.environ.get("BANK_SCRYPT_P",1))
+SALT_BYTES=16
+HASH_BYTES=32
+PREFIX="scrypt$"
+
+WORKERS=os.cpu_count() or 4
+#right passwords remembered (entries, seconds)
+VERIFY_CACHE=10000
+VERIFY_TTL=300
+REHASH_CHUNK=1000
+
+#(table,key column) of the tables with a pass column
+TABLES=[("clients","acc_no"),("empass","emp_no"),("panel_passwords","panel")]
+
+_key=os.urandom(32)
+_verified=cache.LRUCache(VERIFY_CACHE,VERIFY_TTL)
+_pool=None
+
+def b64(data):
+    return base64.b64encode(data).decode()
+
+def hash_password(password,n=None,r=None,p=None,salt=None):
+    n,r,p=n or N,r or R,p or P
+    salt=salt or os.urandom(SALT_BYTES)
+    digest=hashlib.scrypt(password.encode(),salt=salt,n=n,r=r,p=p,maxmem=256*n*r+1024*1024,dklen=HASH_BYTES)
+    return "{}{}${}${}${}${}".format(PREFIX,n,r,p,b64(salt),b64(digest))
+
+def is_hash(stored):
+    return stored.startswith(PREFIX)
+
+def well_formed(stored):
+#scrypt$<n>$<r>$<p>$<salt>$<hash> with a cost scrypt accepts, for hashes that come from outside
+    parts=stored.split("$")
+    if len(parts)!=6 or parts[0]+"$"!=PREFIX:
+        return False
+    try:
+        n,r,p=(int(x) for x in parts[1:4])
+        salt=base64.b64decode(parts[4],validate=True)
+        digest=base64.b64decode(parts[5],validate=True)
+    except ValueError:
+        return False
+    return n>1 and n&(n-1)==0 and r>0 and p>0 and len(salt)>0 and len(digest)>0
+
+def needs_rehash(stored):
+#plaintext, or hashed with another cost
+    if not is_hash(stored):
+        return True
+    n,r,p=stored.split("$")[1:4]
+    return (int(n),int(r),int(p))!=(N,R,P)
+
+def check(password,stored):
+    if not is_hash(stored):
+        return hmac.compare_digest(password.encode(),stored.encode())
+    try:
+        n,r,p,salt,digest=stored.split("$")[1:]
+        n,r,p=int(n),int(r),int(p)
+        digest=base64.b64decode(digest)
+        found=hashlib.scrypt(password.encode(),salt=base64.b64decode(salt),n=n,r=r,p=p,
+                             maxmem=256*n*r+1024*1024,dklen=len(digest))
+    except ValueError:
+        return False
+    return hmac.compare_digest(found,digest)
+
+def verify(password,stored):
+    key=hmac.new(_key,stored.encode()+b"\0"+password.encode(),hashlib.sha256).digest()
+    if _verified.get(key):
+        return True
+    if not check(password,stored):
+        return False
+    _verified.put(key,True)
+    return True
+
+def pool():
+    global _pool
+    if _pool is None:
+        _pool=ThreadPoolExecutor(max_workers=WORKERS,thread_name_prefix="passwords")
+    return _pool
+
+def verify_async(password,stored):
+#a concurrent.futures.Future of verify(), asyncio.wrap_future() makes it awaitable
+    return pool().submit(verify,password,stored)
+
+#------------------------------Rehash------------------------------
+
+def hash_many(passwords,processes=None,executor=None):
+#hashes on a pool of processes, in order
+    if not passwords:
+        return []
+    if executor is not None:
+        return list(executor.map(hash_password,passwords,chunksize=max(1,len(passwords)//(4*WORKERS))))
+    with ProcessPoolExecutor(processes) as executor:
+        return hash_many(passwords,executor=executor)
+
+def rehash_table(conn,table,key,processes=None,chunk=REHASH_CHUNK):
+#hashes the plaintext passwords of a table, one transaction per chunk, returns how many
+    last=None
+    count=0
+    with ProcessPoolExecutor(processes) as executor:
+        while True:
+            cur=conn.cursor(buffered=True)
+            try:
+                cur.execute("select {0},pass from {1} where pass not like %s{2} order by {0} limit %s"
+                            .format(key,table," and {}>%s".format(key) if last is not None else ""),
+                            [PREFIX+"%"]+([last] if last is not None else [])+[chunk])
+                rows=cur.fetchall()
+            finally:
+                cur.close()
+            if not rows:
+                break
+            hashes=hash_many([row[1] for row in rows],executor=executor)
+            def work(cur):
+                #a password changed in the meantime is left as it is now
+                cur.executemany("update {} set pass=%s where {}=%s and pass=%s".format(table,key),
+                                [(new,row[0],row[1]) for row,new in zip(rows,hashes)])
+            connection.run_transaction(conn,work,"passwords.rehash")
+            count+=len(rows)
+            last=rows[-1][0]
+    return count
+
+def main(argv=None):
+    parser=argparse.ArgumentParser(description="Hash the plaintext passwords left in the database.")
+    parser.add_argument("--rehash",action="store_true",help="hash every plaintext password")
+    parser.add_argument("--processes",type=int,help="hashing processes (default: one per CPU)")
+    args=parser.parse_args(argv)
+    if not args.rehash:
+        parser.print_help()
+        return 0
+    if connection.cc(size=1) is None:
+        print("Run main.py and finish the setup first.")
+        return 1
+    start=time.perf_counter()
+    try:
+        with connection.pool.connection() as conn:
+            for table,key in TABLES:
+                print("Hashed {} passwords of {}".format(rehash_table(conn,table,key,args.processes),table))
+    except mysql.connector.Error as err:
+        print(err.msg)
+        print("-----------Rehash was unsuccessful!!!!-------------")
+        return 1
+    finally:
+        connection.pool.close()
+    print("{:.1f}s".format(time.perf_counter()-start))
+    return 0
+
+if __name__=="__main__":
+    sys.exit(main())
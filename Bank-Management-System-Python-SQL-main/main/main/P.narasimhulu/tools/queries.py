@@ -0,0 +1,43 @@
+import weakref
+from tools import metrics
+
+#Named lookups. Every statement is prepared on the server once per connection
+#and then only executed with new parameters.
+SQL = {}
+#the profile is cached (tools/cache), so it leaves out the password hash
+SQL['client'] = "select acc_no,type,first_name,last_name,gender,birth_date,accd,mobile_no,email_id from clients where acc_no=%s"
+SQL['client_pass'] = "select pass from clients where acc_no=%s"
+SQL['employee'] = "select * from employees where emp_no=%s"
+SQL['empass'] = "select emp_no,pass from empass where emp_no=%s"
+SQL['panel'] = "select panel,pass from panel_passwords where panel=%s"
+SQL['balance'] = "select balance from accounts where acc_no=%s"
+SQL['loan_od'] = "select loan_od from accounts where acc_no=%s"
+SQL['loan'] = "select loan_amt,loan_type from loan where acc_no=%s"
+SQL['overdraft'] = "select overdraft_amt from overdraft where acc_no=%s"
+
+#connection -> {statement name: prepared cursor}
+_cursors=weakref.WeakKeyDictionary()
+
+def cursor(conn,name):
+#A connection is only used by one operation at a time, so its cursors are too
+    cursors=_cursors.get(conn)
+    if cursors is None:
+        cursors=_cursors[conn]={}
+    cur=cursors.get(name)
+    if cur is None:
+        cur=cursors[name]=conn.cursor(prepared=True)
+    return cur
+
+def fetchall(conn,name,data=()):
+    cur=cursor(conn,name)
+    with metrics.Timer("sql."+name) as timer:
+        cur.execute(SQL[name],data)
+        rows=cur.fetchall()
+        timer.rows=len(rows)
+    return rows
+
+def fetchone(conn,name,data=()):
+    rows=fetchall(conn,name,data)
+    if rows:
+        return rows[0]
+    return None
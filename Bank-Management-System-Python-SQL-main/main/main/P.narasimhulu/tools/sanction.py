@@ -0,0 +1,294 @@
+#Loan and overdraft requests. Clients only add a request to the requests table
+#and carry on; sanction workers take the PENDING requests, score them against
+#RULES and sanction, reject, or leave them for an employee to REVIEW.
+#Run the workers next to the panels/server:  python -m tools.sanction --workers 4
+#RULES can be changed without touching the code by putting the keys to change in
+#files//rules.json, e.g. {"auto_sanction_limit": 200000, "rates": {"HL": 8}}
+import argparse
+import json
+import sys
+import threading
+import traceback
+from datetime import date, datetime
+import mysql.connector
+from tools import connection
+from tools import errors
+from tools import journal
+from tools import ledger
+
+RULES={
+    #interest per cent per annum and the largest loan of every loan type
+    "rates":{"PL":12,"HL":9,"EL":8,"TL":11,"BL":13},
+    "loan_limits":{"PL":500000,"HL":5000000,"EL":1000000,"TL":2000000,"BL":3000000},
+    "max_months":360,
+    "od_limit":50000,
+    #a balance of cover*amount and an account of full_age_years years get full marks
+    "cover":0.5,
+    "full_age_years":5,
+    #score out of 100
+    "auto_sanction_score":70,
+    "auto_sanction_limit":100000,
+    "auto_reject_score":30,
+}
+RULES_FILE="files//rules.json"
+
+WORKERS=4
+POLL=2.0
+
+OPEN=("PENDING","REVIEW")
+COLUMNS=("request_no","acc_no","kind","loan_type","amount","months","to_acc","transfer_amt",
+         "status","score","reason","created","decided","decided_by")
+
+def load_rules(path=RULES_FILE):
+    rules=json.loads(json.dumps(RULES))
+    try:
+        with open(path) as f:
+            changes=json.load(f)
+    except FileNotFoundError:
+        return rules
+    except ValueError:
+        raise errors.BankError("{} isn't valid JSON".format(path))
+    if not isinstance(changes,dict):
+        raise errors.BankError("{} should be a JSON object".format(path))
+    for key,value in changes.items():
+        if key not in RULES:
+            raise errors.BankError("Unknown rule {} in {}".format(key,path))
+        if isinstance(RULES[key],dict):
+            if not isinstance(value,dict):
+                raise errors.BankError("{} should be an object of loan types".format(key))
+            for loan_type in value:
+                if loan_type not in RULES[key]:
+                    raise errors.BankError("Unknown loan type {} in {}".format(loan_type,key))
+            rules[key].update(value)
+        else:
+            rules[key]=value
+    check_rules(rules)
+    return rules
+
+def check_rule(value,x,low,strict=False,whole=True):
+    if isinstance(value,bool) or not isinstance(value,int if whole else (int,float)):
+        raise errors.BankError("{} should be {}".format(x,"a whole number" if whole else "a number"))
+    if value<low or (strict and value==low):
+        raise errors.BankError("{} should be {} {}".format(x,"more than" if strict else "at least",low))
+
+def check_rules(rules):
+#cover and full_age_years divide the score, a 0 there would stop every worker
+    for key in ("rates","loan_limits"):
+        for loan_type,value in rules[key].items():
+            check_rule(value,"{} of {}".format(key,loan_type),0)
+    check_rule(rules["max_months"],"max_months",1)
+    check_rule(rules["od_limit"],"od_limit",0)
+    check_rule(rules["cover"],"cover",0,strict=True,whole=False)
+    check_rule(rules["full_age_years"],"full_age_years",0,strict=True,whole=False)
+    check_rule(rules["auto_sanction_limit"],"auto_sanction_limit",0)
+    for key in ("auto_sanction_score","auto_reject_score"):
+        check_rule(rules[key],key,0)
+        if rules[key]>100:
+            raise errors.BankError("{} should be at most 100".format(key))
+    if rules["auto_reject_score"]>rules["auto_sanction_score"]:
+        raise errors.BankError("auto_reject_score should be at most auto_sanction_score")
+
+#------------------------------Requests------------------------------
+
+def submit(conn,acc_no,kind,amount,loan_type=None,months=None,to_acc=None,transfer_amt=None):
+#returns the request_no
+    if amount<=0:
+        raise errors.BankError("Amount should be more than 0")
+    cur=conn.cursor(buffered=True)
+    try:
+        with connection.transaction(conn):
+            #the client row lock lets only one submit of an account check and insert at a time
+            cur.execute("select acc_no from clients where acc_no=%s for update",(acc_no,))
+            if cur.fetchone() is None:
+                raise errors.NotFound("That account number doesn't exist")
+            cur.execute("select status from requests where acc_no=%s and kind=%s "
+                        "order by request_no desc limit 1",(acc_no,kind))
+            row=cur.fetchone()
+            if row is not None and row[0] in OPEN:
+                raise errors.BankError("You already have a {} request waiting for a decision".format(kind.lower()))
+            cur.execute("insert into requests (acc_no,kind,loan_type,amount,months,to_acc,transfer_amt,status,created) "
+                        "values (%s,%s,%s,%s,%s,%s,%s,'PENDING',%s)",
+                        (acc_no,kind,loan_type,amount,months,to_acc,transfer_amt,datetime.now()))
+            return cur.lastrowid
+    finally:
+        cur.close()
+
+def last(conn,acc_no,kind):
+#the latest request of the account as a dict, None if there is none
+    cur=conn.cursor(buffered=True)
+    try:
+        cur.execute("select {} from requests where acc_no=%s and kind=%s "
+                    "order by request_no desc limit 1".format(",".join(COLUMNS)),(acc_no,kind))
+        row=cur.fetchone()
+    finally:
+        cur.close()
+    if row is None:
+        return None
+    return dict(zip(COLUMNS,row))
+
+def lock(cur,request_no):
+    cur.execute("select {} from requests where request_no=%s for update".format(",".join(COLUMNS)),(request_no,))
+    row=cur.fetchone()
+    if row is None or row[8] not in OPEN:
+        raise errors.BankError("Request {} isn't waiting for a decision".format(request_no))
+    return dict(zip(COLUMNS,row))
+
+def close(cur,request,status,score,reason,decided_by):
+    cur.execute("update requests set status=%s,score=%s,reason=%s,decided=%s,decided_by=%s where request_no=%s",
+                (status,score,reason[:60],datetime.now(),decided_by,request["request_no"]))
+
+#------------------------------Decisions------------------------------
+
+def assess(cur,request,rules):
+#returns (status,score,reason), status is SANCTIONED, REJECTED or REVIEW
+    cur.execute("select a.balance,a.loan_od,c.accd from accounts a join clients c on c.acc_no=a.acc_no "
+                "where a.acc_no=%s",(request["acc_no"],))
+    row=cur.fetchone()
+    if row is None:
+        return "REJECTED",None,"The account is closed"
+    balance,loan_od,accd=row
+    amount=request["amount"]
+    if loan_od=="YES":
+        return "REJECTED",None,"There is a loan/overdraft to repay"
+    if request["kind"]=="LOAN":
+        if amount>rules["loan_limits"][request["loan_type"]]:
+            return "REJECTED",None,"More than the limit for this loan type"
+        if not 0<request["months"]<=rules["max_months"]:
+            return "REJECTED",None,"Loans can be for at most {} months".format(rules["max_months"])
+    elif amount>rules["od_limit"]:
+        return "REJECTED",None,"More than the overdraft limit"
+    years=(date.today()-accd).days/365
+    score=round(50*min(1,max(balance,0)/(amount*rules["cover"]))+50*min(1,years/rules["full_age_years"]))
+    if score>=rules["auto_sanction_score"] and amount<=rules["auto_sanction_limit"]:
+        return "SANCTIONED",score,"Sanctioned automatically"
+    if score<rules["auto_reject_score"]:
+        return "REJECTED",score,"Score is too low"
+    return "REVIEW",score,"Needs an employee"
+
+def grant(cur,request,rules):
+#Pays out a sanctioned request. Everything is checked before the first write,
+#so a LedgerError leaves nothing to undo.
+    acc_no=request["acc_no"]
+    amount=request["amount"]
+    to_acc=request["to_acc"]
+    balances=ledger.lock_accounts(cur,[acc_no]+([to_acc] if to_acc is not None else []))
+    cur.execute("select loan_od from accounts where acc_no=%s",(acc_no,))
+    if cur.fetchone()[0]=="YES":
+        raise ledger.LedgerError("There is a loan/overdraft to repay")
+    if to_acc is not None and balances[acc_no]+amount<request["transfer_amt"]:
+        raise ledger.LedgerError("The balance isn't enough for the transfer anymore")
+    if request["kind"]=="LOAN":
+        #amt-per-month is filled in by the end of day batch
+        cur.execute("INSERT INTO loan (acc_no,loan_type,loan_amt,time_period_months,iterest_perc_per_annum,"
+                    "`amt-per-month`,remaining_amt) VALUES (%s,%s,%s,%s,%s,0,%s) "
+                    "ON DUPLICATE KEY UPDATE loan_type=VALUES(loan_type),loan_amt=VALUES(loan_amt),"
+                    "time_period_months=VALUES(time_period_months),"
+                    "iterest_perc_per_annum=VALUES(iterest_perc_per_annum),"
+                    "`amt-per-month`=VALUES(`amt-per-month`),remaining_amt=VALUES(remaining_amt)",
+                    (acc_no,request["loan_type"],amount,request["months"],rules["rates"][request["loan_type"]],amount))
+    else:
+        cur.execute("INSERT INTO overdraft (acc_no,overdraft_amt,od_with_interest_remaining) VALUES (%s,%s,%s) "
+                    "ON DUPLICATE KEY UPDATE overdraft_amt=VALUES(overdraft_amt),"
+                    "od_with_interest_remaining=VALUES(od_with_interest_remaining)",(acc_no,amount,amount))
+    cur.execute("update accounts set balance=balance+%s,loan_od='YES' where acc_no=%s",(amount,acc_no))
+    entries=[(acc_no,request["kind"],amount,None)]
+    if to_acc is not None:
+        #the transfer that asked for the overdraft
+        cur.execute("update accounts set balance=balance-%s where acc_no=%s",(request["transfer_amt"],acc_no))
+        cur.execute("update accounts set balance=balance+%s where acc_no=%s",(request["transfer_amt"],to_acc))
+        entries.extend(journal.transfer(acc_no,to_acc,request["transfer_amt"]))
+    journal.write(cur,entries)
+
+def decide(conn,request_no,sanction,emp_no,reason="",rules=None):
+#an employee's decision on a request
+    if rules is None:
+        rules=load_rules()
+    def work(cur):
+        request=lock(cur,request_no)
+        if sanction:
+            grant(cur,request,rules)
+            close(cur,request,"SANCTIONED",request["score"],reason or "Sanctioned by an employee",emp_no)
+        else:
+            close(cur,request,"REJECTED",request["score"],reason or "Rejected by an employee",emp_no)
+    connection.run_transaction(conn,work,"sanction.decide")
+
+def work(conn,rules):
+#decides the oldest PENDING request nobody else is working on,
+#returns False when there was none
+    def claim(cur):
+        #SKIP LOCKED lets every worker take a different request without waiting
+        cur.execute("select request_no from requests where status='PENDING' "
+                    "order by request_no limit 1 for update skip locked")
+        row=cur.fetchone()
+        if row is None:
+            return False
+        request=lock(cur,row[0])
+        status,score,reason=assess(cur,request,rules)
+        if status=="SANCTIONED":
+            try:
+                grant(cur,request,rules)
+            except (ledger.LedgerError,errors.NotFound) as err:
+                status="REJECTED"
+                reason=err.msg
+        close(cur,request,status,score,reason,None)
+        return True
+    return connection.run_transaction(conn,claim,"sanction.work")
+
+#------------------------------Workers------------------------------
+
+def worker(stop,rules,poll):
+    while not stop.is_set():
+        try:
+            with connection.pool.connection() as conn:
+                busy=work(conn,rules)
+        except (errors.BankError,mysql.connector.Error) as err:
+            print(err.msg,file=sys.stderr)
+            busy=False
+        except Exception:
+            #a bug in one request must not stop the worker, the request stays PENDING
+            traceback.print_exc()
+            busy=False
+        if not busy:
+            stop.wait(poll)
+
+def main(argv=None):
+    parser=argparse.ArgumentParser(description="Sanction loan and overdraft requests in the background.")
+    parser.add_argument("--workers",type=int,default=WORKERS)
+    parser.add_argument("--poll",type=float,default=POLL,help="seconds to wait when the queue is empty")
+    parser.add_argument("--once",action="store_true",help="stop when the queue is empty")
+    args=parser.parse_args(argv)
+    if connection.cc(size=args.workers) is None:
+        print("Run main.py and finish the setup first.")
+        return 1
+    try:
+        rules=load_rules()
+    except errors.BankError as err:
+        print(err.msg)
+        print("-----------Loading the rules was unsuccessful!!!!-------------")
+        connection.pool.close()
+        return 1
+    try:
+        if args.once:
+            with connection.pool.connection() as conn:
+                while work(conn,rules):
+                    pass
+            return 0
+        stop=threading.Event()
+        threads=[threading.Thread(target=worker,args=(stop,rules,args.poll),name="sanction-{}".format(i),daemon=True)
+                 for i in range(args.workers)]
+        for thread in threads:
+            thread.start()
+        print("{} sanction workers running, Ctrl+C to stop".format(args.workers))
+        try:
+            while True:
+                stop.wait(3600)
+        except KeyboardInterrupt:
+            stop.set()
+            for thread in threads:
+                thread.join()
+    finally:
+        connection.pool.close()
+    return 0
+
+if __name__=="__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+#Finding clients without their acc_no. Name prefixes, mobile numbers and emails
+#are looked up on the client indexes from initialization/migrate. Similar names
+#(misspelt, or first and last name swapped) are found through client_trigrams,
+#which has every trigram of every client's name: the clients sharing the most
+#trigrams with the name asked for are ranked by trigram similarity.
+#client_trigrams is kept up to date by tools/operations and tools/seed,
+#python -m tools.search --rebuild fills it again from the clients table.
+import argparse
+import sys
+import time
+import mysql.connector
+from tools import connection
+from tools import listing
+from tools import metrics
+
+LIMIT=20
+#a client must share this part of the trigrams of the name asked for
+MIN_SHARED=0.3
+#clients compared by similarity for every result asked for
+CANDIDATES=5
+REBUILD_CHUNK=5000
+
+COLUMNS=("acc_no","type","first_name","last_name","mobile_no","email_id")
+
+def trigrams(name):
+#every word padded like "  ravi " so the starts of words count more
+    grams=set()
+    for word in name.lower().split():
+        padded="  "+word+" "
+        for i in range(len(padded)-2):
+            grams.add(padded[i:i+3])
+    return grams
+
+def similarity(a,b):
+    if not a or not b:
+        return 0.0
+    return len(a&b)/len(a|b)
+
+#------------------------------Index------------------------------
+#These run on the caller's cursor, inside the caller's transaction.
+
+def index_rows(acc_no,first_name,last_name):
+    return [(gram,acc_no) for gram in sorted(trigrams(first_name+" "+last_name))]
+
+def index_client(cur,acc_no,first_name,last_name):
+    cur.execute("delete from client_trigrams where acc_no=%s",(acc_no,))
+    cur.executemany("INSERT INTO client_trigrams (trigram,acc_no) VALUES (%s,%s)",
+                    index_rows(acc_no,first_name,last_name))
+
+def forget_client(cur,acc_no):
+    cur.execute("delete from client_trigrams where acc_no=%s",(acc_no,))
+
+def rebuild(conn,chunk=REBUILD_CHUNK):
+#indexes every client again, one transaction per chunk, returns the number of clients
+    last=-1
+    count=0
+    while True:
+        def work(cur):
+            cur.execute("select acc_no,first_name,last_name from clients where acc_no>%s "
+                        "order by acc_no limit %s",(last,chunk))
+            rows=cur.fetchall()
+            if rows:
+                cur.execute("delete from client_trigrams where acc_no>%s and acc_no<=%s",(last,rows[-1][0]))
+                cur.executemany("INSERT INTO client_trigrams (trigram,acc_no) VALUES (%s,%s)",
+                                [data for row in rows for data in index_rows(*row)])
+            return rows
+        rows=connection.run_transaction(conn,work,"search.rebuild")
+        if not rows:
+            break
+        count+=len(rows)
+        last=rows[-1][0]
+    #clients after the last one are gone
+    cur=conn.cursor()
+    try:
+        cur.execute("delete from client_trigrams where acc_no>%s",(last,))
+    finally:
+        cur.close()
+    return count
+
+#------------------------------Lookups------------------------------
+#Each returns a list of rows with COLUMNS.
+
+def select(conn,where,data,order="acc_no",limit=LIMIT):
+    cur=conn.cursor(buffered=True)
+    try:
+        cur.execute("select {} from clients where {} order by {} limit %s".format(",".join(COLUMNS),where,order),
+                    tuple(data)+(limit,))
+        return cur.fetchall()
+    finally:
+        cur.close()
+
+@metrics.timed
+def by_name(conn,last_name,first_name="",limit=LIMIT):
+#clients whose last name (and first name) start with these
+    where="last_name like %s escape '!'"
+    data=[listing.like_prefix(last_name)]
+    if first_name:
+        where+=" and first_name like %s escape '!'"
+        data.append(listing.like_prefix(first_name))
+    return select(conn,where,data,"last_name,first_name,acc_no",limit)
+
+@metrics.timed
+def by_mobile(conn,mobile_no,limit=LIMIT):
+    return select(conn,"mobile_no=%s",[mobile_no],limit=limit)
+
+@metrics.timed
+def by_email(conn,email_id,limit=LIMIT):
+    return select(conn,"email_id=%s",[email_id],limit=limit)
+
+@metrics.timed
+def similar(conn,name,limit=LIMIT):
+#[(similarity,row)] best first
+    wanted=trigrams(name)
+    if not wanted:
+        return []
+    grams=sorted(wanted)
+    cur=conn.cursor(buffered=True)
+    try:
+        cur.execute("select acc_no from client_trigrams where trigram in ({}) group by acc_no "
+                    "having count(*)>=%s order by count(*) desc,acc_no limit %s"
+                    .format(",".join(["%s"]*len(grams))),
+                    grams+[max(1,int(len(grams)*MIN_SHARED)),limit*CANDIDATES])
+        acc_nos=[row[0] for row in cur.fetchall()]
+    finally:
+        cur.close()
+    if not acc_nos:
+        return []
+    rows=select(conn,"acc_no in ({})".format(",".join(["%s"]*len(acc_nos))),acc_nos,limit=len(acc_nos))
+    ranked=[(similarity(wanted,trigrams(row[2]+" "+row[3])),row) for row in rows]
+    ranked.sort(key=lambda item:(-item[0],item[1][0]))
+    return ranked[:limit]
+
+def main(argv=None):
+    parser=argparse.ArgumentParser(description="Find clients, or rebuild the name trigrams.")
+    parser.add_argument("name",nargs="?",help="a name to find similar names for")
+    parser.add_argument("--rebuild",action="store_true",help="index the names of every client again")
+    args=parser.parse_args(argv)
+    if connection.cc(size=1) is None:
+        print("Run main.py and finish the setup first.")
+        return 1
+    try:
+        with connection.pool.connection() as conn:
+            start=time.perf_counter()
+            if args.rebuild:
+                print("Indexed {} clients".format(rebuild(conn)))
+            elif args.name:
+                for score,row in similar(conn,args.name):
+                    print("{:.2f} {} {} {}".format(score,row[0],row[2],row[3]))
+            print("{:.1f} ms".format((time.perf_counter()-start)*1000))
+    except mysql.connector.Error as err:
+        print(err.msg)
+        print("-----------Search was unsuccessful!!!!-------------")
+        return 1
+    finally:
+        connection.pool.close()
+    return 0
+
+if __name__=="__main__":
+    sys.exit(main())
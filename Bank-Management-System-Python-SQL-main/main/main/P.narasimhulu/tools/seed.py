@@ -0,0 +1,221 @@
+#Synthetic clients, accounts and employees for testing at scale.
+#Run from this folder on a test database:
+#  python -m tools.seed --clients 90000 --employees 5000 [--first-acc 10000] [--method load]
+#Every row is checked with the rules of tools/dataentering (through tools/operations),
+#like the rows entered in the panels. Rows go in with multi-row INSERTs, GROUP_SIZE rows
+#per table and transaction, or on MySQL with --method load through LOAD DATA LOCAL
+#INFILE (the server needs local_infile=ON).
+import argparse
+import csv
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+import mysql.connector
+from tools import backends
+from tools import connection
+from tools import dataentering
+from tools import errors
+from tools import operations
+from tools import passwords
+from tools import search
+
+GROUP_SIZE=5000
+LOAD_GROUP_SIZE=100000
+#scrypt cost of the test passwords, the first login hashes them again at the full cost
+TEST_N=16
+
+FIRST_NAMES={"M":["Aarav","Arjun","Ravi","Rahul","Vikram","Suresh","Anil","Kiran","Mohan","Narasimhulu",
+                  "Rajesh","Sanjay","Venkat","Prakash","Harish","Imran","Joseph","Gurpreet","Ramesh","Srinivas"],
+             "F":["Ananya","Priya","Sita","Lakshmi","Kavya","Divya","Meena","Anjali","Pooja","Sunita",
+                  "Radha","Fatima","Mary","Harpreet","Deepa","Swathi","Keerthi","Padma","Nandini","Geetha"]}
+LAST_NAMES=["Kumar","Sharma","Reddy","Rao","Naidu","Iyer","Nair","Singh","Patel","Gupta","Khan","Das",
+            "Menon","Pillai","Verma","Joshi","Chowdary","Yadav","Mishra","Fernandes","Bose","Shetty"]
+
+COLUMNS={}
+COLUMNS['client_trigrams']=("trigram","acc_no")
+COLUMNS['clients']=("acc_no","type","first_name","last_name","gender","birth_date","accd","mobile_no","email_id","pass")
+COLUMNS['accounts']=("acc_no","type","balance","loan_od")
+COLUMNS['cash_in_hand']=("acc_no","cash_in_hand")
+COLUMNS['journal']=("acc_no","ts","kind","amount","ref_acc")
+COLUMNS['employees']=("emp_no","birth_date","first_name","last_name","gender","hire_date")
+COLUMNS['empass']=("emp_no","pass")
+
+#------------------------------Rows------------------------------
+
+def years_ago(today,rng,low,high):
+    return today-timedelta(days=rng.randint(low*366,high*365))
+
+def password(rng):
+    return "".join(rng.choices(string.ascii_letters+string.digits,k=rng.randint(4,8)))
+
+def hashed(rng,secret):
+#the salt comes from rng too, so the same seed still gives the same rows
+    return passwords.hash_password(secret,n=TEST_N,salt=rng.randbytes(passwords.SALT_BYTES))
+
+def client(rng,acc_no,today,balance=None):
+#(clients row,balance) that passes the checks of createaccount
+    while True:
+        gender=rng.choice("MF")
+        first_name=rng.choice(FIRST_NAMES[gender])
+        last_name=rng.choice(LAST_NAMES)
+        birth_date=years_ago(today,rng,20,90)
+        accd=birth_date+timedelta(days=rng.randint(19*366,(today-birth_date).days))
+        mobile_no=str(rng.randint(6,9))+"".join(rng.choices(string.digits,k=9))
+        email_id="{}{}@mail.in".format(first_name[:6].lower(),str(acc_no)[-8:])
+        row=(acc_no,"S" if rng.random()<0.7 else "C",first_name,last_name,gender,birth_date,accd,
+             mobile_no,email_id,password(rng))
+        amount=balance if balance is not None else rng.randint(1000,500000)
+        try:
+            operations.check_client(row[0],row[2],row[3],row[4],row[5],row[6],row[7],row[8],row[9])
+            operations.check(dataentering.check_balance(amount))
+        except errors.BankError:
+            continue
+        return row[:9]+(hashed(rng,row[9]),),amount
+
+def employee(rng,emp_no,today):
+#(employees row,password hash) that passes the checks of hireemployee
+    while True:
+        gender=rng.choice("MF")
+        birth_date=years_ago(today,rng,21,59)
+        hire_date=birth_date+timedelta(days=rng.randint(20*366+1,(today-birth_date).days))
+        row=(emp_no,birth_date,rng.choice(FIRST_NAMES[gender]),rng.choice(LAST_NAMES),gender,hire_date)
+        secret=password(rng)
+        try:
+            operations.check_employee(row[0],row[1],row[2],row[3],row[4],row[5],secret)
+        except errors.BankError:
+            continue
+        return row,hashed(rng,secret)
+
+def client_tables(rng,acc_nos,today,now,balance=None,cash=0):
+#rows of every table for a group of new clients
+    tables={"clients":[],"client_trigrams":[],"accounts":[],"cash_in_hand":[],"journal":[]}
+    for acc_no in acc_nos:
+        row,amount=client(rng,acc_no,today,balance)
+        tables["clients"].append(row)
+        tables["client_trigrams"].extend(search.index_rows(acc_no,row[2],row[3]))
+        tables["accounts"].append((acc_no,row[1],amount,"NO"))
+        tables["journal"].append((acc_no,now,"OPEN",amount,None))
+        if cash:
+            tables["cash_in_hand"].append((acc_no,cash))
+    return tables
+
+def employee_tables(rng,emp_nos,today):
+    tables={"employees":[],"empass":[]}
+    for emp_no in emp_nos:
+        row,secret=employee(rng,emp_no,today)
+        tables["employees"].append(row)
+        tables["empass"].append((emp_no,secret))
+    return tables
+
+#------------------------------Loading------------------------------
+
+def insert(cur,tables):
+    for table,rows in tables.items():
+        if rows:
+            cur.executemany("INSERT INTO {} ({}) VALUES ({})".format(table,",".join(COLUMNS[table]),
+                                                                  ",".join(["%s"]*len(COLUMNS[table]))),rows)
+
+def load(cur,tables):
+#LOAD DATA reads a CSV file written here, \N is NULL
+    for table,rows in tables.items():
+        if not rows:
+            continue
+        with tempfile.NamedTemporaryFile("w",suffix=".csv",newline="",delete=False) as f:
+            writer=csv.writer(f,lineterminator="\n")
+            for row in rows:
+                writer.writerow(["\\N" if value is None else value for value in row])
+        try:
+            cur.execute("LOAD DATA LOCAL INFILE %s INTO TABLE {} FIELDS TERMINATED BY ',' "
+                        "OPTIONALLY ENCLOSED BY '\"' LINES TERMINATED BY '\\n' ({})"
+                        .format(table,",".join(COLUMNS[table])),(f.name,))
+        finally:
+            os.remove(f.name)
+
+def groups(first,count,size):
+    for start in range(first,first+count,size):
+        yield range(start,min(start+size,first+count))
+
+def in_use(conn,first_acc,clients,first_emp,employees):
+#True when any acc_no/emp_no in the ranges is taken. The journal keeps the
+#entries of closed accounts, benchmark.unseed would delete those with the range.
+    cur=conn.cursor(buffered=True)
+    try:
+        used=0
+        for table in ("clients","journal"):
+            cur.execute("select count(*) from {} where acc_no>=%s and acc_no<%s".format(table),(first_acc,first_acc+clients))
+            used+=cur.fetchone()[0]
+        cur.execute("select count(*) from employees where emp_no>=%s and emp_no<%s",(first_emp,first_emp+employees))
+        return used+cur.fetchone()[0]>0
+    finally:
+        cur.close()
+
+def seed(conn,first_acc,clients,first_emp=0,employees=0,rng_seed=1,balance=None,cash=0,method="insert",group_size=None):
+#Adds clients accounts from first_acc on and employees from first_emp on,
+#one transaction per group. balance/cash None/0 are random/no cash_in_hand row.
+    if clients:
+        operations.check(dataentering.check_key(first_acc+clients-1,"acc_no"))
+    if employees:
+        operations.check(dataentering.check_key(first_emp+employees-1,"emp_no"))
+    if method=="load" and backends.name(conn)!=backends.MYSQL:
+        raise errors.BankError("LOAD DATA is only there on MySQL, use --method insert")
+    write=load if method=="load" else insert
+    if group_size is None:
+        group_size=LOAD_GROUP_SIZE if method=="load" else GROUP_SIZE
+    rng=random.Random(rng_seed)
+    today=date.today()
+    now=datetime.now()
+    cur=conn.cursor()
+    try:
+        for acc_nos in groups(first_acc,clients,group_size):
+            tables=client_tables(rng,acc_nos,today,now,balance,cash)
+            with connection.transaction(conn):
+                write(cur,tables)
+        for emp_nos in groups(first_emp,employees,group_size):
+            tables=employee_tables(rng,emp_nos,today)
+            with connection.transaction(conn):
+                write(cur,tables)
+    finally:
+        cur.close()
+
+def main(argv=None):
+    parser=argparse.ArgumentParser(description="Load synthetic clients, accounts and employees.")
+    parser.add_argument("--clients",type=int,default=10000)
+    parser.add_argument("--employees",type=int,default=100)
+    parser.add_argument("--first-acc",type=int,default=10000,help="acc_no of the first client")
+    parser.add_argument("--first-emp",type=int,default=10000,help="emp_no of the first employee")
+    parser.add_argument("--cash",type=int,default=0,help="cash in hand of every client")
+    parser.add_argument("--method",choices=("insert","load"),default="insert",
+                        help="multi-row INSERTs or LOAD DATA LOCAL INFILE (MySQL)")
+    parser.add_argument("--group-size",type=int,help="rows per table and transaction")
+    parser.add_argument("--seed",type=int,default=1,help="random seed, the same seed gives the same rows")
+    args=parser.parse_args(argv)
+    options={"allow_local_infile":True} if args.method=="load" else {}
+    if connection.cc(size=1,**options) is None:
+        print("Run main.py and finish the setup first.")
+        return 1
+    start=time.perf_counter()
+    try:
+        with connection.pool.connection() as conn:
+            if in_use(conn,args.first_acc,args.clients,args.first_emp,args.employees):
+                print("Some of these acc_no/emp_no are taken, use --first-acc/--first-emp.")
+                return 1
+            seed(conn,args.first_acc,args.clients,args.first_emp,args.employees,args.seed,
+                 cash=args.cash,method=args.method,group_size=args.group_size)
+    except (errors.BankError,mysql.connector.Error) as err:
+        print(err.msg)
+        print("-----------Seeding was unsuccessful!!!!-------------")
+        return 1
+    finally:
+        connection.pool.close()
+    seconds=time.perf_counter()-start
+    rows=args.clients+args.employees
+    print("Loaded {} clients and {} employees in {:.2f}s ({:.0f} rows/s)"
+          .format(args.clients,args.employees,seconds,rows/seconds if seconds else 0))
+    return 0
+
+if __name__=="__main__":
+    sys.exit(main())